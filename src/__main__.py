@@ -5,4 +5,6 @@ python -m src <command> [args] で呼び出し可能にする。
 
 from src.cli import main
 
-main()
+# 先行レンダリングのワーカー（spawn）が本モジュールを再読み込みしても CLI を起動しない
+if __name__ == "__main__":
+  main()
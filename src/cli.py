@@ -24,7 +24,14 @@ from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 
-from src.config import AUDIO_DIR, FONT_PATH, OUTPUT_DIR
+from src.config import (
+  AUDIO_DIR,
+  FONT_PATH,
+  OUTPUT_DIR,
+  RENDER_PROFILES,
+  SEGMENT_CACHE_DIRNAME,
+  VIDEO_ENCODERS,
+)
 from src.models import ScriptData
 
 logging.basicConfig(
@@ -196,36 +203,52 @@ class HebodanCLI:
     # ステップ3〜4: 音声＋動画生成 → 確認（edit で修正→再生成ループ）
     from src.generators.audio_generator import AudioGenerator
     from src.generators.thumbnail_generator import generate_thumbnail
-    from src.generators.video_composer import compose_landscape, compose_portrait
+    from src.generators.video_composer import (
+      SegmentPrerenderer,
+      compose_landscape,
+      compose_portrait,
+    )
 
     while True:
       print()
       logger.info("音声＋動画を生成中...")
 
-      logger.info("  音声を生成中...")
-      audio_gen = AudioGenerator()
-      audio_paths = audio_gen.generate(script.dialogue, audio_output_dir)
-
-      logger.info("  サムネイルを生成中...")
-      thumbnail_path = run_output_dir / "thumbnail.png"
       landscape_bg_path = run_output_dir / "bg_landscape.png"
       portrait_bg_path = run_output_dir / "bg_portrait.png"
       landscape_bg = landscape_bg_path if landscape_bg_path.exists() else None
       portrait_bg = portrait_bg_path if portrait_bg_path.exists() else None
-      generate_thumbnail(script.meta.title, thumbnail_path, landscape_bg)
+
+      # 編集ループでは変更のないシーンをセグメントキャッシュから再利用し、
+      # 変更のあったセリフは音声合成と並行して先行レンダリングする
+      logger.info("  音声を生成中...")
+      with SegmentPrerenderer(
+        script.dialogue, script.meta.title,
+        run_output_dir / SEGMENT_CACHE_DIRNAME,
+        landscape_bg=landscape_bg, portrait_bg=portrait_bg, profile=args.profile,
+      ) as prerenderer:
+        audio_gen = AudioGenerator()
+        audio_paths = audio_gen.generate(
+          script.dialogue, audio_output_dir, on_ready=prerenderer.submit_line,
+        )
+
+        logger.info("  サムネイルを生成中...")
+        thumbnail_path = run_output_dir / "thumbnail.png"
+        generate_thumbnail(script.meta.title, thumbnail_path, landscape_bg)
 
       logger.info("  横長動画 (16:9) を合成中...")
       landscape_path = run_output_dir / "landscape.mp4"
       compose_landscape(
         script.dialogue, audio_paths, landscape_path, landscape_bg,
-        title=script.meta.title,
+        title=script.meta.title, cache_dir=prerenderer.cache_dir("landscape"),
+        profile=args.profile,
       )
 
       logger.info("  縦長動画 (9:16) を合成中...")
       portrait_path = run_output_dir / "portrait.mp4"
       compose_portrait(
         script.dialogue, audio_paths, portrait_path, portrait_bg,
-        title=script.meta.title,
+        title=script.meta.title, cache_dir=prerenderer.cache_dir("portrait"),
+        profile=args.profile,
       )
 
       # note記事 / X投稿文を保存（テンプレート状態）
@@ -268,6 +291,19 @@ class HebodanCLI:
         logger.info("  %s -m src run -s %s", sys.executable, script_path)
         return
 
+    # ドラフト品質で確認した場合は、アップロード前に本番品質で描画し直す
+    if prerenderer.profile.name != "final":
+      print()
+      logger.info("本番品質で再描画中...")
+      compose_landscape(
+        script.dialogue, audio_paths, landscape_path, landscape_bg,
+        title=script.meta.title, profile="final",
+      )
+      compose_portrait(
+        script.dialogue, audio_paths, portrait_path, portrait_bg,
+        title=script.meta.title, profile="final",
+      )
+
     # ステップ5: YouTube アップロード
     youtube_url = None
     if _confirm("\nYouTube にアップロードしますか？"):
@@ -339,6 +375,18 @@ class HebodanCLI:
         argv.append(args.theme)
       if args.draft:
         argv.append("-d")
+    if args.encoder:
+      argv.extend(["--encoder", args.encoder])
+    if args.workers:
+      argv.extend(["--workers", str(args.workers)])
+    if args.pipeline:
+      argv.append("--pipeline")
+    if args.stream:
+      argv.append("--stream")
+    if args.compose_all:
+      argv.append("--compose-all")
+    if args.profile:
+      argv.extend(["--profile", args.profile])
     sys.argv = argv
     try:
       from src.main import main as main_main
@@ -347,6 +395,29 @@ class HebodanCLI:
     finally:
       sys.argv = saved_argv
 
+  def cmd_storyboard(self, args):
+    """絵コンテ（セリフごとの代表フレーム一覧）を生成"""
+    _validate_environment()
+    script_path = Path(args.script)
+    if not script_path.exists():
+      logger.error("台本ファイルが見つかりません: %s", script_path)
+      sys.exit(1)
+
+    from src.generators.storyboard_generator import generate_storyboard
+
+    script = ScriptData.from_dict(json.loads(script_path.read_text(encoding="utf-8")))
+    run_output_dir = script_path.parent
+    landscape_bg = run_output_dir / "bg_landscape.png"
+    portrait_bg = run_output_dir / "bg_portrait.png"
+    paths = generate_storyboard(
+      script, Path(args.output) if args.output else run_output_dir,
+      landscape_bg=landscape_bg if landscape_bg.exists() else None,
+      portrait_bg=portrait_bg if portrait_bg.exists() else None,
+      profile=args.profile,
+    )
+    for path in paths:
+      logger.info("  %s", path)
+
   def cmd_upload(self, args):
     """YouTubeアップロード"""
     from src.upload import run_upload
@@ -457,6 +528,10 @@ def main():
   run_p = subparsers.add_parser("run", help="全工程インタラクティブ実行")
   run_p.add_argument("theme", nargs="?", help="テーマまたは .md ファイルパス")
   run_p.add_argument("-s", "--script", help="既存台本JSONパス（再開用）")
+  run_p.add_argument(
+    "--profile", choices=RENDER_PROFILES,
+    help="確認用動画のレンダリングプロファイル（draft なら承認後に final で再描画）",
+  )
 
   # generate
   gen_p = subparsers.add_parser("generate", help="動画生成（src.main と同等）")
@@ -468,6 +543,32 @@ def main():
   gen_p.add_argument(
     "-t", "--thumbnail", action="store_true", help="サムネイルのみ再生成",
   )
+  gen_p.add_argument(
+    "--encoder", choices=VIDEO_ENCODERS, help="動画エンコーダー（moviepy / ffmpeg）",
+  )
+  gen_p.add_argument(
+    "--workers", type=int, help="並列セグメントレンダリングのプロセス数",
+  )
+  gen_p.add_argument(
+    "--pipeline", action="store_true", help="音声合成と並行して動画セグメントを描画",
+  )
+  gen_p.add_argument(
+    "--stream", action="store_true", help="1シーンずつ描画するストリーミング描画（長尺向け）",
+  )
+  gen_p.add_argument(
+    "--compose-all", action="store_true", help="横長・縦長を素材を共有してまとめて合成",
+  )
+  gen_p.add_argument(
+    "--profile", choices=RENDER_PROFILES, help="レンダリングプロファイル（final / draft）",
+  )
+
+  # storyboard
+  sb_p = subparsers.add_parser("storyboard", help="絵コンテ生成（音声合成・エンコードなし）")
+  sb_p.add_argument("script", help="台本JSONパス")
+  sb_p.add_argument("-o", "--output", help="出力先ディレクトリ（省略時は台本と同じディレクトリ）")
+  sb_p.add_argument(
+    "--profile", choices=RENDER_PROFILES, help="代表フレームのレンダリングプロファイル",
+  )
 
   # upload
   up_p = subparsers.add_parser("upload", help="YouTube アップロード")
@@ -497,6 +598,7 @@ def main():
   cmd_map = {
     "run": cli.cmd_run,
     "generate": cli.cmd_generate,
+    "storyboard": cli.cmd_storyboard,
     "upload": cli.cmd_upload,
     "shorts": cli.cmd_shorts,
     "post": cli.cmd_post,
@@ -15,6 +15,7 @@ IMAGES_DIR = ASSETS_DIR / "images"
 AUDIO_DIR = ASSETS_DIR / "audio"
 FONTS_DIR = ASSETS_DIR / "fonts"
 OUTPUT_DIR = PROJECT_ROOT / "output"
+CACHE_DIR = Path(os.getenv("HEBODAN_CACHE_DIR", str(PROJECT_ROOT / ".cache")))
 
 # フォント設定
 FONT_NAME = os.getenv("FONT_NAME", "TAユニバーサルライン_DSP_E.ttf")
@@ -26,6 +27,12 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 
 # COEIROINK API 設定
 COEIROINK_HOST = os.getenv("COEIROINK_HOST", "http://localhost:50032")
+# 合成済み音声のキャッシュ（話者・スタイル・TTSテキスト・合成パラメータで索引）
+TTS_CACHE_DIR = CACHE_DIR / "tts"
+# 同時に合成リクエストを送るセリフ数（1 なら逐次）
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "1"))
+TTS_MAX_RETRIES = 3
+TTS_RETRY_BASE_WAIT = 1.0  # リトライ待機秒数（指数バックオフ）
 
 # 読み辞書
 READING_DICT_PATH = PROJECT_ROOT / "reading_dict.txt"
@@ -58,11 +65,74 @@ SUBTITLE_COLOR = (255, 255, 255)
 SUBTITLE_STROKE_WIDTH = 2
 SUBTITLE_STROKE_COLOR = (0, 0, 0)
 DIALOGUE_LOGO_PATH = IMAGES_DIR / "logo" / "logo_white.png"
+# エンコーダーバックエンド（"moviepy": write_videofile / "ffmpeg": rawvideo パイプ直結）
+VIDEO_ENCODER = os.getenv("VIDEO_ENCODER", "moviepy")
+VIDEO_ENCODERS = ("moviepy", "ffmpeg")
+# 横長本編の描画方式（"python": NumPy で1フレームずつ合成 / "filtergraph": ffmpeg の
+# filter_complex で一括合成。対応できない要素があれば python に切り替える）
+LANDSCAPE_RENDERER = os.getenv("LANDSCAPE_RENDERER", "python")
+LANDSCAPE_RENDERERS = ("python", "filtergraph")
+# filtergraph 描画で1つのグラフ（1回の ffmpeg 呼び出し）にまとめるシーン数。
+# overlay は表示区間外のフレームでも毎フレーム処理されるため、区切らないと
+# 1フレームのコストが台本の長さに比例する
+FILTERGRAPH_CHUNK_SCENES = int(os.getenv("FILTERGRAPH_CHUNK_SCENES", "8"))
+# 並列セグメントレンダリングのプロセス数（1 なら逐次レンダリング）
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "1"))
+# 編集ループ用のセグメントキャッシュ（出力ディレクトリ配下のディレクトリ名）
+SEGMENT_CACHE_DIRNAME = ".segment_cache"
+# OP/ED のエンコード済みセグメント（実行をまたいで共有。最近使った件数だけ残す）
+OPENING_ENDING_CACHE_DIR = CACHE_DIR / "opening_ending"
+OPENING_ENDING_CACHE_MAX = int(os.getenv("OPENING_ENDING_CACHE_MAX", "64"))
+# ストリーミングレンダリング（1シーンずつ組み立て→描画→解放し、長尺でもメモリを一定に保つ）
+STREAMING_RENDER = os.getenv("STREAMING_RENDER", "0") == "1"
+# ストリーミング時にエンコーダーへ先行して渡せるフレーム数（常駐フレーム数の上限）
+STREAM_MAX_QUEUED_FRAMES = int(os.getenv("STREAM_MAX_QUEUED_FRAMES", "8"))
+# ストリーミング描画のフレーム並列プロセス数（1 ならメインプロセスで描画）
+FRAME_WORKERS = int(os.getenv("FRAME_WORKERS", "1"))
+# フレーム並列描画で共有メモリ上に確保するフレーム枠の数（ワーカー数の倍数に切り上げ）
+FRAME_RING_SLOTS = int(os.getenv("FRAME_RING_SLOTS", "16"))
+# 横長セリフシーンの合成済みフレームキャッシュの上限（バイト、プロセスごと。0 なら無効）
+# フルHD 1フレームは約 6MB。キャラの浮遊・ロゴの震えの1周期 × 口パク・まばたきの状態数の
+# フレームが収まらないとほぼヒットせず、ミスのたびにフレームのコピーが増えるだけなので、
+# 既定は無効。ヒット率は合成後のログ（フレームキャッシュ: ヒット率）で確認してから有効にする
+FRAME_CACHE_BYTES = int(os.getenv("FRAME_CACHE_BYTES", "0"))
+# compose_all で横長・縦長を2つのエンコーダープロセスで同時に描画する
+COMPOSE_ALL_CONCURRENT = os.getenv("COMPOSE_ALL_CONCURRENT", "0") == "1"
+
+# x264 エンコード設定のプリセット（None の項目は ffmpeg / x264 の既定値のまま）
+# preset: 速度プリセット / crf: 画質（小さいほど高画質・大容量）/ tune: 素材向け調整
+# gop_seconds: キーフレーム間隔（秒）/ pix_fmt: 出力ピクセル形式
+ENCODER_PRESETS = {
+  # 従来どおり（x264 既定: medium / CRF 23）
+  "standard": {"preset": None, "crf": None, "tune": None, "gop_seconds": None, "pix_fmt": "yuv420p"},
+  # 平坦な塗り・静止部分の多い画面向けの高画質設定（アップロード後の再圧縮に備える）
+  "animation": {"preset": "slow", "crf": 20, "tune": "animation", "gop_seconds": 2, "pix_fmt": "yuv420p"},
+  # エンコード時間とファイルサイズを優先する設定
+  "fast_upload": {"preset": "veryfast", "crf": 26, "tune": "animation", "gop_seconds": 4, "pix_fmt": "yuv420p"},
+  # 確認用（draft プロファイル）
+  "draft": {"preset": "ultrafast", "crf": None, "tune": None, "gop_seconds": None, "pix_fmt": "yuv420p"},
+}
+ENCODER_PRESET = os.getenv("ENCODER_PRESET", "standard")
+# x264 のスレッド数（0 なら ffmpeg の自動設定）
+ENCODER_THREADS = int(os.getenv("ENCODER_THREADS", "0"))
+# エンコード速度・ビットレートの記録先（出力ディレクトリ配下の JSON Lines）
+ENCODE_STATS_FILENAME = "encode_stats.jsonl"
+
+# レンダリングプロファイル（final: 本番設定 / draft: タイミング・字幕確認用の軽量設定）
+# scale は LANDSCAPE_SIZE / PORTRAIT_SIZE とレイアウト寸法に掛ける倍率、
+# encoder は ENCODER_PRESETS の名前（None なら ENCODER_PRESET 設定値）
+RENDER_PROFILES = {
+  "final": {"scale": 1.0, "fps": VIDEO_FPS, "encoder": None},
+  "draft": {"scale": 1 / 3, "fps": 12, "encoder": "draft"},
+}
+RENDER_PROFILE = os.getenv("RENDER_PROFILE", "final")
 
 # 背景画像生成設定
 BG_IMAGE_MODEL = "gemini-3-pro-image-preview"
 BG_GENERATION_MAX_RETRIES = 3
 BG_GENERATION_RETRY_BASE_WAIT = 5  # リトライ待機秒数（指数バックオフ）
+# リサイズ済み背景を PNG の隣に .npy として保存し、次回以降メモリマップで読む
+BG_ARRAY_PERSIST = os.getenv("BG_ARRAY_PERSIST", "1") == "1"
 
 # オープニング設定
 OPENING_DURATION = 7.0
@@ -95,6 +165,10 @@ ENDING_VOICE_GAP = 0.3     # セリフ間の間（秒）
 BGM_PATH = AUDIO_DIR / "bgm" / "Baby Animals Playing - Joel Cummins.mp3"
 BGM_VOLUME = 0.08          # 会話の邪魔にならない音量（8%）
 BGM_FADE_OUT = 3.0         # 末尾フェードアウト秒数
+# デコード済み PCM のキャッシュ（BGM・SE・EDボイスを実行間で共有）
+AUDIO_CACHE_DIR = CACHE_DIR / "audio"
+# 音声の合成・多重化に使う PCM のサンプルレート
+AUDIO_SAMPLE_RATE = 44100
 
 # ショート動画設定
 SHORTS_MAX_DURATION = 180.0  # YouTube Shorts上限（秒）= 3分
@@ -102,6 +176,7 @@ SHORTS_MAX_DURATION = 180.0  # YouTube Shorts上限（秒）= 3分
 # リップシンク設定
 LIPSYNC_THRESHOLD = 0.15       # 口を開く振幅閾値（0.0-1.0、正規化済み）
 LIPSYNC_MIN_OPEN_FRAMES = 2   # チャタリング防止の最低フレーム数
+LIPSYNC_CACHE_DIR = CACHE_DIR / "lipsync"  # 口パク解析結果のキャッシュ
 
 # YouTube API 設定
 YOUTUBE_CLIENT_SECRET = PROJECT_ROOT / os.getenv(
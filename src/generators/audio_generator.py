@@ -1,15 +1,32 @@
 """COEIROINK API を使った音声合成モジュール"""
 
 import logging
+import os
 import re
+import shutil
 import struct
+import threading
+import time
 import wave
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from src.config import COEIROINK_HOST, CHARACTERS, READING_DICT_PATH
+from src.config import (
+  CHARACTERS,
+  COEIROINK_HOST,
+  READING_DICT_PATH,
+  TTS_CACHE_DIR,
+  TTS_MAX_RETRIES,
+  TTS_RETRY_BASE_WAIT,
+  TTS_WORKERS,
+)
 from src.models import DialogueLine
+from src.utils.audio_store import open_store
 from src.utils.reading_annotations import (
   apply_reading_dict,
   convert_reading_annotations,
@@ -17,22 +34,67 @@ from src.utils.reading_annotations import (
   remove_reading_annotations,
   strip_display_only,
 )
+from src.utils.segment_cache import make_key
 
 logger = logging.getLogger(__name__)
 
+# 音声合成パラメータ（TTSキャッシュのキーにも含める）
+_SYNTHESIS_PARAMS = {
+  "speedScale": 1.0,
+  "volumeScale": 1.0,
+  "pitchScale": 0.0,
+  "intonationScale": 1.0,
+  "prePhonemeLength": 0.1,
+  "postPhonemeLength": 0.1,
+  "outputSamplingRate": 44100,
+}
+
+
+@dataclass
+class _SynthesisJob:
+  """COEIROINK へ送る1セリフ分の合成依頼"""
+
+  index: int
+  output_path: Path
+  tts_text: str
+  speaker_uuid: str
+  style_id: int
+  cache_path: Path | None
+
 
 class AudioGenerator:
   """COEIROINK APIで音声を合成するクラス"""
 
-  def __init__(self):
+  def __init__(self, cache_dir: Path | None = TTS_CACHE_DIR):
+    """
+    Args:
+      cache_dir: 合成済みWAVのキャッシュディレクトリ（None ならキャッシュしない）
+    """
     self.host = COEIROINK_HOST
     self._reading_dict = load_reading_dict(READING_DICT_PATH)
+    self.cache_dir = cache_dir
+    if cache_dir:
+      cache_dir.mkdir(parents=True, exist_ok=True)
+    # keep-alive 接続を使い回すセッション（並列合成の同時接続数ぶんプールを確保）
+    self._session = requests.Session()
+    self._pool_size = 0
+    self._ensure_pool(TTS_WORKERS)
     self._check_connection()
 
+  def _ensure_pool(self, workers: int) -> None:
+    """同時に workers 本の接続を保てるよう、足りなければ接続プールを作り直す"""
+    size = max(workers, 10)
+    if size <= self._pool_size:
+      return
+    adapter = HTTPAdapter(pool_maxsize=size)
+    self._session.mount("http://", adapter)
+    self._session.mount("https://", adapter)
+    self._pool_size = size
+
   def _check_connection(self):
     """COEIROINK APIへの接続確認"""
     try:
-      resp = requests.get(f"{self.host}/v1/speakers", timeout=5)
+      resp = self._session.get(f"{self.host}/v1/speakers", timeout=5)
       resp.raise_for_status()
       logger.info("COEIROINK API 接続確認OK")
     except requests.ConnectionError:
@@ -54,14 +116,34 @@ class AudioGenerator:
       wf.writeframes(struct.pack(f"<{num_samples}h", *([0] * num_samples)))
     return buf.getvalue()
 
+  def _post_with_retry(self, url: str, **kwargs) -> requests.Response:
+    """POST リクエストを送る（接続エラー・タイムアウト・5xx は指数バックオフで再試行）"""
+    for attempt in range(TTS_MAX_RETRIES):
+      try:
+        resp = self._session.post(url, **kwargs)
+        if resp.status_code < 500:
+          resp.raise_for_status()
+          return resp
+        error = requests.HTTPError(f"{resp.status_code} {resp.reason}", response=resp)
+      except (requests.ConnectionError, requests.Timeout) as e:
+        error = e
+
+      if attempt == TTS_MAX_RETRIES - 1:
+        raise error
+      wait = 2 ** attempt * TTS_RETRY_BASE_WAIT
+      logger.warning(
+        "COEIROINK リクエスト失敗 (試行 %d/%d): %s → %.1f秒後にリトライ",
+        attempt + 1, TTS_MAX_RETRIES, error, wait,
+      )
+      time.sleep(wait)
+
   def _estimate_prosody(self, text: str, speaker_uuid: str, style_id: int) -> dict:
     """プロソディ（韻律）を推定する"""
-    resp = requests.post(
+    resp = self._post_with_retry(
       f"{self.host}/v1/estimate_prosody",
       json={"text": text},
       timeout=30,
     )
-    resp.raise_for_status()
     return resp.json()
 
   def _synthesize(
@@ -73,36 +155,105 @@ class AudioGenerator:
       "styleId": style_id,
       "text": text,
       "prosodyDetail": prosody.get("detail", []),
-      "speedScale": 1.0,
-      "volumeScale": 1.0,
-      "pitchScale": 0.0,
-      "intonationScale": 1.0,
-      "prePhonemeLength": 0.1,
-      "postPhonemeLength": 0.1,
-      "outputSamplingRate": 44100,
+      **_SYNTHESIS_PARAMS,
     }
-    resp = requests.post(
+    resp = self._post_with_retry(
       f"{self.host}/v1/synthesis",
       json=payload,
       timeout=60,
     )
-    resp.raise_for_status()
     return resp.content
 
+  def _prepare_tts_text(self, text: str) -> str:
+    """セリフ本文を TTS 送信用テキストに変換する
+
+    1. [[表示専用]] 除去 → 2. 漢字アノテーション変換 → 3. 残余タグ除去 → 4. 辞書適用
+    """
+    tts_text = strip_display_only(text)
+    tts_text = convert_reading_annotations(tts_text)
+    tts_text = remove_reading_annotations(tts_text)
+    tts_text = apply_reading_dict(tts_text, self._reading_dict)
+    # 波ダッシュ(U+301C)はCOEIROINKが読めないため「から」に変換
+    return tts_text.replace("\u301c", "から")
+
+  def _cache_path(self, tts_text: str, speaker_uuid: str, style_id: int) -> Path | None:
+    """TTSキャッシュのパス（キャッシュ無効時は None）"""
+    if not self.cache_dir:
+      return None
+    key = make_key(speaker_uuid, style_id, tts_text, _SYNTHESIS_PARAMS)
+    return self.cache_dir / f"{key}.wav"
+
+  @staticmethod
+  def _store_cache(cache_path: Path, wav_data: bytes) -> None:
+    """キャッシュへ書き込む（一時ファイル経由で置き換え、途中状態を残さない）"""
+    tmp = cache_path.with_name(
+      f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp",
+    )
+    tmp.write_bytes(wav_data)
+    os.replace(tmp, cache_path)
+
+  @staticmethod
+  def _place_cached(cache_path: Path, output_path: Path) -> None:
+    """キャッシュ済みWAVを出力先へハードリンク（不可ならコピー）する"""
+    # 既存ファイルへ上書きするとリンク先のキャッシュまで書き換わるため先に削除する
+    output_path.unlink(missing_ok=True)
+    try:
+      os.link(cache_path, output_path)
+    except OSError:
+      shutil.copyfile(cache_path, output_path)
+
+  def _synthesize_line(self, job: _SynthesisJob) -> int:
+    """1セリフを合成して出力先へ書き出し、WAVのバイト数を返す"""
+    prosody = self._estimate_prosody(job.tts_text, job.speaker_uuid, job.style_id)
+    wav_data = self._synthesize(
+      job.tts_text, prosody, job.speaker_uuid, job.style_id,
+    )
+
+    if job.cache_path:
+      self._store_cache(job.cache_path, wav_data)
+      self._place_cached(job.cache_path, job.output_path)
+    else:
+      job.output_path.unlink(missing_ok=True)
+      job.output_path.write_bytes(wav_data)
+    return len(wav_data)
+
   def generate(
-    self, dialogue: list[DialogueLine], output_dir: Path
+    self,
+    dialogue: list[DialogueLine],
+    output_dir: Path,
+    workers: int | None = None,
+    on_ready: Callable[[int, Path], None] | None = None,
   ) -> list[Path]:
     """対話リストから音声ファイルを一括生成する
 
     Args:
       dialogue: セリフのリスト
       output_dir: WAVファイルの出力先ディレクトリ
+      workers: 同時に合成リクエストを送るセリフ数（None なら TTS_WORKERS 設定値）
+      on_ready: WAV が出来上がるたびに (セリフ番号, パス) で呼ばれるコールバック
+        （後段の動画レンダリングを音声合成と並行させるために使う）
+
+    出力先には動画合成用の PCM ストアと音声マニフェスト（長さ・ピーク・
+    フレーム RMS）も書き出す（src.utils.audio_store）。
 
     Returns:
-      生成されたWAVファイルパスのリスト
+      生成されたWAVファイルパスのリスト（セリフ順）
     """
     output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or TTS_WORKERS
+    self._ensure_pool(workers)
+    store = open_store(output_dir)
+
+    def ready(index: int, path: Path) -> None:
+      # 先行レンダリングのワーカー（別プロセス）が読めるよう、コールバック前に書き出す
+      store.add(path)
+      store.save()
+      if on_ready:
+        on_ready(index, path)
+
     audio_paths: list[Path] = []
+    jobs: list[_SynthesisJob] = []
+    cache_hits = 0
 
     for i, line in enumerate(dialogue):
       char_config = CHARACTERS.get(line.speaker)
@@ -120,15 +271,9 @@ class AudioGenerator:
 
       filename = f"{i + 1:03d}_{line.speaker}.wav"
       output_path = output_dir / filename
+      audio_paths.append(output_path)
 
-      # TTS用テキスト前処理:
-      # 1. [[表示専用]] 除去 → 2. 漢字アノテーション変換 → 3. 残余タグ除去 → 4. 辞書適用
-      tts_text = strip_display_only(line.text)
-      tts_text = convert_reading_annotations(tts_text)
-      tts_text = remove_reading_annotations(tts_text)
-      tts_text = apply_reading_dict(tts_text, self._reading_dict)
-      # 波ダッシュ(U+301C)はCOEIROINKが読めないため「から」に変換
-      tts_text = tts_text.replace("\u301c", "から")
+      tts_text = self._prepare_tts_text(line.text)
 
       logger.info(
         "音声生成中 [%d/%d]: %s「%s」",
@@ -140,16 +285,47 @@ class AudioGenerator:
       if not re.search(r"[\w\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]", tts_text):
         logger.info("  → 発音テキストなし、無音WAVを生成: %s", repr(tts_text))
         wav_data = self._generate_silence(0.5)
+        output_path.unlink(missing_ok=True)
         output_path.write_bytes(wav_data)
-        audio_paths.append(output_path)
+        ready(i, output_path)
+        continue
+
+      cache_path = self._cache_path(tts_text, speaker_uuid, style_id)
+      if cache_path and cache_path.exists():
+        self._place_cached(cache_path, output_path)
+        cache_hits += 1
+        logger.info("  → %s (キャッシュ)", filename)
+        ready(i, output_path)
         continue
 
-      prosody = self._estimate_prosody(tts_text, speaker_uuid, style_id)
-      wav_data = self._synthesize(tts_text, prosody, speaker_uuid, style_id)
+      jobs.append(_SynthesisJob(
+        index=i,
+        output_path=output_path,
+        tts_text=tts_text,
+        speaker_uuid=speaker_uuid,
+        style_id=style_id,
+        cache_path=cache_path,
+      ))
 
-      output_path.write_bytes(wav_data)
-      audio_paths.append(output_path)
-      logger.info("  → %s (%.1f KB)", filename, len(wav_data) / 1024)
+    # 合成リクエスト（workers > 1 なら複数セリフを同時に送る。出力名は上で確定済み）
+    if workers > 1 and len(jobs) > 1:
+      logger.info("音声合成: %d セリフを %d 並列で合成中...", len(jobs), workers)
+      with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(self._synthesize_line, job): job for job in jobs}
+        for future in as_completed(futures):
+          job = futures[future]
+          size = future.result()
+          logger.info("  → %s (%.1f KB)", job.output_path.name, size / 1024)
+          ready(job.index, job.output_path)
+    else:
+      for job in jobs:
+        size = self._synthesize_line(job)
+        logger.info("  → %s (%.1f KB)", job.output_path.name, size / 1024)
+        ready(job.index, job.output_path)
 
-    logger.info("音声生成完了: %d ファイル", len(audio_paths))
+    logger.info(
+      "音声生成完了: %d ファイル（キャッシュ再利用 %d）, マニフェスト: %s",
+      len(audio_paths), cache_hits, store.manifest_path,
+    )
     return audio_paths
+
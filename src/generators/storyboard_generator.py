@@ -0,0 +1,121 @@
+"""絵コンテ（コンタクトシート）生成モジュール
+
+各セリフの代表フレームを本番と同じレイアウトで描画し、横長・縦長それぞれ
+一覧画像（PNG）に並べる。音声合成・エンコードを行わないため、
+台本の見た目（表情・字幕の折り返し・吹き出し）を数秒で確認できる。
+"""
+
+import logging
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.config import CHARACTERS, FONT_PATH
+from src.generators.video_composer import render_line_frames
+from src.models import ScriptData
+from src.utils.text_renderer import get_font
+
+logger = logging.getLogger(__name__)
+
+# 向きごとの (サムネイル幅, 列数)
+_SHEET_LAYOUT = {
+  "landscape": (480, 4),
+  "portrait": (216, 6),
+}
+_LINES_PER_SHEET = 24
+_SHEET_MARGIN = 16
+_LABEL_HEIGHT = 28
+_HEADER_HEIGHT = 48
+_SHEET_BG = (32, 32, 32)
+_LABEL_COLOR = (230, 230, 230)
+_SKIP_COLOR = (255, 170, 60)  # shorts_skip のセリフ（Shorts で省略されうる）
+
+
+def generate_storyboard(
+  script: ScriptData,
+  output_dir: Path,
+  landscape_bg: Path | None = None,
+  portrait_bg: Path | None = None,
+  profile: str | None = None,
+) -> list[Path]:
+  """横長・縦長の絵コンテ画像を生成する
+
+  Args:
+    script: 台本
+    output_dir: 出力先ディレクトリ（storyboard_{向き}_{番号}.png を書き出す）
+    landscape_bg: 横長の背景画像パス
+    portrait_bg: 縦長の背景画像パス
+    profile: 代表フレームを描画するレンダリングプロファイル名（None なら設定値）
+
+  Returns:
+    生成した PNG のパス（横長 → 縦長の順）
+  """
+  output_dir.mkdir(parents=True, exist_ok=True)
+  paths = []
+  for orientation, bg in (("landscape", landscape_bg), ("portrait", portrait_bg)):
+    start = time.time()
+    frames = render_line_frames(script.dialogue, orientation, bg, profile)
+    sheets = _tile_sheets(script, orientation, frames)
+    for page, sheet in enumerate(sheets, 1):
+      path = output_dir / f"storyboard_{orientation}_{page:02d}.png"
+      sheet.save(str(path), format="PNG")
+      paths.append(path)
+    logger.info(
+      "絵コンテ生成完了(%s): %d セリフ, %d 枚 (%.1f秒)",
+      orientation, len(script.dialogue), len(sheets), time.time() - start,
+    )
+  return paths
+
+
+def _tile_sheets(
+  script: ScriptData,
+  orientation: str,
+  frames: Iterable[np.ndarray],
+) -> list[Image.Image]:
+  """代表フレームを _LINES_PER_SHEET 件ずつ一覧画像に並べる"""
+  thumb_w, columns = _SHEET_LAYOUT[orientation]
+  font = get_font(FONT_PATH, 14)
+  header_font = get_font(FONT_PATH, 24)
+  n_pages = max(1, -(-len(script.dialogue) // _LINES_PER_SHEET))
+  label = "横長" if orientation == "landscape" else "縦長"
+
+  sheets = []
+  sheet = draw = None
+  thumb_h = 0
+  for i, frame in enumerate(frames):
+    slot = i % _LINES_PER_SHEET
+    if slot == 0:
+      if thumb_h == 0:
+        thumb_h = round(frame.shape[0] * thumb_w / frame.shape[1])
+      n_items = min(_LINES_PER_SHEET, len(script.dialogue) - i)
+      rows = -(-n_items // columns)
+      sheet = Image.new("RGB", (
+        _SHEET_MARGIN + columns * (thumb_w + _SHEET_MARGIN),
+        _HEADER_HEIGHT + rows * (thumb_h + _LABEL_HEIGHT + _SHEET_MARGIN) + _SHEET_MARGIN,
+      ), _SHEET_BG)
+      draw = ImageDraw.Draw(sheet)
+      draw.text(
+        (_SHEET_MARGIN, _SHEET_MARGIN),
+        f"{script.meta.title}  [{label} {len(sheets) + 1}/{n_pages}]",
+        font=header_font, fill=_LABEL_COLOR,
+      )
+      sheets.append(sheet)
+
+    x = _SHEET_MARGIN + (slot % columns) * (thumb_w + _SHEET_MARGIN)
+    y = _HEADER_HEIGHT + (slot // columns) * (thumb_h + _LABEL_HEIGHT + _SHEET_MARGIN)
+    thumb = Image.fromarray(np.asarray(frame)).resize((thumb_w, thumb_h), Image.LANCZOS)
+    sheet.paste(thumb, (x, y))
+
+    line = script.dialogue[i]
+    name = CHARACTERS.get(line.speaker, {}).get("name", line.speaker)
+    caption = f"#{i + 1} {name} ({line.emotion})"
+    if line.shorts_skip:
+      caption += " *省略"
+    draw.text(
+      (x, y + thumb_h + 4), caption, font=font,
+      fill=_SKIP_COLOR if line.shorts_skip else _LABEL_COLOR,
+    )
+  return sheets
@@ -8,6 +8,7 @@ import numpy as np
 from PIL import Image
 
 from src.config import BG_COLOR, DIALOGUE_LOGO_PATH, FONT_PATH
+from src.utils.image_cache import load_background
 from src.utils.text_renderer import render_text
 
 logger = logging.getLogger(__name__)
@@ -37,8 +38,8 @@ def generate_thumbnail(
 
   # 1) 背景
   if bg_image_path and bg_image_path.exists():
-    canvas = Image.open(bg_image_path).convert("RGBA")
-    canvas = canvas.resize((width, height), Image.LANCZOS)
+    canvas = Image.fromarray(load_background(bg_image_path, THUMBNAIL_SIZE))
+    canvas = canvas.convert("RGBA")
   else:
     canvas = Image.new("RGBA", (width, height), (*BG_COLOR, 255))
 
@@ -1,27 +1,32 @@
 """MoviePy を使った動画合成モジュール（口パク・表情対応）"""
 
+import itertools
 import logging
+import multiprocessing
 import random
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 from moviepy import (
-  AudioFileClip,
   ColorClip,
-  CompositeAudioClip,
   CompositeVideoClip,
   ImageClip,
   VideoClip,
   concatenate_videoclips,
 )
-from moviepy.audio.fx import AudioFadeOut, AudioLoop
 
 from src.config import (
   BG_COLOR,
   BGM_FADE_OUT,
   BGM_PATH,
   BGM_VOLUME,
+  COMPOSE_ALL_CONCURRENT,
   DIALOGUE_LOGO_PATH,
   ENDING_CALL_TEXT,
   ENDING_CALL_VOICE_MEGANE_PATH,
@@ -36,13 +41,20 @@ from src.config import (
   ENDING_VOICE_GAP,
   ENDING_VOICE_MEGANE_PATTERN,
   ENDING_VOICE_TSUNO_PATTERN,
+  FILTERGRAPH_CHUNK_SCENES,
   FONT_PATH,
+  FRAME_CACHE_BYTES,
+  FRAME_RING_SLOTS,
+  FRAME_WORKERS,
   IMAGES_DIR,
-  LANDSCAPE_SIZE,
+  LANDSCAPE_RENDERER,
+  LIPSYNC_CACHE_DIR,
   LIPSYNC_MIN_OPEN_FRAMES,
   LIPSYNC_THRESHOLD,
   OPENING_BG_COLOR,
   OPENING_DURATION,
+  OPENING_ENDING_CACHE_DIR,
+  OPENING_ENDING_CACHE_MAX,
   OPENING_LOGO_PATH,
   OPENING_SE_PATH,
   OPENING_TITLE_COLOR,
@@ -51,95 +63,214 @@ from src.config import (
   OPENING_TITLE_STROKE_WIDTH,
   OPENING_VOICE_MEGANE_PATH,
   OPENING_VOICE_TSUNO_PATH,
-  PORTRAIT_SIZE,
+  RENDER_WORKERS,
   SHORTS_MAX_DURATION,
+  STREAM_MAX_QUEUED_FRAMES,
+  STREAMING_RENDER,
   SUBTITLE_COLOR,
   SUBTITLE_FONT_SIZE,
   SUBTITLE_STROKE_COLOR,
   SUBTITLE_STROKE_WIDTH,
-  VIDEO_FPS,
+  VIDEO_ENCODER,
 )
 from src.models import DialogueLine
-from src.utils.audio_analyzer import analyze_mouth_states
-from src.utils.character_assets import CharacterFrames, load_character_assets
+from src.utils.audio_analyzer import analyze_mouth_states, analyze_mouth_states_batch
+from src.utils.audio_store import load_voice_pcm, voice_duration, voice_envelope
+from src.utils.audio_timeline import AudioTimeline, audio_duration, decode_audio
+from src.utils.character_assets import load_character_assets
+from src.utils.filtergraph import (
+  OUTPUT_LABEL,
+  FiltergraphUnsupported,
+  Overlay,
+  OverlayGraph,
+  missing_filters,
+)
+from src.utils.frame_ring import FrameRing, ParallelFrameSource
+from src.utils.image_cache import load_background
+from src.utils.motion import BounceMotion, MotionTable, SineMotion, table_frames
 from src.utils.reading_annotations import remove_reading_annotations, unwrap_display_only
-from src.utils.text_renderer import render_text
+from src.utils.render_profile import RenderProfile, get_profile
+from src.utils.segment_cache import SegmentCache, file_digest, make_key
+from src.utils.text_renderer import (
+  draw_text,
+  get_font,
+  render_text,
+  text_bbox,
+  wrap_text_by_width,
+)
+from src.utils.video_encoder import (
+  FFmpegPipeWriter,
+  concat_segments,
+  encode_clip,
+  encode_filtergraph,
+  record_encode_stats,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def _mix_bgm(final_clip, bgm_start: float = 0.0):
-  """本編にBGMをミックスする（低音量ループ＋末尾フェードアウト）
+def _mix_bgm(soundtrack: AudioTimeline, bgm_start: float = 0.0) -> None:
+  """音声タイムラインにBGMをミックスする（低音量ループ＋末尾フェードアウト）
 
   Args:
-    final_clip: 結合済みの動画クリップ
+    soundtrack: 本編の音声タイムライン（その場で書き換える）
     bgm_start: BGM開始位置（秒）。OPがある場合はOP長を指定してスキップ。
   """
   if not BGM_PATH.exists():
     logger.info("BGMファイルが見つかりません: %s（BGMスキップ）", BGM_PATH)
-    return final_clip
-
-  bgm = AudioFileClip(str(BGM_PATH))
+    return
 
   # BGM再生区間の長さ
-  bgm_duration = final_clip.duration - bgm_start
+  bgm_duration = soundtrack.duration - bgm_start
   if bgm_duration <= 0:
-    return final_clip
-
-  # 再生区間に合わせてループ
-  if bgm.duration < bgm_duration:
-    bgm = bgm.with_effects([AudioLoop(duration=bgm_duration)])
-  else:
-    bgm = bgm.with_duration(bgm_duration)
-
-  # 音量を下げる＋末尾フェードアウト
-  bgm = bgm.with_volume_scaled(BGM_VOLUME)
-  bgm = bgm.with_effects([AudioFadeOut(BGM_FADE_OUT)])
-
-  # OP分だけ開始位置をずらす
-  bgm = bgm.with_start(bgm_start)
-
-  # 既存音声と合成
-  if final_clip.audio:
-    mixed = CompositeAudioClip([final_clip.audio, bgm]).with_duration(
-      final_clip.duration,
-    )
-    final_clip = final_clip.with_audio(mixed)
-  else:
-    final_clip = final_clip.with_audio(bgm)
+    return
+
+  # 再生区間に合わせてループし、音量を下げる＋末尾フェードアウト
+  # （OP分だけ開始位置をずらす）
+  soundtrack.add(
+    decode_audio(BGM_PATH),
+    start=bgm_start,
+    volume=BGM_VOLUME,
+    duration=bgm_duration,
+    loop=True,
+    fade_out=BGM_FADE_OUT,
+  )
 
   logger.info(
     "BGMミックス完了 (開始%.1fs, 音量%.0f%%, フェードアウト%.1fs)",
     bgm_start, BGM_VOLUME * 100, BGM_FADE_OUT,
   )
-  return final_clip
 
 
-def _create_background_clip(
+def _build_soundtrack(
+  parts: Iterable[tuple[float, np.ndarray | None]],
+  duration: float,
+  bgm_start: float = 0.0,
+  backing: Path | None = None,
+) -> AudioTimeline:
+  """シーンごとの音声を開始秒に配置し、BGM をミックスした本編音声を作る
+
+  Args:
+    parts: (開始秒, PCM 配列) の列。PCM が None のシーンは無音
+      （ジェネレーターを渡せば PCM を1本ずつ読んで手放せる）
+    duration: 本編全体の秒数
+    bgm_start: BGM開始位置（秒）
+    backing: タイムラインのバッファを置くファイル（None ならメモリ上）
+  """
+  soundtrack = AudioTimeline(duration, backing=backing)
+  for start, pcm in parts:
+    if pcm is not None:
+      soundtrack.add(pcm, start)
+  _mix_bgm(soundtrack, bgm_start)
+  return soundtrack
+
+
+def _timeline_samples(audio: AudioTimeline | None) -> np.ndarray | None:
+  """音声タイムラインの PCM（音声が無ければ None）"""
+  return audio.samples if audio is not None else None
+
+
+def _write_video(
+  final,
+  soundtrack: AudioTimeline,
+  output_path: Path,
+  profile: RenderProfile,
+  encoder: str | None = None,
+) -> None:
+  """結合済みクリップと音声タイムラインを指定バックエンドでエンコードする
+
+  Args:
+    final: 出力する動画クリップ（映像のみ）
+    soundtrack: 本編の音声タイムライン（PCM WAV に一度だけ書き出して多重化）
+    output_path: 出力先MP4パス
+    profile: レンダリングプロファイル（fps・エンコード設定）
+    encoder: "moviepy" または "ffmpeg"（None なら VIDEO_ENCODER 設定値）
+  """
+  encoder = encoder or VIDEO_ENCODER
+  if encoder not in ("ffmpeg", "moviepy"):
+    raise ValueError(f"不明なエンコーダー: {encoder}")
+
+  output_path.parent.mkdir(parents=True, exist_ok=True)
+  audio_path = output_path.with_name(output_path.stem + ".pcm.wav")
+  encoding = profile.encoding
+  start = time.time()
+  soundtrack.write_wav(audio_path)
+  try:
+    if encoder == "ffmpeg":
+      encode_clip(
+        final, output_path, profile.fps,
+        codec="libx264", audio_codec="aac", audio_path=audio_path,
+        encoding=encoding,
+      )
+    else:
+      # ピクセル形式は MoviePy が libx264 向けに決める（yuv420p 相当）
+      final.write_videofile(
+        str(output_path),
+        fps=profile.fps,
+        codec="libx264",
+        preset=encoding.preset or "medium",  # None なら MoviePy の既定値
+        threads=encoding.threads,
+        ffmpeg_params=encoding.codec_args(profile.fps) or None,
+        audio=str(audio_path),
+        audio_codec="aac",
+        logger="bar",
+      )
+  finally:
+    audio_path.unlink(missing_ok=True)
+  record_encode_stats(output_path, encoding, final.duration, time.time() - start)
+
+
+def _create_background_array(
   bg_image_path: Path | None,
   size: tuple[int, int],
-  duration: float,
-) -> ImageClip | ColorClip:
-  """背景クリップを生成する（画像があれば使用、なければソリッドカラー）"""
+) -> np.ndarray:
+  """背景のRGB配列を生成する（画像があれば使用、なければソリッドカラー）"""
   if bg_image_path and bg_image_path.exists():
-    img = Image.open(bg_image_path).convert("RGB")
-    img = img.resize(size, Image.LANCZOS)
-    return ImageClip(np.array(img)).with_duration(duration)
-  return ColorClip(size=size, color=BG_COLOR).with_duration(duration)
+    return load_background(bg_image_path, size)
+  width, height = size
+  return np.full((height, width, 3), BG_COLOR, dtype=np.uint8)
+
+
+def _create_opening_audio() -> AudioTimeline | None:
+  """オープニングの音声（SE＋ボイス）を生成する。音声ファイルが無ければ None"""
+  sources = []
+  if OPENING_SE_PATH.exists():
+    sources.append((OPENING_SE_PATH, 1.0))
+  else:
+    logger.warning("SE音声ファイルが見つかりません: %s", OPENING_SE_PATH)
+
+  # SE終了後（約3.5秒）に「へぼだんチャンネル！」ボイスを重ねる
+  voice_start = 3.5
+  if OPENING_VOICE_TSUNO_PATH.exists():
+    sources.append((OPENING_VOICE_TSUNO_PATH, voice_start))
+  if OPENING_VOICE_MEGANE_PATH.exists():
+    sources.append((OPENING_VOICE_MEGANE_PATH, voice_start))
+
+  if not sources:
+    if not OPENING_SE_PATH.exists():
+      logger.warning("オープニング音声ファイルが見つかりません")
+    return None
+  audio = AudioTimeline(OPENING_DURATION)
+  for path, start in sources:
+    audio.add(decode_audio(path), start)
+  return audio
 
 
 def _create_opening_clip(
   title: str,
   size: tuple[int, int],
+  profile: RenderProfile,
 ) -> CompositeVideoClip:
   """オープニングクリップを生成する（ロゴズーム＋タイトル＋SE＋ボイス）
 
   Args:
     title: エピソードタイトル
     size: 動画サイズ (width, height)
+    profile: レンダリングプロファイル（fps・寸法の換算）
   """
   width, height = size
   duration = OPENING_DURATION
+  fps = profile.fps
 
   # --- ロゴ画像の読み込みとサイズ計算 ---
   logo_pil = Image.open(OPENING_LOGO_PATH).convert("RGBA")
@@ -149,7 +280,7 @@ def _create_opening_clip(
   logo_target_w = int(logo_target_h * logo_aspect)
 
   # ズームアニメーション用にスケール別のロゴを事前計算（24fps × 2秒 = 48フレーム）
-  zoom_frames = int(VIDEO_FPS * 2)  # 1.0s-3.0s のズーム区間
+  zoom_frames = int(fps * 2)  # 1.0s-3.0s のズーム区間
   logo_scales = []
   for i in range(zoom_frames):
     progress = i / max(zoom_frames - 1, 1)
@@ -189,9 +320,13 @@ def _create_opening_clip(
 
     return rgb_canvas, alpha_canvas
 
-  def logo_frame(t):
-    if t < 1.0 or t > OPENING_DURATION:
-      return np.zeros((height, width, 3), dtype=np.uint8)
+  # 映像とマスクは同じ時刻に続けて呼ばれるため、直前の時刻の描画結果を使い回す
+  last_logo: dict[float, tuple[np.ndarray, np.ndarray]] = {}
+
+  def _logo_layer(t) -> tuple[np.ndarray, np.ndarray]:
+    cached = last_logo.get(t)
+    if cached is not None:
+      return cached
 
     # オパシティ計算
     if t < 1.5:
@@ -203,50 +338,41 @@ def _create_opening_clip(
 
     # スケール計算
     if t < 3.0:
-      frame_idx = min(int((t - 1.0) * VIDEO_FPS), zoom_frames - 1)
+      frame_idx = min(int((t - 1.0) * fps), zoom_frames - 1)
       logo_arr = logo_scales[frame_idx]
     else:
       logo_arr = logo_full_arr
 
-    rgb, _ = _composite_logo_on_canvas(logo_arr, opacity)
-    return rgb
+    last_logo.clear()
+    last_logo[t] = _composite_logo_on_canvas(logo_arr, opacity)
+    return last_logo[t]
+
+  def logo_frame(t):
+    if t < 1.0 or t > OPENING_DURATION:
+      return np.zeros((height, width, 3), dtype=np.uint8)
+    return _logo_layer(t)[0]
 
   def logo_mask(t):
     if t < 1.0 or t > OPENING_DURATION:
       return np.zeros((height, width), dtype=np.float64)
-
-    if t < 1.5:
-      opacity = (t - 1.0) / 0.5
-    elif t < 6.5:
-      opacity = 1.0
-    else:
-      opacity = max(0.0, 1.0 - (t - 6.5) / 0.5)
-
-    if t < 3.0:
-      frame_idx = min(int((t - 1.0) * VIDEO_FPS), zoom_frames - 1)
-      logo_arr = logo_scales[frame_idx]
-    else:
-      logo_arr = logo_full_arr
-
-    _, alpha = _composite_logo_on_canvas(logo_arr, opacity)
-    return alpha
+    return _logo_layer(t)[1]
 
   # --- ロゴクリップ ---
   logo_clip = VideoClip(frame_function=logo_frame, duration=duration)
-  logo_clip.fps = VIDEO_FPS
+  logo_clip.fps = fps
   logo_mask_clip = VideoClip(
     frame_function=logo_mask, is_mask=True, duration=duration,
   )
-  logo_mask_clip.fps = VIDEO_FPS
+  logo_mask_clip.fps = fps
   logo_clip = logo_clip.with_mask(logo_mask_clip)
 
   # --- タイトルテキスト ---
   title_array = render_text(
     text=title,
     font_path=str(FONT_PATH),
-    font_size=OPENING_TITLE_FONT_SIZE,
+    font_size=profile.px(OPENING_TITLE_FONT_SIZE),
     color=OPENING_TITLE_COLOR,
-    stroke_width=OPENING_TITLE_STROKE_WIDTH,
+    stroke_width=profile.px(OPENING_TITLE_STROKE_WIDTH),
     stroke_color=OPENING_TITLE_STROKE_COLOR,
     max_width=int(width * 0.8),
   )
@@ -270,11 +396,11 @@ def _create_opening_clip(
     return title_base_alpha * opacity
 
   title_clip = VideoClip(frame_function=title_frame, duration=duration)
-  title_clip.fps = VIDEO_FPS
+  title_clip.fps = fps
   title_mask_clip = VideoClip(
     frame_function=title_mask, is_mask=True, duration=duration,
   )
-  title_mask_clip.fps = VIDEO_FPS
+  title_mask_clip.fps = fps
   title_clip = title_clip.with_mask(title_mask_clip)
   # タイトル配置（ロゴの下）
   title_y = logo_center_y + logo_target_h // 2 + int(height * 0.05)
@@ -289,33 +415,7 @@ def _create_opening_clip(
     size=size,
   ).with_duration(duration)
 
-  # --- SE + ボイス音声 ---
-  audio_clips = []
-  if OPENING_SE_PATH.exists():
-    se_audio = AudioFileClip(str(OPENING_SE_PATH))
-    audio_clips.append(se_audio.with_start(1.0))
-  else:
-    logger.warning("SE音声ファイルが見つかりません: %s", OPENING_SE_PATH)
-
-  # SE終了後（約3.5秒）に「へぼだんチャンネル！」ボイスを重ねる
-  voice_start = 3.5
-  if OPENING_VOICE_TSUNO_PATH.exists():
-    audio_clips.append(
-      AudioFileClip(str(OPENING_VOICE_TSUNO_PATH)).with_start(voice_start),
-    )
-  if OPENING_VOICE_MEGANE_PATH.exists():
-    audio_clips.append(
-      AudioFileClip(str(OPENING_VOICE_MEGANE_PATH)).with_start(voice_start),
-    )
-
-  if audio_clips:
-    opening = opening.with_audio(
-      CompositeAudioClip(audio_clips).with_duration(duration),
-    )
-  elif not OPENING_SE_PATH.exists():
-    logger.warning("オープニング音声ファイルが見つかりません")
-
-  opening.fps = VIDEO_FPS
+  opening.fps = fps
   logger.info("オープニングクリップ生成完了 (%.1f秒)", duration)
   return opening
 
@@ -330,55 +430,43 @@ def _pick_random_voice(pattern: str) -> Path | None:
   return chosen
 
 
-def _create_ending_clip(
-  size: tuple[int, int],
-  bg_image_path: Path | None = None,
-) -> CompositeVideoClip | None:
-  """エンディングクリップを生成する（チャンネル登録誘導＋撤収雑談＋フェードアウト）
+def _pick_ending_voices() -> tuple[Path | None, Path | None]:
+  """ED雑談ボイス（つの, めがね）をランダムに選ぶ"""
+  return (
+    _pick_random_voice(ENDING_VOICE_TSUNO_PATTERN),
+    _pick_random_voice(ENDING_VOICE_MEGANE_PATTERN),
+  )
 
-  キャラのみフェードアウトし、テキスト・ロゴは最後まで表示。
-  縦長はキャラがブロック崩しのボールのように跳ね回る。
 
-  ボイスファイルが存在しない場合は None を返す（EDスキップ）。
+def _ending_schedule(
+  voices: tuple[Path | None, Path | None],
+) -> tuple[list[tuple[Path, float]], float, float]:
+  """EDの音声タイムライン（配置する音声と開始秒）を計算する
 
   Args:
-    size: 動画サイズ (width, height)
-    bg_image_path: 本編の背景画像パス
-  """
-  # ボイスファイルの存在チェック（最低限callボイスが必要）
-  if not ENDING_CALL_VOICE_TSUNO_PATH.exists():
-    logger.warning("EDボイスが見つかりません: %s（EDスキップ）", ENDING_CALL_VOICE_TSUNO_PATH)
-    return None
-
-  width, height = size
-  is_portrait = height > width
+    voices: ED雑談ボイス (つの, めがね)。None の要素はスキップ
 
-  # --- 音声読み込みとタイムライン計算 ---
-  call_tsuno = AudioFileClip(str(ENDING_CALL_VOICE_TSUNO_PATH))
-  call_dur = call_tsuno.duration
+  Returns:
+    ((音声パス, 開始秒) のリスト, キャラフェードアウト開始秒, ED全体の秒数)
+  """
+  call_dur = audio_duration(decode_audio(ENDING_CALL_VOICE_TSUNO_PATH))
 
-  audio_clips = []
-  audio_clips.append(call_tsuno.with_start(ENDING_FADE_IN))
+  sources = [(ENDING_CALL_VOICE_TSUNO_PATH, ENDING_FADE_IN)]
   if ENDING_CALL_VOICE_MEGANE_PATH.exists():
-    audio_clips.append(
-      AudioFileClip(str(ENDING_CALL_VOICE_MEGANE_PATH)).with_start(ENDING_FADE_IN),
-    )
+    sources.append((ENDING_CALL_VOICE_MEGANE_PATH, ENDING_FADE_IN))
 
+  tsuno_voice, megane_voice = voices
   tsuno_start = ENDING_FADE_IN + call_dur + ENDING_VOICE_GAP
   tsuno_dur = 0.0
-  tsuno_voice = _pick_random_voice(ENDING_VOICE_TSUNO_PATTERN)
   if tsuno_voice:
-    tsuno_audio = AudioFileClip(str(tsuno_voice))
-    tsuno_dur = tsuno_audio.duration
-    audio_clips.append(tsuno_audio.with_start(tsuno_start))
+    tsuno_dur = audio_duration(decode_audio(tsuno_voice))
+    sources.append((tsuno_voice, tsuno_start))
 
   megane_start = tsuno_start + tsuno_dur + ENDING_VOICE_GAP
   megane_dur = 0.0
-  megane_voice = _pick_random_voice(ENDING_VOICE_MEGANE_PATTERN)
   if megane_voice:
-    megane_audio = AudioFileClip(str(megane_voice))
-    megane_dur = megane_audio.duration
-    audio_clips.append(megane_audio.with_start(megane_start))
+    megane_dur = audio_duration(decode_audio(megane_voice))
+    sources.append((megane_voice, megane_start))
 
   # 総時間: めがね発話開始 + 0.5秒後からキャラ・音声フェードアウト開始
   # フェードアウト後もテキスト・ロゴは0.5秒間表示
@@ -389,6 +477,60 @@ def _create_ending_clip(
     "ED音声タイムライン: call=%.1fs, つの=%.1fs, めがね=%.1fs → 全体=%.1fs",
     call_dur, tsuno_dur, megane_dur, duration,
   )
+  return sources, fade_out_start, duration
+
+
+def _create_ending_audio(
+  voices: tuple[Path | None, Path | None],
+) -> tuple[AudioTimeline, float]:
+  """EDの音声を合成する
+
+  Returns:
+    (フェードアウト適用済み音声, ED全体の秒数)
+  """
+  sources, _, duration = _ending_schedule(voices)
+  audio = AudioTimeline(duration)
+  for path, start in sources:
+    audio.add(decode_audio(path), start)
+  # --- フェードアウト（キャラのフェードアウトと連動） ---
+  audio.fade_out(ENDING_FADE_OUT)
+  return audio, duration
+
+
+def _create_ending_clip(
+  size: tuple[int, int],
+  profile: RenderProfile,
+  bg_image_path: Path | None = None,
+  voices: tuple[Path | None, Path | None] | None = None,
+) -> CompositeVideoClip | None:
+  """エンディングクリップを生成する（チャンネル登録誘導＋撤収雑談＋フェードアウト）
+
+  キャラのみフェードアウトし、テキスト・ロゴは最後まで表示。
+  縦長はキャラがブロック崩しのボールのように跳ね回る。
+
+  ボイスファイルが存在しない場合は None を返す（EDスキップ）。
+
+  Args:
+    size: 動画サイズ (width, height)
+    profile: レンダリングプロファイル（fps・寸法の換算）
+    bg_image_path: 本編の背景画像パス
+    voices: ED雑談ボイス (つの, めがね)。None ならランダムに選ぶ
+  """
+  # ボイスファイルの存在チェック（最低限callボイスが必要）
+  if not ENDING_CALL_VOICE_TSUNO_PATH.exists():
+    logger.warning("EDボイスが見つかりません: %s（EDスキップ）", ENDING_CALL_VOICE_TSUNO_PATH)
+    return None
+
+  width, height = size
+  is_portrait = height > width
+  fps = profile.fps
+  px = profile.px
+
+  # --- 音声タイムライン計算 ---
+  if voices is None:
+    voices = _pick_ending_voices()
+  _, fade_out_start, duration = _ending_schedule(voices)
+  n_frames = table_frames(duration, fps)  # 動きの座標表の長さ
 
   # --- キャラクター画像の読み込み ---
   char_scale = 0.21 if is_portrait else 0.42
@@ -413,9 +555,9 @@ def _create_ending_clip(
   text_array = render_text(
     text=ENDING_CALL_TEXT,
     font_path=str(FONT_PATH),
-    font_size=ENDING_TEXT_FONT_SIZE,
+    font_size=px(ENDING_TEXT_FONT_SIZE),
     color=ENDING_TEXT_COLOR,
-    stroke_width=ENDING_TEXT_STROKE_WIDTH,
+    stroke_width=px(ENDING_TEXT_STROKE_WIDTH),
     stroke_color=ENDING_TEXT_STROKE_COLOR,
     max_width=int(width * 0.85),
   )
@@ -437,8 +579,7 @@ def _create_ending_clip(
 
   # --- 背景 ---
   if bg_image_path and bg_image_path.exists():
-    bg_pil = Image.open(bg_image_path).convert("RGB").resize(size, Image.LANCZOS)
-    bg = ImageClip(np.array(bg_pil)).with_duration(duration)
+    bg = ImageClip(load_background(bg_image_path, size)).with_duration(duration)
   else:
     bg = ColorClip(size=size, color=BG_COLOR).with_duration(duration)
 
@@ -456,11 +597,11 @@ def _create_ending_clip(
       return logo_base_alpha * _static_opacity(t)
 
     logo_clip = VideoClip(frame_function=logo_frame, duration=duration)
-    logo_clip.fps = VIDEO_FPS
+    logo_clip.fps = fps
     logo_mask_clip = VideoClip(
       frame_function=logo_mask, is_mask=True, duration=duration,
     )
-    logo_mask_clip.fps = VIDEO_FPS
+    logo_mask_clip.fps = fps
     logo_clip = logo_clip.with_mask(logo_mask_clip)
 
     if is_portrait:
@@ -468,19 +609,19 @@ def _create_ending_clip(
       logo_by = int(height * 0.38) - logo_h // 2
     else:
       ts_h_raw = tsuno_img.shape[0]
-      char_center_y = int(height * 0.25) + 20
+      char_center_y = int(height * 0.25) + px(20)
       text_area_top = int(height * 0.60)
       tsuno_by_raw = char_center_y - ts_h_raw // 2
       char_bottom = tsuno_by_raw + ts_h_raw
       logo_bx = (width - logo_w) // 2
-      logo_by = (char_bottom + text_area_top) // 2 - logo_h // 2 - 70
-
-    logo_clip = logo_clip.with_position(
-      lambda t, bx=logo_bx, by=logo_by: (
-        bx + int(3 * np.sin(2 * np.pi * 2.5 * t)),
-        by + int(3 * np.sin(2 * np.pi * 3.0 * t + np.pi / 3)),
-      ),
-    )
+      logo_by = (char_bottom + text_area_top) // 2 - logo_h // 2 - px(70)
+
+    jitter = px(3)
+    logo_clip = logo_clip.with_position(SineMotion(
+      logo_bx, logo_by,
+      x_amp=jitter, x_freq=2.5,
+      y_amp=jitter, y_freq=3.0, y_phase=np.pi / 3,
+    ).table(fps, n_frames))
     scene_layers.append(logo_clip)
 
   # --- キャラクタークリップ（フェードアウトあり） ---
@@ -495,80 +636,58 @@ def _create_ending_clip(
       return base_alpha * _char_opacity(t)
 
     clip = VideoClip(frame_function=frame_fn, duration=duration)
-    clip.fps = VIDEO_FPS
+    clip.fps = fps
     mask = VideoClip(frame_function=mask_fn, is_mask=True, duration=duration)
-    mask.fps = VIDEO_FPS
+    mask.fps = fps
     return clip.with_mask(mask)
 
   if is_portrait:
     # --- 縦長: ブロック崩しのボールのように跳ね回る ---
-    def _bounce(val: float, max_val: float) -> float:
-      """値を 0〜max_val 間で跳ね返らせる"""
-      if max_val <= 0:
-        return 0.0
-      period = 2.0 * max_val
-      phase = val % period
-      if phase < 0:
-        phase += period
-      return phase if phase <= max_val else period - phase
-
     tsuno_clip = _make_char_clip(tsuno_img)
     ts_w, ts_h = tsuno_clip.size
     # つの: 左上スタート、右下方向にシュビビン
-    ts_sx, ts_sy = 50.0, 150.0
-    ts_vx, ts_vy = 420.0, 340.0
+    ts_sx, ts_sy = float(px(50)), float(px(150))
+    ts_vx, ts_vy = float(px(420)), float(px(340))
     ts_max_x, ts_max_y = float(width - ts_w), float(height - ts_h)
     tsuno_clip = tsuno_clip.with_position(
-      lambda t, sx=ts_sx, sy=ts_sy, vx=ts_vx, vy=ts_vy,
-      mx=ts_max_x, my=ts_max_y: (
-        int(_bounce(sx + vx * t, mx)),
-        int(_bounce(sy + vy * t, my)),
-      ),
+      BounceMotion(ts_sx, ts_sy, ts_vx, ts_vy, ts_max_x, ts_max_y).table(fps, n_frames),
     )
     scene_layers.append(tsuno_clip)
 
     megane_clip = _make_char_clip(megane_img)
     mg_w, mg_h = megane_clip.size
     # めがね: 右下スタート、左上方向にシュビビン（角度違い）
-    mg_sx = float(width - mg_w - 50)
+    mg_sx = float(width - mg_w - px(50))
     mg_sy = float(height * 0.6)
-    mg_vx, mg_vy = -380.0, 300.0
+    mg_vx, mg_vy = -float(px(380)), float(px(300))
     mg_max_x, mg_max_y = float(width - mg_w), float(height - mg_h)
     megane_clip = megane_clip.with_position(
-      lambda t, sx=mg_sx, sy=mg_sy, vx=mg_vx, vy=mg_vy,
-      mx=mg_max_x, my=mg_max_y: (
-        int(_bounce(sx + vx * t, mx)),
-        int(_bounce(sy + vy * t, my)),
-      ),
+      BounceMotion(mg_sx, mg_sy, mg_vx, mg_vy, mg_max_x, mg_max_y).table(fps, n_frames),
     )
     scene_layers.append(megane_clip)
 
   else:
     # --- 横長: ふわふわ浮遊（従来通り） ---
-    char_center_y = int(height * 0.25) + 20
-    float_amp = 8
+    char_center_y = int(height * 0.25) + px(20)
+    float_amp = px(8)
     float_freq = 0.4
 
     tsuno_clip = _make_char_clip(tsuno_img)
     ts_w, ts_h = tsuno_clip.size
     tsuno_bx = int(width * 0.02)
     tsuno_by = char_center_y - ts_h // 2
-    tsuno_clip = tsuno_clip.with_position(
-      lambda t, bx=tsuno_bx, by=tsuno_by: (
-        bx, by + int(float_amp * np.sin(2 * np.pi * float_freq * t))
-      ),
-    )
+    tsuno_clip = tsuno_clip.with_position(SineMotion(
+      tsuno_bx, tsuno_by, y_amp=float_amp, y_freq=float_freq,
+    ).table(fps, n_frames))
     scene_layers.append(tsuno_clip)
 
     megane_clip = _make_char_clip(megane_img)
     mg_w, mg_h = megane_clip.size
     megane_bx = width - mg_w - int(width * 0.02)
     megane_by = char_center_y - mg_h // 2
-    megane_clip = megane_clip.with_position(
-      lambda t, bx=megane_bx, by=megane_by: (
-        bx, by + int(float_amp * np.sin(2 * np.pi * float_freq * t + np.pi / 2))
-      ),
-    )
+    megane_clip = megane_clip.with_position(SineMotion(
+      megane_bx, megane_by, y_amp=float_amp, y_freq=float_freq, y_phase=np.pi / 2,
+    ).table(fps, n_frames))
     scene_layers.append(megane_clip)
 
   # --- テキストクリップ（消えない） ---
@@ -583,199 +702,406 @@ def _create_ending_clip(
     return text_base_alpha * _static_opacity(t)
 
   text_clip = VideoClip(frame_function=text_frame, duration=duration)
-  text_clip.fps = VIDEO_FPS
+  text_clip.fps = fps
   text_mask_clip = VideoClip(
     frame_function=text_mask, is_mask=True, duration=duration,
   )
-  text_mask_clip.fps = VIDEO_FPS
+  text_mask_clip.fps = fps
   text_clip = text_clip.with_mask(text_mask_clip)
 
   if is_portrait:
     subtitle_y = int(height * 0.70) - text_h // 2
   else:
     text_area_top = int(height * 0.60)
-    subtitle_y = text_area_top + (height - text_area_top - text_h) // 2 - 50
+    subtitle_y = text_area_top + (height - text_area_top - text_h) // 2 - px(50)
   text_clip = text_clip.with_position(("center", subtitle_y))
   scene_layers.append(text_clip)
 
   # --- 合成 ---
   ending = CompositeVideoClip(scene_layers, size=size).with_duration(duration)
 
-  # --- 音声合成（フェードアウト連動） ---
-  if audio_clips:
-    composite_audio = CompositeAudioClip(audio_clips).with_duration(duration)
-    composite_audio = composite_audio.with_effects([AudioFadeOut(ENDING_FADE_OUT)])
-    ending = ending.with_audio(composite_audio)
-
-  ending.fps = VIDEO_FPS
+  ending.fps = fps
   logger.info("エンディングクリップ生成完了 (%.1f秒)", duration)
   return ending
 
 
-def _apply_brightness(image_array: np.ndarray, factor: float) -> np.ndarray:
-  """画像の明るさを調整する（RGBA対応）"""
-  result = image_array.copy().astype(np.float32)
-  # RGB チャンネルのみ明るさ調整（アルファは維持）
-  result[:, :, :3] = np.clip(result[:, :, :3] * factor, 0, 255)
-  return result.astype(np.uint8)
+# --- NumPy フレーム合成 ---
 
+# スプライトの通し番号（合成済みフレームキャッシュのキーに使う。id() と違い再利用されない）
+_sprite_uids = itertools.count()
 
-def _create_subtitle_clip(
-  text: str, duration: float, max_width: int
-) -> ImageClip:
-  """字幕用のImageClipを生成する"""
-  subtitle_array = render_text(
-    text=text,
-    font_path=str(FONT_PATH),
-    font_size=SUBTITLE_FONT_SIZE,
-    color=SUBTITLE_COLOR,
-    stroke_width=SUBTITLE_STROKE_WIDTH,
-    stroke_color=SUBTITLE_STROKE_COLOR,
-    max_width=max_width,
-  )
-  return ImageClip(subtitle_array, transparent=True).with_duration(duration)
 
+@dataclass
+class _Sprite:
+  """乗算済みアルファ形式の合成用画像
 
-def _create_static_character_clip(
-  assets: CharacterFrames,
-  emotion: str,
-  duration: float,
-  brightness: float,
-  scale: float,
-) -> ImageClip:
-  """静止画のキャラクタークリップを生成する（非アクティブ話者用）"""
-  img = assets.mouth_closed.get(emotion, assets.mouth_closed["normal"])
-  img = _apply_brightness(img, brightness)
-  clip = (
-    ImageClip(img, transparent=True)
-    .with_duration(duration)
-    .resized(scale)
+  premul は RGB × α / 255、inv_alpha は 255 - α を保持し、
+  合成時は uint16 の整数演算だけでブレンドできる。
+  """
+  premul: np.ndarray     # (h, w, 3) uint8
+  inv_alpha: np.ndarray  # (h, w, 1) uint16
+  uid: int = field(default_factory=lambda: next(_sprite_uids), compare=False)
+
+  @property
+  def size(self) -> tuple[int, int]:
+    """(width, height) を返す"""
+    h, w = self.premul.shape[:2]
+    return w, h
+
+  def rgba(self) -> np.ndarray:
+    """乗算済み RGB ＋ α の RGBA 配列（ffmpeg overlay の alpha=premultiplied 用）"""
+    alpha = (255 - self.inv_alpha).astype(np.uint8)
+    return np.concatenate([self.premul, alpha], axis=2)
+
+
+def _make_sprite(image_array: np.ndarray) -> _Sprite:
+  """RGBA（またはRGB）配列から合成用スプライトを生成する"""
+  if image_array.shape[2] == 3:
+    h, w = image_array.shape[:2]
+    return _Sprite(
+      premul=np.ascontiguousarray(image_array),
+      inv_alpha=np.zeros((h, w, 1), dtype=np.uint16),
+    )
+  alpha = image_array[:, :, 3:4].astype(np.uint16)
+  premul = (image_array[:, :, :3].astype(np.uint16) * alpha + 127) // 255
+  return _Sprite(
+    premul=premul.astype(np.uint8),
+    inv_alpha=255 - alpha,
   )
-  return clip
 
 
-def _create_animated_character_clip(
-  assets: CharacterFrames,
-  emotion: str,
-  mouth_states: np.ndarray,
-  duration: float,
-  brightness: float,
-  scale: float,
-  fps: int,
-) -> VideoClip:
-  """口パク・表情付きのキャラクタークリップを生成する
+@dataclass
+class _Layer:
+  """合成レイヤー（スプライト候補＋動き＋フレームごとのスプライト選択）"""
+  sprites: list[_Sprite]
+  position: SineMotion
+  select: Callable[[int], int] | None = None  # フレーム番号 → sprites のインデックス
 
-  Args:
-    assets: キャラクターの全画像セット
-    emotion: 感情名（"normal", "happy", ...）
-    mouth_states: フレームごとの口開閉 bool 配列
-    duration: クリップの長さ（秒）
-    brightness: 明るさ係数
-    scale: 拡大率
-    fps: フレームレート
-  """
-  # 表情に合った画像を取得（なければ normal にフォールバック）
-  closed_img = _apply_brightness(
-    assets.mouth_closed.get(emotion, assets.mouth_closed["normal"]),
-    brightness,
-  )
-  open_img = _apply_brightness(
-    assets.mouth_open.get(emotion, assets.mouth_open["normal"]),
-    brightness,
-  )
 
-  # RGBA を RGB + アルファに分離
-  closed_rgb = closed_img[:, :, :3]
-  closed_alpha = closed_img[:, :, 3].astype(np.float64) / 255.0
-  open_rgb = open_img[:, :, :3]
-  open_alpha = open_img[:, :, 3].astype(np.float64) / 255.0
-
-  def frame_function(t):
-    frame_idx = min(int(t * fps), len(mouth_states) - 1)
-    if mouth_states[frame_idx]:
-      return open_rgb
-    return closed_rgb
-
-  def mask_function(t):
-    frame_idx = min(int(t * fps), len(mouth_states) - 1)
-    if mouth_states[frame_idx]:
-      return open_alpha
-    return closed_alpha
-
-  clip = VideoClip(frame_function=frame_function, duration=duration)
-  clip.fps = fps
-  mask_clip = VideoClip(
-    frame_function=mask_function, is_mask=True, duration=duration,
-  )
-  mask_clip.fps = fps
-  clip = clip.with_mask(mask_clip)
+def _static_position(x: int, y: int) -> SineMotion:
+  """固定位置の動きを返す"""
+  return SineMotion(x, y)
 
-  if scale != 1.0:
-    clip = clip.resized(scale)
 
-  return clip
+def _blend_sprite(canvas: np.ndarray, sprite: _Sprite, x: int, y: int) -> None:
+  """キャンバスの (x, y) にスプライトをインプレースで重ねる（はみ出しはクリップ）"""
+  ch, cw = canvas.shape[:2]
+  sw, sh = sprite.size
+  x1, y1 = max(0, x), max(0, y)
+  x2, y2 = min(cw, x + sw), min(ch, y + sh)
+  if x2 <= x1 or y2 <= y1:
+    return
+  sx1, sy1 = x1 - x, y1 - y
+  sx2, sy2 = sx1 + (x2 - x1), sy1 + (y2 - y1)
 
+  region = canvas[y1:y2, x1:x2]
+  # dst × (255 - α) / 255 を丸め付き整数演算で計算し、乗算済みRGBを加算
+  acc = region * sprite.inv_alpha[sy1:sy2, sx1:sx2]
+  acc += 128
+  acc += acc >> 8
+  acc >>= 8
+  acc += sprite.premul[sy1:sy2, sx1:sx2]
+  region[...] = acc
 
-def compose_landscape(
-  dialogue: list[DialogueLine],
-  audio_paths: list[Path],
-  output_path: Path,
-  bg_image_path: Path | None = None,
-  title: str = "",
-) -> None:
-  """16:9 横長動画を合成する（口パク・表情対応）
 
-  Args:
-    dialogue: セリフリスト
-    audio_paths: 各セリフに対応するWAVファイルパスのリスト
-    output_path: 出力先MP4パス
-    bg_image_path: 背景画像パス（Noneの場合はソリッドカラー）
-    title: エピソードタイトル（空文字ならOPスキップ）
-  """
-  width, height = LANDSCAPE_SIZE
-  char_height = int(height * 0.42)  # キャラ小さめ（元の60%）
+class _FrameCache:
+  """合成済みフレームの LRU キャッシュ（保持するバイト数で上限を決める）
 
-  # キャラクター画像セットを事前読み込み
-  tsuno_assets = load_character_assets("tsuno", char_height)
-  megane_assets = load_character_assets("megane", char_height)
+  キーは各レイヤーの (スプライト番号, x, y) の列。同じ背景のフレームだけを
+  入れること（背景はキーに含めない）。キャラの浮遊・ロゴの震えは整数ピクセルに
+  丸めた位置で数秒ごとに同じ状態へ戻るため、口パクの状態が同じフレームは
+  セリフ内・セリフ間で合成し直さずに済む。
+  """
 
-  # ダイアログシーン用ロゴ（事前読み込み）
-  dialogue_logo_arr = None
-  dialogue_logo_w = dialogue_logo_h = 0
-  if DIALOGUE_LOGO_PATH.exists():
-    _logo_pil = Image.open(DIALOGUE_LOGO_PATH).convert("RGBA")
-    dialogue_logo_h = int(height * 0.36)
-    _logo_aspect = _logo_pil.width / _logo_pil.height
-    dialogue_logo_w = int(dialogue_logo_h * _logo_aspect)
-    _logo_pil = _logo_pil.resize(
-      (dialogue_logo_w, dialogue_logo_h), Image.LANCZOS,
+  def __init__(self, max_bytes: int):
+    self.max_bytes = max_bytes
+    self.nbytes = 0
+    self.hits = 0
+    self.misses = 0
+    self._frames: dict[tuple, np.ndarray] = {}
+
+  def get(self, key: tuple) -> np.ndarray | None:
+    """キャッシュ済みのフレーム（読み取り専用）を返す（無ければ None）"""
+    frame = self._frames.pop(key, None)
+    if frame is None:
+      self.misses += 1
+      return None
+    # 最近使ったフレームとして末尾へ入れ直す
+    self._frames[key] = frame
+    self.hits += 1
+    return frame
+
+  def put(self, key: tuple, frame: np.ndarray) -> np.ndarray:
+    """フレームのコピーを格納して返す（上限を超えたら古いものから捨てる）"""
+    if frame.nbytes > self.max_bytes:
+      return frame
+    stored = frame.copy()
+    stored.flags.writeable = False
+    self._frames[key] = stored
+    self.nbytes += stored.nbytes
+    while self.nbytes > self.max_bytes:
+      oldest = next(iter(self._frames))
+      self.nbytes -= self._frames.pop(oldest).nbytes
+    return stored
+
+  @property
+  def hit_rate(self) -> float:
+    lookups = self.hits + self.misses
+    return self.hits / lookups if lookups else 0.0
+
+  def log_stats(self, label: str) -> None:
+    """ヒット率と使用量をログに出す（一度も参照されていなければ何もしない）"""
+    if not self.hits + self.misses:
+      return
+    logger.info(
+      "フレームキャッシュ(%s): ヒット率 %.1f%% (%d/%d), %d フレーム, %.1f MB",
+      label, self.hit_rate * 100, self.hits, self.hits + self.misses,
+      len(self._frames), self.nbytes / 1e6,
     )
-    dialogue_logo_arr = np.array(_logo_pil)
 
-  # レイアウト定数
-  char_center_y = int(height * 0.25) + 20  # キャラ中心（上寄り + 20px下）
-  text_area_top = int(height * 0.60)  # 下部40%をテロップエリアに
-  float_amp = 8    # ふわふわ振幅（px）
-  float_freq = 0.4  # ふわふわ周波数（Hz）
 
-  clips = []
+class _FrameCompositor:
+  """背景＋レイヤー列から1フレームを一括合成するコンポジター
 
-  # オープニングクリップ
-  if title and OPENING_LOGO_PATH.exists():
-    opening = _create_opening_clip(title, (width, height))
-    clips.append(opening)
+  CompositeVideoClip のようにレイヤーごとの frame_function / mask_function や
+  float64 マスクを経由せず、再利用する出力バッファへ直接ブレンドする。
+  レイヤーの位置は to_clip で作る座標表をフレーム番号で引く。
+  cache を渡すと、各レイヤーのスプライトと位置が同じフレームは合成済みのものを返す。
+  """
 
-  for i, (line, audio_path) in enumerate(zip(dialogue, audio_paths)):
-    audio = AudioFileClip(str(audio_path))
-    duration = audio.duration
+  def __init__(
+    self,
+    background: np.ndarray,
+    layers: list[_Layer],
+    fps: int,
+    cache: _FrameCache | None = None,
+  ):
+    self._background = np.ascontiguousarray(background[:, :, :3], dtype=np.uint8)
+    self._layers = layers
+    self._fps = fps
+    self._buffer = np.empty_like(self._background)
+    self._cache = cache
+    self._tables: list[MotionTable] = []
+
+  @property
+  def size(self) -> tuple[int, int]:
+    """(width, height) を返す"""
+    h, w = self._background.shape[:2]
+    return w, h
+
+  def build_tables(self, n_frames: int) -> None:
+    """各レイヤーの先頭 n_frames フレームの座標表を作る"""
+    self._tables = [layer.position.table(self._fps, n_frames) for layer in self._layers]
+
+  def render(self, t: float) -> np.ndarray:
+    """時刻 t のフレームを合成して返す（build_tables の後に呼ぶ）
+
+    戻り値のバッファは次の呼び出しで上書きされる。キャッシュから返すフレームは
+    読み取り専用。
+    """
+    # MoviePy が渡す t = i / fps は浮動小数の誤差で i をわずかに下回ることがあるため丸める
+    # （MotionTable と同じ換算）
+    frame_idx = round(t * self._fps)
+    placements = []
+    for layer, table in zip(self._layers, self._tables):
+      idx = layer.select(frame_idx) if layer.select else 0
+      placements.append((layer.sprites[idx], *table.at(frame_idx)))
+
+    key = None
+    if self._cache is not None:
+      key = tuple((sprite.uid, x, y) for sprite, x, y in placements)
+      cached = self._cache.get(key)
+      if cached is not None:
+        return cached
+
+    canvas = self._buffer
+    np.copyto(canvas, self._background)
+    for sprite, x, y in placements:
+      _blend_sprite(canvas, sprite, x, y)
+    if key is not None:
+      return self._cache.put(key, canvas)
+    return canvas
+
+  def to_clip(self, duration: float) -> VideoClip:
+    """MoviePy の VideoClip としてラップする"""
+    self.build_tables(table_frames(duration, self._fps))
+    clip = VideoClip(frame_function=self.render, duration=duration)
+    clip.fps = self._fps
+    return clip
+
+  def to_overlays(self, graph: OverlayGraph, n_frames: int) -> list[Overlay]:
+    """先頭 n_frames フレームの描画を、graph に次に追加するシーンの overlay 指定に変換する
+
+    スプライトは graph に登録し、フレームごとのスプライト選択は表示フレームにする。
+
+    Raises:
+      FiltergraphUnsupported: 動きが式に変換できない（SineMotion でない）場合
+    """
+    index = graph.scene_index_expr()
+    overlays = []
+    for layer in self._layers:
+      motion = layer.position
+      if not isinstance(motion, SineMotion):
+        raise FiltergraphUnsupported(f"動きを式に変換できません: {motion!r}")
+      x, y = motion.ffmpeg_expr(index, self._fps)
+      chosen = np.zeros(n_frames, dtype=np.int64)
+      if layer.select:
+        chosen[:] = [layer.select(i) for i in range(n_frames)]
+      for idx, sprite in enumerate(layer.sprites):
+        frames = chosen == idx
+        w, h = sprite.size
+        if not frames.any() or w == 0 or h == 0:
+          continue
+        overlays.append(Overlay(
+          image=graph.add_image(sprite.rgba()), x=x, y=y,
+          frames=None if frames.all() else frames, per_frame=not motion.is_static,
+        ))
+    return overlays
+
+
+def _render_subtitle(text: str, max_width: int, profile: RenderProfile) -> np.ndarray:
+  """字幕画像（RGBA配列）を描画する"""
+  return render_text(
+    text=text,
+    font_path=str(FONT_PATH),
+    font_size=profile.px(SUBTITLE_FONT_SIZE),
+    color=SUBTITLE_COLOR,
+    stroke_width=profile.px(SUBTITLE_STROKE_WIDTH),
+    stroke_color=SUBTITLE_STROKE_COLOR,
+    max_width=max_width,
+  )
 
-    logger.info(
-      "動画合成(横) [%d/%d]: %s (%.1f秒)",
-      i + 1, len(dialogue), line.text[:15], duration,
+
+def _create_character_layer(
+  sprites: tuple[_Sprite, _Sprite],
+  mouth_states: np.ndarray | None,
+  position: SineMotion | None = None,
+) -> _Layer:
+  """キャラクターの合成レイヤーを生成する
+
+  スプライトはレイアウト側で加工済みのものを受け取り、フレームごとの処理は
+  口パク状態に応じたスプライトの選択のみとする。
+
+  Args:
+    sprites: (口閉じ, 口開き) のスプライト
+    mouth_states: フレームごとの口開閉 bool 配列（None なら口閉じ静止画）
+    position: 動き（省略時は原点固定。サイズ確定後に差し替える想定）
+  """
+  closed_sprite, open_sprite = sprites
+  if mouth_states is None or len(mouth_states) == 0:
+    return _Layer(
+      sprites=[closed_sprite],
+      position=position or _static_position(0, 0),
     )
 
-    # 背景
-    bg = _create_background_clip(bg_image_path, (width, height), duration)
+  last = len(mouth_states) - 1
+
+  def select(frame_idx: int) -> int:
+    return 1 if mouth_states[min(frame_idx, last)] else 0
+
+  return _Layer(
+    sprites=[closed_sprite, open_sprite],
+    position=position or _static_position(0, 0),
+    select=select,
+  )
+
+
+class _LandscapeLayout:
+  """16:9 横長レイアウトのセリフシーン生成器
+
+  キャラクター画像・ロゴ・背景は生成時に一度だけ読み込み、
+  build_scene でセリフごとのシーンクリップ（映像のみ）を組み立てる。
+  寸法はレンダリングプロファイルの解像度に合わせて換算する。
+  """
+
+  def __init__(self, bg_image_path: Path | None, profile: RenderProfile):
+    self.profile = profile
+    self.size = profile.size("landscape")
+    width, height = self.size
+    char_height = int(height * 0.42)  # キャラ小さめ（元の60%）
+
+    # キャラクター画像セットを事前読み込み
+    self.tsuno_assets = load_character_assets("tsuno", char_height)
+    self.megane_assets = load_character_assets("megane", char_height)
+    # (話者, 表情, アクティブ) ごとの合成用スプライト（初回使用時に作成し全シーンで共有）
+    self._char_sprites: dict[tuple[str, str, bool], tuple[_Sprite, _Sprite]] = {}
+
+    # ダイアログシーン用ロゴ（事前読み込み）
+    self.logo_sprite = None
+    self.logo_w = self.logo_h = 0
+    if DIALOGUE_LOGO_PATH.exists():
+      _logo_pil = Image.open(DIALOGUE_LOGO_PATH).convert("RGBA")
+      self.logo_h = int(height * 0.36)
+      _logo_aspect = _logo_pil.width / _logo_pil.height
+      self.logo_w = int(self.logo_h * _logo_aspect)
+      _logo_pil = _logo_pil.resize((self.logo_w, self.logo_h), Image.LANCZOS)
+      self.logo_sprite = _make_sprite(np.array(_logo_pil))
+
+    # 背景は全シーン共通なので一度だけ準備する
+    self.bg_array = _create_background_array(bg_image_path, self.size)
+    # 合成済みフレーム（背景が共通なので全シーンで共有する）
+    self.frame_cache = _FrameCache(FRAME_CACHE_BYTES) if FRAME_CACHE_BYTES > 0 else None
+
+    # レイアウト定数
+    self.char_center_y = int(height * 0.25) + profile.px(20)  # キャラ中心（上寄り + 20px下）
+    self.text_area_top = int(height * 0.60)  # 下部40%をテロップエリアに
+    self.float_amp = profile.px(8)    # ふわふわ振幅（px）
+    self.float_freq = 0.4  # ふわふわ周波数（Hz）
+
+  def _character_sprites(
+    self,
+    speaker: str,
+    emotion: str,
+    active: bool,
+  ) -> tuple[_Sprite, _Sprite]:
+    """話者の (口閉じ, 口開き) スプライトを返す
+
+    アクティブ話者は 1.1 倍・通常の明るさ、非アクティブは等倍・明るさ 50%。
+    """
+    key = (speaker, emotion, active)
+    sprites = self._char_sprites.get(key)
+    if sprites is None:
+      assets = self.tsuno_assets if speaker == "tsuno" else self.megane_assets
+      brightness, scale = (1.0, 1.1) if active else (0.5, 1.0)
+      sprites = (
+        _make_sprite(assets.variant(emotion, False, brightness, scale)),
+        _make_sprite(assets.variant(emotion, True, brightness, scale)),
+      )
+      self._char_sprites[key] = sprites
+    return sprites
+
+  def prepare_sprites(self, dialogue: list[DialogueLine]) -> None:
+    """台本で使う全キャラクタースプライトを先に作る（fork するワーカーと共有するため）"""
+    for line in dialogue:
+      emotion = getattr(line, "emotion", "normal") or "normal"
+      for speaker in ("tsuno", "megane"):
+        self._character_sprites(speaker, emotion, line.speaker == speaker)
+
+  def build_scene(
+    self,
+    line: DialogueLine,
+    audio_path: Path | None,
+    duration: float,
+  ) -> VideoClip:
+    """1セリフ分のシーンクリップ（音声なし）を生成する
+
+    audio_path が None なら口パクなし（口閉じ静止）で組み立てる（絵コンテ用）。
+    """
+    return self.build_compositor(line, audio_path).to_clip(duration)
+
+  def build_compositor(
+    self,
+    line: DialogueLine,
+    audio_path: Path | None,
+  ) -> _FrameCompositor:
+    """1セリフ分のレイヤー構成（背景・ロゴ・キャラ・字幕）をコンポジターとして組み立てる"""
+    width, height = self.size
+    px = self.profile.px
+    fps = self.profile.fps
+    char_center_y = self.char_center_y
+    text_area_top = self.text_area_top
+    float_amp = self.float_amp
+    float_freq = self.float_freq
 
     # アクティブスピーカー判定
     tsuno_active = line.speaker == "tsuno"
@@ -783,139 +1109,258 @@ def compose_landscape(
     emotion = getattr(line, "emotion", "normal") or "normal"
 
     # 口パク解析
-    mouth_states = analyze_mouth_states(
-      audio_path, VIDEO_FPS,
-      threshold=LIPSYNC_THRESHOLD,
-      min_open_frames=LIPSYNC_MIN_OPEN_FRAMES,
-    )
-
-    # つのクリップ生成
-    tsuno_brightness = 1.0 if tsuno_active else 0.5
-    tsuno_scale = 1.1 if tsuno_active else 1.0
-    if tsuno_active:
-      tsuno_clip = _create_animated_character_clip(
-        tsuno_assets, emotion, mouth_states, duration,
-        tsuno_brightness, tsuno_scale, VIDEO_FPS,
-      )
-    else:
-      tsuno_clip = _create_static_character_clip(
-        tsuno_assets, emotion, duration,
-        tsuno_brightness, tsuno_scale,
+    mouth_states = None
+    if audio_path is not None:
+      mouth_states = analyze_mouth_states(
+        audio_path, fps,
+        threshold=LIPSYNC_THRESHOLD,
+        min_open_frames=LIPSYNC_MIN_OPEN_FRAMES,
+        cache_dir=LIPSYNC_CACHE_DIR,
+        envelope=voice_envelope(audio_path, fps),
       )
 
+    # つのレイヤー生成（アクティブ時のみ口パク）
+    tsuno_layer = _create_character_layer(
+      self._character_sprites("tsuno", emotion, tsuno_active),
+      mouth_states if tsuno_active else None,
+    )
+
     # つの位置（左・ふわふわ浮遊）
-    ts_w, ts_h = tsuno_clip.size
+    ts_w, ts_h = tsuno_layer.sprites[0].size
     tsuno_bx = int(width * 0.02)
     tsuno_by = char_center_y - ts_h // 2
-    tsuno_clip = tsuno_clip.with_position(
-      lambda t, bx=tsuno_bx, by=tsuno_by: (
-        bx, by + int(float_amp * np.sin(2 * np.pi * float_freq * t))
-      ),
+    tsuno_layer.position = SineMotion(
+      tsuno_bx, tsuno_by, y_amp=float_amp, y_freq=float_freq,
     )
 
-    # めがねクリップ生成
-    megane_brightness = 1.0 if megane_active else 0.5
-    megane_scale = 1.1 if megane_active else 1.0
-    if megane_active:
-      megane_clip = _create_animated_character_clip(
-        megane_assets, emotion, mouth_states, duration,
-        megane_brightness, megane_scale, VIDEO_FPS,
-      )
-    else:
-      megane_clip = _create_static_character_clip(
-        megane_assets, emotion, duration,
-        megane_brightness, megane_scale,
-      )
+    # めがねレイヤー生成
+    megane_layer = _create_character_layer(
+      self._character_sprites("megane", emotion, megane_active),
+      mouth_states if megane_active else None,
+    )
 
     # めがね位置（右・ふわふわ浮遊、位相ずれ）
-    mg_w, mg_h = megane_clip.size
+    mg_w, mg_h = megane_layer.sprites[0].size
     megane_bx = width - mg_w - int(width * 0.02)
     megane_by = char_center_y - mg_h // 2
-    megane_clip = megane_clip.with_position(
-      lambda t, bx=megane_bx, by=megane_by: (
-        bx, by + int(float_amp * np.sin(2 * np.pi * float_freq * t + np.pi / 2))
-      ),
+    megane_layer.position = SineMotion(
+      megane_bx, megane_by, y_amp=float_amp, y_freq=float_freq, y_phase=np.pi / 2,
     )
 
-    scene_layers = [bg, tsuno_clip, megane_clip]
+    scene_layers = [tsuno_layer, megane_layer]
 
     # ロゴ（中央・プルプル震え）
-    if dialogue_logo_arr is not None:
-      logo_clip = (
-        ImageClip(dialogue_logo_arr, transparent=True).with_duration(duration)
-      )
-      logo_bx = (width - dialogue_logo_w) // 2
+    if self.logo_sprite is not None:
+      logo_bx = (width - self.logo_w) // 2
       char_bottom = max(tsuno_by + ts_h, megane_by + mg_h)
-      logo_by = (char_bottom + text_area_top) // 2 - dialogue_logo_h // 2 - 70
-      logo_clip = logo_clip.with_position(
-        lambda t, bx=logo_bx, by=logo_by: (
-          bx + int(3 * np.sin(2 * np.pi * 2.5 * t)),
-          by + int(3 * np.sin(2 * np.pi * 3.0 * t + np.pi / 3)),
+      logo_by = (char_bottom + text_area_top) // 2 - self.logo_h // 2 - px(70)
+      jitter = px(3)
+      logo_layer = _Layer(
+        sprites=[self.logo_sprite],
+        position=SineMotion(
+          logo_bx, logo_by,
+          x_amp=jitter, x_freq=2.5,
+          y_amp=jitter, y_freq=3.0, y_phase=np.pi / 3,
         ),
       )
-      scene_layers.insert(1, logo_clip)  # 背景の上、キャラの下
+      scene_layers.insert(0, logo_layer)  # 背景の上、キャラの下
 
     # 字幕（下部40%エリア中央）— [[表示専用]]を展開し、読みアノテーションを除去して表示
     display_text = unwrap_display_only(remove_reading_annotations(line.text)).replace("\u301c", "\uff5e")
-    subtitle = _create_subtitle_clip(
-      display_text, duration, max_width=int(width * 0.85),
+    subtitle_sprite = _make_sprite(
+      _render_subtitle(display_text, int(width * 0.85), self.profile),
     )
-    sub_h = subtitle.size[1]
-    subtitle_y = text_area_top + (height - text_area_top - sub_h) // 2 - 50
-    subtitle = subtitle.with_position(("center", subtitle_y))
-    scene_layers.append(subtitle)
-
-    # セリフクリップを合成
-    scene = CompositeVideoClip(
-      scene_layers,
-      size=(width, height),
-    ).with_duration(duration).with_audio(audio)
-
-    clips.append(scene)
+    sub_w, sub_h = subtitle_sprite.size
+    subtitle_y = text_area_top + (height - text_area_top - sub_h) // 2 - px(50)
+    scene_layers.append(_Layer(
+      sprites=[subtitle_sprite],
+      position=_static_position((width - sub_w) // 2, subtitle_y),
+    ))
 
-  # エンディングクリップ
-  ending = _create_ending_clip((width, height), bg_image_path)
-  if ending:
-    clips.append(ending)
+    # セリフシーンを1パスで合成
+    return _FrameCompositor(self.bg_array, scene_layers, fps, cache=self.frame_cache)
 
-  # 全セリフを結合して出力
-  final = concatenate_videoclips(clips, method="compose")
-  has_op = title and OPENING_LOGO_PATH.exists()
-  final = _mix_bgm(final, bgm_start=OPENING_DURATION if has_op else 0.0)
-  output_path.parent.mkdir(parents=True, exist_ok=True)
-  final.write_videofile(
-    str(output_path),
-    fps=VIDEO_FPS,
-    codec="libx264",
-    audio_codec="aac",
-    logger="bar",
-  )
-  final.close()
-  logger.info("横長動画出力完了: %s", output_path)
 
+def _check_pipe_encoder(encoder: str | None, mode: str) -> None:
+  """ffmpeg パイプでのみ書き出す描画方式（セグメント・ストリーミング）で encoder を確認する
 
-# --- LINE チャット風縦動画ヘルパー ---
+  "moviepy" を明示した場合は例外を出し、設定値（VIDEO_ENCODER）が "moviepy" の
+  場合は使わないことをログに出す。
+  """
+  if encoder is None:
+    if VIDEO_ENCODER == "moviepy":
+      logger.info("%sは ffmpeg パイプで書き出します（VIDEO_ENCODER=moviepy は使いません）", mode)
+    return
+  if encoder not in ("ffmpeg", "moviepy"):
+    raise ValueError(f"不明なエンコーダー: {encoder}")
+  if encoder == "moviepy":
+    raise ValueError(f"{mode}は ffmpeg パイプでのみ書き出すため encoder='moviepy' は指定できません")
 
-# チャットレイアウト定数
-_CHAT_ICON_SIZE = 100
-_CHAT_ICON_MARGIN = 30
-_CHAT_ICON_GAP = 12
-_CHAT_BUBBLE_MAX_WIDTH = 700
-_CHAT_BUBBLE_PADDING = 20
-_CHAT_BUBBLE_RADIUS = 20
-_CHAT_MSG_SPACING = 25
-_CHAT_FONT_SIZE = 36
-_CHAT_BOTTOM_MARGIN = 150
-_CHAT_TSUNO_COLOR = (92, 210, 96)     # LINE グリーン
-_CHAT_MEGANE_COLOR = (255, 255, 255)  # 白
-_CHAT_TSUNO_TEXT = (255, 255, 255)    # 白文字
-_CHAT_MEGANE_TEXT = (30, 30, 30)      # 黒文字
-_CHAT_PAST_OPACITY = 0.7
 
+def compose_landscape(
+  dialogue: list[DialogueLine],
+  audio_paths: list[Path],
+  output_path: Path,
+  bg_image_path: Path | None = None,
+  title: str = "",
+  encoder: str | None = None,
+  workers: int | None = None,
+  cache_dir: Path | None = None,
+  stream: bool | None = None,
+  profile: str | None = None,
+  renderer: str | None = None,
+  frame_workers: int | None = None,
+) -> None:
+  """16:9 横長動画を合成する（口パク・表情対応）
 
-def _make_circular_icon(img_path: Path, size: int) -> Image.Image:
-  """画像を正方形にクロップし円形マスクを適用した RGBA Image を返す"""
-  img = Image.open(img_path).convert("RGBA")
+  Args:
+    dialogue: セリフリスト
+    audio_paths: 各セリフに対応するWAVファイルパスのリスト
+    output_path: 出力先MP4パス
+    bg_image_path: 背景画像パス（Noneの場合はソリッドカラー）
+    title: エピソードタイトル（空文字ならOPスキップ）
+    encoder: エンコーダーバックエンド（"moviepy" / "ffmpeg"、None なら設定値）。
+      セグメント描画・ストリーミング描画は ffmpeg パイプのみで、"moviepy" は指定できない
+    workers: 並列セグメントレンダリングのプロセス数（None なら設定値、1 なら逐次）
+    cache_dir: セグメントキャッシュの保存先（指定時はセグメント単位で描画し、
+      内容が変わっていないシーンを再利用する）
+    stream: True なら1シーンずつ組み立て・描画・解放するストリーミング描画
+      （ffmpeg パイプ直結。None なら STREAMING_RENDER 設定値。長尺向け）
+    profile: レンダリングプロファイル名（"final" / "draft"、None なら設定値）
+    renderer: 本編の描画方式（"python" / "filtergraph"、None なら LANDSCAPE_RENDERER
+      設定値）。"filtergraph" は本編全体を ffmpeg 1回の filter_complex で描画する
+      （ストリーミング描画の構成で書き出す。セグメント描画の指定が優先）
+    frame_workers: 本編のフレームを並列に描画するプロセス数（None なら FRAME_WORKERS
+      設定値）。2 以上ならストリーミング描画の構成で書き出す（セグメント描画の指定が優先）
+  """
+  render_profile = get_profile(profile)
+  renderer = renderer or LANDSCAPE_RENDERER
+  workers = workers or RENDER_WORKERS
+  frame_workers = frame_workers or FRAME_WORKERS
+  if workers > 1 or cache_dir:
+    _check_pipe_encoder(encoder, "セグメント描画")
+    _compose_segmented(
+      "landscape", dialogue, audio_paths, output_path, bg_image_path,
+      title, workers, render_profile, cache_dir=cache_dir,
+    )
+    logger.info("横長動画出力完了: %s", output_path)
+    return
+  if (
+    renderer == "filtergraph" or frame_workers > 1
+    or (STREAMING_RENDER if stream is None else stream)
+  ):
+    _check_pipe_encoder(encoder, "ストリーミング描画")
+    _compose_streaming(
+      "landscape", dialogue, audio_paths, output_path, bg_image_path, title,
+      render_profile, renderer, frame_workers,
+    )
+    logger.info("横長動画出力完了: %s", output_path)
+    return
+
+  layout = _LandscapeLayout(bg_image_path, render_profile)
+  width, height = layout.size
+  _analyze_lipsync(audio_paths, render_profile.fps)
+
+  clips = []
+  audio_parts = []
+  t = 0.0
+
+  # オープニングクリップ
+  has_op = bool(title and OPENING_LOGO_PATH.exists())
+  if has_op:
+    opening = _create_opening_clip(title, (width, height), render_profile)
+    clips.append(opening)
+    audio_parts.append((t, _timeline_samples(_create_opening_audio())))
+    t += opening.duration
+
+  for i, (line, audio_path) in enumerate(zip(dialogue, audio_paths)):
+    pcm = load_voice_pcm(audio_path)
+    duration = audio_duration(pcm)
+
+    logger.info(
+      "動画合成(横) [%d/%d]: %s (%.1f秒)",
+      i + 1, len(dialogue), line.text[:15], duration,
+    )
+
+    clips.append(layout.build_scene(line, audio_path, duration))
+    audio_parts.append((t, pcm))
+    t += duration
+
+  # エンディングクリップ
+  voices = _pick_ending_voices()
+  ending = _create_ending_clip((width, height), render_profile, bg_image_path, voices)
+  if ending:
+    clips.append(ending)
+    audio_parts.append((t, _create_ending_audio(voices)[0].samples))
+
+  # 全セリフを結合して出力（全クリップが画面サイズなので再合成せず連結する）
+  final = concatenate_videoclips(clips, method="chain")
+  soundtrack = _build_soundtrack(
+    audio_parts, final.duration, bgm_start=OPENING_DURATION if has_op else 0.0,
+  )
+  _write_video(final, soundtrack, output_path, render_profile, encoder)
+  final.close()
+  if layout.frame_cache:
+    layout.frame_cache.log_stats("landscape")
+  logger.info("横長動画出力完了: %s", output_path)
+
+
+# --- LINE チャット風縦動画ヘルパー ---
+
+# チャットレイアウト定数（寸法は final 解像度でのピクセル値）
+_CHAT_ICON_SIZE = 100
+_CHAT_ICON_MARGIN = 30
+_CHAT_ICON_GAP = 12
+_CHAT_BUBBLE_MAX_WIDTH = 700
+_CHAT_BUBBLE_PADDING = 20
+_CHAT_BUBBLE_RADIUS = 20
+_CHAT_MSG_SPACING = 25
+_CHAT_FONT_SIZE = 36
+_CHAT_BOTTOM_MARGIN = 150
+_CHAT_TOP_MARGIN = 100
+_CHAT_TSUNO_COLOR = (92, 210, 96)     # LINE グリーン
+_CHAT_MEGANE_COLOR = (255, 255, 255)  # 白
+_CHAT_TSUNO_TEXT = (255, 255, 255)    # 白文字
+_CHAT_MEGANE_TEXT = (30, 30, 30)      # 黒文字
+_CHAT_PAST_OPACITY = 0.7
+_CHAT_ROW_CACHE_SIZE = 64  # 保持するラスタライズ済み行の上限（画面に収まる行数より十分大きく）
+
+
+@dataclass(frozen=True)
+class _ChatMetrics:
+  """チャットレイアウトの寸法（レンダリングプロファイルの解像度に換算済み）"""
+
+  icon_size: int
+  icon_margin: int
+  icon_gap: int
+  bubble_max_width: int
+  bubble_padding: int
+  bubble_radius: int
+  msg_spacing: int
+  font_size: int
+  bottom_margin: int
+  top_margin: int
+
+  @classmethod
+  def for_profile(cls, profile: RenderProfile) -> "_ChatMetrics":
+    px = profile.px
+    return cls(
+      icon_size=px(_CHAT_ICON_SIZE),
+      icon_margin=px(_CHAT_ICON_MARGIN),
+      icon_gap=px(_CHAT_ICON_GAP),
+      bubble_max_width=px(_CHAT_BUBBLE_MAX_WIDTH),
+      bubble_padding=px(_CHAT_BUBBLE_PADDING),
+      bubble_radius=px(_CHAT_BUBBLE_RADIUS),
+      msg_spacing=px(_CHAT_MSG_SPACING),
+      font_size=px(_CHAT_FONT_SIZE),
+      bottom_margin=px(_CHAT_BOTTOM_MARGIN),
+      top_margin=px(_CHAT_TOP_MARGIN),
+    )
+
+
+def _make_circular_icon(img_path: Path, size: int) -> Image.Image:
+  """画像を正方形にクロップし円形マスクを適用した RGBA Image を返す"""
+  img = Image.open(img_path).convert("RGBA")
   # 正方形クロップ（上部優先＝顔が映りやすい）
   side = min(img.width, img.height)
   left = (img.width - side) // 2
@@ -928,45 +1373,26 @@ def _make_circular_icon(img_path: Path, size: int) -> Image.Image:
   return img
 
 
-def _wrap_text_for_bubble(
-  text: str, font: ImageFont.FreeTypeFont, max_width: int,
-) -> list[str]:
-  """ピクセル幅ベースでテキストを折り返す"""
-  lines: list[str] = []
-  current = ""
-  for char in text:
-    test = current + char
-    bbox = font.getbbox(test)
-    if (bbox[2] - bbox[0]) > max_width and current:
-      lines.append(current)
-      current = char
-    else:
-      current = test
-  if current:
-    lines.append(current)
-  return lines or [text]
-
-
 def _measure_bubble(
-  text: str, font: ImageFont.FreeTypeFont, max_text_width: int,
+  text: str, font: ImageFont.FreeTypeFont, max_text_width: int, metrics: _ChatMetrics,
 ) -> tuple[int, int, list[str]]:
   """吹き出しのサイズ（幅, 高さ）と折り返し済み行リストを返す"""
-  lines = _wrap_text_for_bubble(text, font, max_text_width)
-  line_bboxes = [font.getbbox(line) for line in lines]
+  lines = wrap_text_by_width(text, font, max_text_width)
+  line_bboxes = [text_bbox(font, line) for line in lines]
   line_heights = [bb[3] - bb[1] for bb in line_bboxes]
   line_widths = [bb[2] - bb[0] for bb in line_bboxes]
-  line_spacing = int(_CHAT_FONT_SIZE * 0.3)
+  line_spacing = int(metrics.font_size * 0.3)
 
   text_w = max(line_widths) if line_widths else 0
   text_h = sum(line_heights) + line_spacing * max(0, len(lines) - 1)
 
-  bubble_w = text_w + _CHAT_BUBBLE_PADDING * 2
-  bubble_h = text_h + _CHAT_BUBBLE_PADDING * 2
+  bubble_w = text_w + metrics.bubble_padding * 2
+  bubble_h = text_h + metrics.bubble_padding * 2
   return bubble_w, bubble_h, lines
 
 
 def _draw_chat_bubble(
-  draw: ImageDraw.ImageDraw,
+  canvas: np.ndarray,
   text: str,
   x: int,
   y: int,
@@ -974,139 +1400,321 @@ def _draw_chat_bubble(
   text_color: tuple[int, int, int],
   font: ImageFont.FreeTypeFont,
   max_text_width: int,
+  metrics: _ChatMetrics,
 ) -> tuple[int, int]:
-  """角丸吹き出し + テキストを描画し (bubble_width, bubble_height) を返す"""
-  bubble_w, bubble_h, lines = _measure_bubble(text, font, max_text_width)
-  r = _CHAT_BUBBLE_RADIUS
-
-  # 角丸矩形
-  draw.rounded_rectangle(
-    (x, y, x + bubble_w, y + bubble_h),
+  """透明な RGBA 配列に角丸吹き出し + テキストを描画し (bubble_width, bubble_height) を返す"""
+  bubble_w, bubble_h, lines = _measure_bubble(text, font, max_text_width, metrics)
+  r = metrics.bubble_radius
+
+  # 角丸矩形（右端・下端を含むため +1）
+  bubble = Image.new("RGBA", (bubble_w + 1, bubble_h + 1), (0, 0, 0, 0))
+  ImageDraw.Draw(bubble).rounded_rectangle(
+    (0, 0, bubble_w, bubble_h),
     radius=r,
     fill=(*bubble_color, 255),
   )
+  canvas[y:y + bubble_h + 1, x:x + bubble_w + 1] = np.asarray(bubble)
 
   # テキスト描画
-  line_spacing = int(_CHAT_FONT_SIZE * 0.3)
-  ty = y + _CHAT_BUBBLE_PADDING
+  line_spacing = int(metrics.font_size * 0.3)
+  ty = y + metrics.bubble_padding
   for line in lines:
-    draw.text(
-      (x + _CHAT_BUBBLE_PADDING, ty),
+    draw_text(
+      canvas,
+      (x + metrics.bubble_padding, ty),
       line,
-      font=font,
+      font,
       fill=(*text_color, 255),
     )
-    bbox = font.getbbox(line)
+    bbox = text_bbox(font, line)
     ty += (bbox[3] - bbox[1]) + line_spacing
 
   return bubble_w, bubble_h
 
 
-def _render_chat_frame(
-  width: int,
-  height: int,
-  bg_image: Image.Image | None,
-  dialogue: list[DialogueLine],
-  current_idx: int,
-  icon_cache: dict[tuple[str, str], Image.Image],
-  font: ImageFont.FreeTypeFont,
-) -> tuple[np.ndarray, np.ndarray]:
-  """チャット画面1フレームを描画して (合成済みRGB, チャットオーバーレイRGBA) を返す"""
-  # 背景
-  if bg_image:
-    canvas = bg_image.copy()
-  else:
-    canvas = Image.new("RGB", (width, height), BG_COLOR)
+def _chat_display_text(text: str) -> str:
+  """チャット吹き出しの表示テキスト（[[表示専用]]展開＋読み仮名アノテーション除去＋改行除去）
 
-  max_text_width = _CHAT_BUBBLE_MAX_WIDTH - _CHAT_BUBBLE_PADDING * 2
-  icon_size = _CHAT_ICON_SIZE
+  チャット吹き出しは幅ベースで自動折り返しするため、明示的改行は不要
+  """
+  return (
+    unwrap_display_only(remove_reading_annotations(text))
+    .replace("\n", "").replace("\u301c", "\uff5e")
+  )
 
-  # 各メッセージの表示テキスト（[[表示専用]]展開＋読み仮名アノテーション除去＋改行除去）
-  # チャット吹き出しは幅ベースで自動折り返しするため、明示的改行は不要
-  display_texts = [
-    unwrap_display_only(remove_reading_annotations(dialogue[idx].text)).replace("\n", "").replace("\u301c", "\uff5e")
-    for idx in range(current_idx + 1)
-  ]
 
-  # 各メッセージの吹き出しサイズを事前計算（0 .. current_idx）
-  bubble_infos: list[tuple[int, int, str]] = []  # (w, h, speaker)
-  for idx in range(current_idx + 1):
-    line = dialogue[idx]
-    bw, bh, _ = _measure_bubble(display_texts[idx], font, max_text_width)
-    bubble_infos.append((bw, bh, line.speaker))
-
-  # 下から上に配置: 最新メッセージが一番下
-  y_bottom = height - _CHAT_BOTTOM_MARGIN
-  visible_start = 0
-
-  # 表示に必要な縦幅を計算し、表示開始インデックスを決定
-  total_needed = 0
-  for idx in range(current_idx, -1, -1):
-    _, bh, _ = bubble_infos[idx]
-    row_h = max(bh, icon_size) + _CHAT_MSG_SPACING
-    total_needed += row_h
-    if total_needed > y_bottom - 100:  # 上部100pxマージン
-      visible_start = idx + 1
-      break
-
-  # チャットオーバーレイ（半透明対応のため RGBA）
-  overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-  draw = ImageDraw.Draw(overlay)
-
-  y_cursor = y_bottom
-  for idx in range(current_idx, visible_start - 1, -1):
-    line = dialogue[idx]
-    bw, bh, speaker = bubble_infos[idx]
-    is_current = idx == current_idx
-    row_h = max(bh, icon_size)
-    y_cursor -= row_h
+@dataclass
+class _ChatRow:
+  """ラスタライズ済みのチャット1行（アイコン＋吹き出し）"""
+
+  x: int                 # オーバーレイ上の左端
+  row_h: int             # 行の高さ（アイコンと吹き出しの大きい方）
+  current: np.ndarray    # 最新メッセージとしての RGBA
+  past: np.ndarray       # 過去メッセージ（半透明）としての RGBA
+
 
-    emotion = line.emotion if (speaker, line.emotion) in icon_cache else "normal"
-    icon_img = icon_cache.get((speaker, emotion), icon_cache.get((speaker, "normal")))
+class _ChatRenderer:
+  """LINE 風チャットオーバーレイのインクリメンタル描画器
+
+  各メッセージ行は初回に一度だけ（通常・半透明の2種）ラスタライズして保持し、
+  各セリフのオーバーレイは表示範囲の行を下から積み上げて貼り付けるだけで作る。
+  行同士は重ならないため、貼り付けは配列のスライス代入で済む。
+  保持する行は直近に使った _CHAT_ROW_CACHE_SIZE 行までで、画面外へ流れた
+  古い行から捨てる（長尺の台本でもセリフ数に比例してメモリを使わない）。
+  """
+
+  def __init__(
+    self,
+    width: int,
+    height: int,
+    icon_cache: dict[tuple[str, str], Image.Image],
+    font: ImageFont.FreeTypeFont,
+    metrics: _ChatMetrics,
+  ):
+    self.width = width
+    self.height = height
+    self.icon_cache = icon_cache
+    self.font = font
+    self.metrics = metrics
+    self._rows: dict[tuple[str, str, str], _ChatRow] = {}
+
+  def _row(self, line: DialogueLine) -> _ChatRow:
+    """メッセージ行を取得する（未作成ならラスタライズ）"""
+    speaker = line.speaker
+    emotion = line.emotion if (speaker, line.emotion) in self.icon_cache else "normal"
+    text = _chat_display_text(line.text)
+    key = (speaker, emotion, text)
+    row = self._rows.pop(key, None)
+    if row is not None:
+      # 最近使った行として末尾へ入れ直す
+      self._rows[key] = row
+      return row
+
+    width = self.width
+    m = self.metrics
+    icon_size = m.icon_size
+    max_text_width = m.bubble_max_width - m.bubble_padding * 2
+    bw, bh, _ = _measure_bubble(text, self.font, max_text_width, m)
+    row_h = max(bh, icon_size)
+    icon_img = self.icon_cache.get((speaker, emotion), self.icon_cache.get((speaker, "normal")))
 
     if speaker == "tsuno":
-      icon_x = _CHAT_ICON_MARGIN
-      bubble_x = icon_x + icon_size + _CHAT_ICON_GAP
+      icon_x = m.icon_margin
+      bubble_x = icon_x + icon_size + m.icon_gap
       bubble_color = _CHAT_TSUNO_COLOR
       text_color = _CHAT_TSUNO_TEXT
     else:
-      bubble_x = width - _CHAT_ICON_MARGIN - icon_size - _CHAT_ICON_GAP - bw
-      icon_x = width - _CHAT_ICON_MARGIN - icon_size
+      bubble_x = width - m.icon_margin - icon_size - m.icon_gap - bw
+      icon_x = width - m.icon_margin - icon_size
       bubble_color = _CHAT_MEGANE_COLOR
       text_color = _CHAT_MEGANE_TEXT
 
-    icon_y = y_cursor + (row_h - icon_size) // 2
-    bubble_y = y_cursor + (row_h - bh) // 2
+    # 行の外接矩形（角丸矩形は右端・下端を含むため +1）
+    x0 = min(icon_x, bubble_x)
+    x1 = max(icon_x + icon_size, bubble_x + bw + 1)
+    row_arr = np.zeros((row_h + 1, x1 - x0, 4), dtype=np.uint8)
+    _draw_chat_bubble(
+      row_arr, text, bubble_x - x0, (row_h - bh) // 2,
+      bubble_color, text_color, self.font, max_text_width, m,
+    )
+    row_img = Image.fromarray(row_arr)
+    if icon_img is not None:
+      row_img.paste(icon_img, (icon_x - x0, (row_h - icon_size) // 2), icon_img)
+
+    # 過去メッセージ: 全体の不透明度を下げる
+    faded = row_img.copy()
+    faded.putalpha(faded.split()[3].point(lambda a: int(a * _CHAT_PAST_OPACITY)))
+    past = Image.alpha_composite(Image.new("RGBA", faded.size, (0, 0, 0, 0)), faded)
+
+    row = _ChatRow(x=x0, row_h=row_h, current=np.array(row_img), past=np.array(past))
+    self._rows[key] = row
+    if len(self._rows) > _CHAT_ROW_CACHE_SIZE:
+      del self._rows[next(iter(self._rows))]
+    return row
+
+  def overlay(self, dialogue: list[DialogueLine], current_idx: int) -> np.ndarray:
+    """current_idx 番目までを表示したチャットオーバーレイ（RGBA）を返す"""
+    m = self.metrics
+    # 下から上に配置: 最新メッセージが一番下
+    y_bottom = self.height - m.bottom_margin
+
+    # 表示に必要な縦幅を計算し、表示する行を決定（上部100pxマージン）
+    visible: list[_ChatRow] = []
+    total_needed = 0
+    for idx in range(current_idx, -1, -1):
+      row = self._row(dialogue[idx])
+      total_needed += max(row.row_h, m.icon_size) + m.msg_spacing
+      if total_needed > y_bottom - m.top_margin:
+        break
+      visible.append(row)
+
+    overlay = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+    y_cursor = y_bottom
+    for i, row in enumerate(visible):
+      y_cursor -= row.row_h
+      image = row.current if i == 0 else row.past
+      rh, rw = image.shape[:2]
+      top = max(y_cursor, 0)
+      bottom = min(y_cursor + rh, self.height)
+      left = max(row.x, 0)
+      right = min(row.x + rw, self.width)
+      if top < bottom and left < right:
+        overlay[top:bottom, left:right] = image[
+          top - y_cursor:bottom - y_cursor, left - row.x:right - row.x
+        ]
+      y_cursor -= m.msg_spacing
+    return overlay
+
+
+class _PortraitLayout:
+  """9:16 縦長（LINE チャット風）レイアウトのセリフシーン生成器
+
+  背景・アイコン・フォント・ロゴは生成時に一度だけ準備し、
+  build_scene でセリフごとのシーンクリップ（映像のみ）を組み立てる。
+  寸法はレンダリングプロファイルの解像度に合わせて換算する。
+  """
+
+  def __init__(self, bg_image_path: Path | None, profile: RenderProfile):
+    self.profile = profile
+    self.size = profile.size("portrait")
+    width, height = self.size
+    metrics = _ChatMetrics.for_profile(profile)
 
-    if not is_current:
-      # 過去メッセージ: 半透明のバブルを描画
-      bubble_layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-      bd = ImageDraw.Draw(bubble_layer)
-      _draw_chat_bubble(
-        bd, display_texts[idx], bubble_x, bubble_y,
-        bubble_color, text_color, font, max_text_width,
-      )
-      # アイコンも貼り付け
-      bubble_layer.paste(icon_img, (icon_x, icon_y), icon_img)
-      # 全体の不透明度を下げる
-      alpha = bubble_layer.split()[3]
-      alpha = alpha.point(lambda a: int(a * _CHAT_PAST_OPACITY))
-      bubble_layer.putalpha(alpha)
-      overlay = Image.alpha_composite(overlay, bubble_layer)
+    # 背景画像の準備
+    self.bg_array = None
+    if bg_image_path and bg_image_path.exists():
+      self.bg_array = load_background(bg_image_path, self.size)
+
+    # キャラアイコン（表情ごとにキャッシュ）
+    from src.utils.character_assets import VALID_EMOTIONS
+
+    icon_cache: dict[tuple[str, str], Image.Image] = {}
+    for speaker in ("tsuno", "megane"):
+      for emotion in VALID_EMOTIONS:
+        path = IMAGES_DIR / speaker / f"{emotion}_closed.png"
+        if path.exists():
+          icon_cache[(speaker, emotion)] = _make_circular_icon(path, metrics.icon_size)
+      # フォールバック: normal がなければ最初に見つかったものを使う
+      if (speaker, "normal") not in icon_cache:
+        for emotion in VALID_EMOTIONS:
+          if (speaker, emotion) in icon_cache:
+            icon_cache[(speaker, "normal")] = icon_cache[(speaker, emotion)]
+            break
+    self.icon_cache = icon_cache
+
+    # フォント
+    self.font = get_font(FONT_PATH, metrics.font_size)
+    self.chat = _ChatRenderer(width, height, icon_cache, self.font, metrics)
+
+    # ロゴ画像の準備（プルプル用）
+    self.logo_arr = None
+    self.logo_w = self.logo_h = 0
+    if DIALOGUE_LOGO_PATH.exists():
+      _p_logo = Image.open(DIALOGUE_LOGO_PATH).convert("RGBA")
+      self.logo_w = int(width * 0.5)
+      _p_logo_aspect = _p_logo.width / _p_logo.height
+      self.logo_h = int(self.logo_w / _p_logo_aspect)
+      _p_logo = _p_logo.resize((self.logo_w, self.logo_h), Image.LANCZOS)
+      self.logo_arr = np.array(_p_logo)
+
+  def build_scene(
+    self,
+    dialogue: list[DialogueLine],
+    index: int,
+    duration: float,
+  ) -> CompositeVideoClip:
+    """index 番目のセリフまでを表示したチャットシーン（音声なし）を生成する"""
+    width, height = self.size
+
+    # チャットオーバーレイ描画（行ごとのラスタライズ結果を再利用）
+    chat_overlay_arr = self.chat.overlay(dialogue, index)
+
+    scene_layers = []
+
+    # 1) 背景レイヤー（bg_image または BG_COLOR）
+    if self.bg_array is not None:
+      bg_clip = ImageClip(self.bg_array).with_duration(duration)
     else:
-      # 現在のメッセージ: 通常描画
-      _draw_chat_bubble(
-        draw, display_texts[idx], bubble_x, bubble_y,
-        bubble_color, text_color, font, max_text_width,
+      bg_clip = ColorClip(
+        size=(width, height), color=BG_COLOR,
+      ).with_duration(duration)
+    scene_layers.append(bg_clip)
+
+    # 2) ロゴレイヤー（プルプル震え、背景とチャットの間）
+    if self.logo_arr is not None:
+      logo_clip = (
+        ImageClip(self.logo_arr, transparent=True)
+        .with_duration(duration)
       )
-      overlay.paste(icon_img, (icon_x, icon_y), icon_img)
+      logo_bx = (width - self.logo_w) // 2
+      logo_by = (height - self.logo_h) // 2
+      jitter = self.profile.px(3)
+      fps = self.profile.fps
+      logo_clip = logo_clip.with_position(SineMotion(
+        logo_bx, logo_by,
+        x_amp=jitter, x_freq=2.5,
+        y_amp=jitter, y_freq=3.0, y_phase=np.pi / 3,
+      ).table(fps, table_frames(duration, fps)))
+      scene_layers.append(logo_clip)
+
+    # 3) チャットオーバーレイレイヤー（吹き出し + アイコン）
+    chat_clip = (
+      ImageClip(chat_overlay_arr, transparent=True)
+      .with_duration(duration)
+    )
+    scene_layers.append(chat_clip)
+
+    return (
+      CompositeVideoClip(scene_layers, size=(width, height))
+      .with_duration(duration)
+    )
+
 
-    y_cursor -= _CHAT_MSG_SPACING
+def _estimated_shorts_duration(total_audio_dur: float) -> float:
+  """セリフ音声の合計秒数から見積もる縦長動画の尺"""
+  return total_audio_dur + OPENING_DURATION + 10.0  # OP + ED概算
 
-  # 背景にオーバーレイ合成
-  canvas = canvas.convert("RGBA")
-  result = Image.alpha_composite(canvas, overlay)
-  return np.array(result.convert("RGB")), np.array(overlay)
+
+def _shorts_line_indices(
+  dialogue: list[DialogueLine],
+  audio_paths: list[Path],
+) -> list[int]:
+  """Shorts用に残すセリフのインデックス（推定尺が3分を超える場合のみ shorts_skip を除外）"""
+  estimated_total = _estimated_shorts_duration(sum(voice_duration(p) for p in audio_paths))
+  kept = list(range(len(dialogue)))
+  if estimated_total > SHORTS_MAX_DURATION:
+    full_count = len(dialogue)
+    filtered = [i for i in kept if not dialogue[i].shorts_skip]
+    if len(filtered) < full_count:
+      logger.info(
+        "Shorts用セリフ省略: %d → %d行 (%d行スキップ, 推定%.0fs → 3分以内に調整)",
+        full_count, len(filtered), full_count - len(filtered), estimated_total,
+      )
+      kept = filtered
+  else:
+    logger.info("Shorts推定尺: %.0fs（3分以内のためセリフ省略なし）", estimated_total)
+  return kept
+
+
+def _filter_shorts_dialogue(
+  dialogue: list[DialogueLine],
+  audio_paths: list[Path],
+) -> tuple[list[DialogueLine], list[Path]]:
+  """Shorts用: 推定尺が3分を超える場合のみ shorts_skip セリフを除外する"""
+  kept = _shorts_line_indices(dialogue, audio_paths)
+  if len(kept) == len(dialogue):
+    return dialogue, audio_paths
+  return [dialogue[i] for i in kept], [audio_paths[i] for i in kept]
+
+
+def _warn_shorts_duration(duration: float) -> None:
+  """Shorts用: 3分を超える場合は警告（台本を手動で削る）"""
+  if duration > SHORTS_MAX_DURATION:
+    over = duration - SHORTS_MAX_DURATION
+    logger.warning(
+      "Shorts上限(%.0fs)を%.0fs超過しています。台本を短くしてください。",
+      SHORTS_MAX_DURATION, over,
+    )
 
 
 def compose_portrait(
@@ -1115,6 +1723,12 @@ def compose_portrait(
   output_path: Path,
   bg_image_path: Path | None = None,
   title: str = "",
+  encoder: str | None = None,
+  workers: int | None = None,
+  cache_dir: Path | None = None,
+  stream: bool | None = None,
+  profile: str | None = None,
+  frame_workers: int | None = None,
 ) -> None:
   """9:16 縦長動画を合成する（LINE チャット風レイアウト）
 
@@ -1124,156 +1738,1076 @@ def compose_portrait(
     output_path: 出力先MP4パス
     bg_image_path: 背景画像パス（Noneの場合はソリッドカラー）
     title: エピソードタイトル（空文字ならOPスキップ）
+    encoder: エンコーダーバックエンド（"moviepy" / "ffmpeg"、None なら設定値）。
+      セグメント描画・ストリーミング描画は ffmpeg パイプのみで、"moviepy" は指定できない
+    workers: 並列セグメントレンダリングのプロセス数（None なら設定値、1 なら逐次）
+    cache_dir: セグメントキャッシュの保存先（指定時はセグメント単位で描画し、
+      内容が変わっていないシーンを再利用する）
+    stream: True なら1シーンずつ組み立て・描画・解放するストリーミング描画
+      （ffmpeg パイプ直結。None なら STREAMING_RENDER 設定値。長尺向け）
+    profile: レンダリングプロファイル名（"final" / "draft"、None なら設定値）
+    frame_workers: 本編のフレームを並列に描画するプロセス数（None なら FRAME_WORKERS
+      設定値）。2 以上ならストリーミング描画の構成で書き出す（セグメント描画の指定が優先）
   """
-  width, height = PORTRAIT_SIZE
-
-  # 背景画像の準備
-  bg_image = None
-  if bg_image_path and bg_image_path.exists():
-    bg_image = Image.open(bg_image_path).convert("RGB")
-    bg_image = bg_image.resize((width, height), Image.LANCZOS)
-
-  # キャラアイコン（表情ごとにキャッシュ）
-  from src.utils.character_assets import VALID_EMOTIONS
-
-  icon_cache: dict[tuple[str, str], Image.Image] = {}
-  for speaker in ("tsuno", "megane"):
-    for emotion in VALID_EMOTIONS:
-      path = IMAGES_DIR / speaker / f"{emotion}_closed.png"
-      if path.exists():
-        icon_cache[(speaker, emotion)] = _make_circular_icon(path, _CHAT_ICON_SIZE)
-    # フォールバック: normal がなければ最初に見つかったものを使う
-    if (speaker, "normal") not in icon_cache:
-      for emotion in VALID_EMOTIONS:
-        if (speaker, emotion) in icon_cache:
-          icon_cache[(speaker, "normal")] = icon_cache[(speaker, emotion)]
-          break
-
-  # フォント
-  font = ImageFont.truetype(str(FONT_PATH), _CHAT_FONT_SIZE)
-
-  # ロゴ画像の準備（プルプル用）
-  portrait_logo_arr = None
-  portrait_logo_w = portrait_logo_h = 0
-  if DIALOGUE_LOGO_PATH.exists():
-    _p_logo = Image.open(DIALOGUE_LOGO_PATH).convert("RGBA")
-    portrait_logo_w = int(width * 0.5)
-    _p_logo_aspect = _p_logo.width / _p_logo.height
-    portrait_logo_h = int(portrait_logo_w / _p_logo_aspect)
-    _p_logo = _p_logo.resize(
-      (portrait_logo_w, portrait_logo_h), Image.LANCZOS,
+  dialogue, audio_paths = _filter_shorts_dialogue(dialogue, audio_paths)
+
+  render_profile = get_profile(profile)
+  workers = workers or RENDER_WORKERS
+  frame_workers = frame_workers or FRAME_WORKERS
+  if workers > 1 or cache_dir:
+    _check_pipe_encoder(encoder, "セグメント描画")
+    duration = _compose_segmented(
+      "portrait", dialogue, audio_paths, output_path, bg_image_path,
+      title, workers, render_profile, cache_dir=cache_dir,
     )
-    portrait_logo_arr = np.array(_p_logo)
+    _warn_shorts_duration(duration)
+    logger.info("縦長動画出力完了: %s (%.0fs)", output_path, duration)
+    return
+  if frame_workers > 1 or (STREAMING_RENDER if stream is None else stream):
+    _check_pipe_encoder(encoder, "ストリーミング描画")
+    duration = _compose_streaming(
+      "portrait", dialogue, audio_paths, output_path, bg_image_path, title,
+      render_profile, frame_workers=frame_workers,
+    )
+    _warn_shorts_duration(duration)
+    logger.info("縦長動画出力完了: %s (%.0fs)", output_path, duration)
+    return
 
-  # Shorts用: 推定尺が3分を超える場合のみ shorts_skip セリフを除外
-  total_audio_dur = sum(
-    AudioFileClip(str(p)).duration for p in audio_paths
-  )
-  estimated_total = total_audio_dur + OPENING_DURATION + 10.0  # OP + ED概算
-  if estimated_total > SHORTS_MAX_DURATION:
-    full_count = len(dialogue)
-    filtered = [
-      (line, path) for line, path in zip(dialogue, audio_paths)
-      if not line.shorts_skip
-    ]
-    if len(filtered) < full_count:
-      logger.info(
-        "Shorts用セリフ省略: %d → %d行 (%d行スキップ, 推定%.0fs → 3分以内に調整)",
-        full_count, len(filtered), full_count - len(filtered), estimated_total,
-      )
-      dialogue = [lp[0] for lp in filtered]
-      audio_paths = [lp[1] for lp in filtered]
-  else:
-    logger.info("Shorts推定尺: %.0fs（3分以内のためセリフ省略なし）", estimated_total)
+  layout = _PortraitLayout(bg_image_path, render_profile)
+  width, height = layout.size
 
   clips = []
+  audio_parts = []
+  t = 0.0
 
   # オープニングクリップ
-  if title and OPENING_LOGO_PATH.exists():
-    opening = _create_opening_clip(title, (width, height))
+  has_op = bool(title and OPENING_LOGO_PATH.exists())
+  if has_op:
+    opening = _create_opening_clip(title, (width, height), render_profile)
     clips.append(opening)
+    audio_parts.append((t, _timeline_samples(_create_opening_audio())))
+    t += opening.duration
 
   for i, (line, audio_path) in enumerate(zip(dialogue, audio_paths)):
-    audio = AudioFileClip(str(audio_path))
-    duration = audio.duration
+    pcm = load_voice_pcm(audio_path)
+    duration = audio_duration(pcm)
 
     logger.info(
       "動画合成(縦) [%d/%d]: %s (%.1f秒)",
       i + 1, len(dialogue), line.text[:15], duration,
     )
 
-    # チャットフレーム描画（背景+チャットオーバーレイを分離取得）
-    composite_arr, chat_overlay_arr = _render_chat_frame(
-      width, height, bg_image, dialogue, i,
-      icon_cache, font,
+    clips.append(layout.build_scene(dialogue, i, duration))
+    audio_parts.append((t, pcm))
+    t += duration
+
+  # エンディングクリップ
+  voices = _pick_ending_voices()
+  ending = _create_ending_clip((width, height), render_profile, bg_image_path, voices)
+  if ending:
+    clips.append(ending)
+    audio_parts.append((t, _create_ending_audio(voices)[0].samples))
+
+  # 全セリフを結合して出力
+  final = concatenate_videoclips(clips, method="compose")
+  soundtrack = _build_soundtrack(
+    audio_parts, final.duration, bgm_start=OPENING_DURATION if has_op else 0.0,
+  )
+
+  # Shorts用: 3分を超える場合は警告（台本を手動で削る）
+  _warn_shorts_duration(final.duration)
+
+  _write_video(final, soundtrack, output_path, render_profile, encoder)
+  final.close()
+  logger.info("縦長動画出力完了: %s (%.0fs)", output_path, final.duration)
+
+
+# --- 並列セグメントレンダリング ---
+
+# セグメントキャッシュのキー互換バージョン（描画処理を変えたら上げる）
+_SEGMENT_CACHE_VERSION = 3
+
+# ワーカープロセスごとのレンダリング状態（_init_segment_worker で初期化）
+_segment_state: dict = {}
+
+
+@dataclass
+class _SegmentTask:
+  """1シーン分のセグメント描画指示（シーン先頭を 0 秒とするローカル時刻で描画）"""
+
+  orientation: str
+  kind: str  # "opening" / "line" / "ending"
+  index: int
+  duration: float
+  n_frames: int
+  path: Path
+  bg_image_path: Path | None = None
+  audio_path: Path | None = None
+  dialogue: list[DialogueLine] | None = None  # ワーカーの台本と異なる場合（Shorts 用に絞った縦長）
+
+
+def _init_segment_worker(
+  dialogue: list[DialogueLine],
+  title: str,
+  voices: tuple[Path | None, Path | None] = (None, None),
+  profile: RenderProfile | None = None,
+) -> None:
+  """ワーカー初期化: 台本とレイアウトのキャッシュを用意する
+
+  準備済みのレイアウトは台本に依存しないため、初期化し直しても引き継ぐ。
+  """
+  _segment_state.update(
+    dialogue=dialogue,
+    title=title,
+    voices=voices,
+    profile=profile or get_profile(),
+    layouts=_segment_state.get("layouts", {}),
+  )
+
+
+def _segment_layout(orientation: str, bg_image_path: Path | None):
+  """向き・背景ごとのレイアウト（背景・キャラ素材・フォント）をワーカー内で一度だけ準備する"""
+  layouts = _segment_state["layouts"]
+  profile = _segment_state["profile"]
+  key = (orientation, bg_image_path, profile)
+  if key not in layouts:
+    layout_cls = _LandscapeLayout if orientation == "landscape" else _PortraitLayout
+    layouts[key] = layout_cls(bg_image_path, profile)
+  return layouts[key]
+
+
+def _log_frame_cache(orientation: str, bg_image_path: Path | None, label: str) -> None:
+  """準備済みレイアウトの合成済みフレームキャッシュのヒット率をログに出す"""
+  key = (orientation, bg_image_path, _segment_state["profile"])
+  cache = getattr(_segment_state["layouts"].get(key), "frame_cache", None)
+  if cache:
+    cache.log_stats(label)
+
+
+def _build_segment_scene(task: _SegmentTask):
+  """セグメントに対応するシーンクリップをワーカー内で組み立てる"""
+  state = _segment_state
+  profile = state["profile"]
+  size = profile.size(task.orientation)
+  if task.kind == "opening":
+    return _create_opening_clip(state["title"], size, profile)
+  if task.kind == "ending":
+    return _create_ending_clip(size, profile, task.bg_image_path, state["voices"])
+  layout = _segment_layout(task.orientation, task.bg_image_path)
+  dialogue = task.dialogue or state["dialogue"]
+  if task.orientation == "landscape":
+    line = dialogue[task.index]
+    return layout.build_scene(line, task.audio_path, task.duration)
+  return layout.build_scene(dialogue, task.index, task.duration)
+
+
+def _render_segment(task: _SegmentTask) -> Path:
+  """1セグメントを映像のみの MP4 として書き出す"""
+  profile = _segment_state["profile"]
+  scene = _build_segment_scene(task)
+  with FFmpegPipeWriter(
+    task.path, scene.size, profile.fps, encoding=profile.encoding,
+  ) as writer:
+    for frame_idx in range(task.n_frames):
+      writer.write_frame(scene.get_frame(frame_idx / profile.fps))
+  scene.close()
+  return task.path
+
+
+def _optional_digest(path: Path | None) -> str | None:
+  """ファイルがあればその内容ハッシュ、無ければ None（任意の素材のキャッシュキー用）"""
+  return file_digest(path) if path and path.exists() else None
+
+
+def _character_digests() -> list[tuple[str, str]]:
+  """キャラクター画像（assets/images/{話者}/*.png）の内容ハッシュ一覧"""
+  return [
+    (f"{path.parent.name}/{path.name}", file_digest(path))
+    for speaker in ("tsuno", "megane")
+    for path in sorted((IMAGES_DIR / speaker).glob("*.png"))
+  ]
+
+
+def _segment_cache_key(
+  task: _SegmentTask,
+  dialogue: list[DialogueLine],
+  title: str,
+  profile: RenderProfile,
+  voices: tuple[Path | None, Path | None] = (None, None),
+) -> str:
+  """セグメントの見た目を決める要素すべてからキャッシュキーを作る"""
+  common = (
+    _SEGMENT_CACHE_VERSION, task.orientation, profile.size(task.orientation),
+    profile.fps, profile.scale, profile.encoding,
+    task.kind, task.n_frames, str(FONT_PATH),
+  )
+  # OP/ED は実行をまたいで共有するため、見た目に関わる素材・設定をすべて含める
+  if task.kind == "opening":
+    return make_key(
+      common, title, _optional_digest(OPENING_LOGO_PATH), OPENING_BG_COLOR,
+      OPENING_TITLE_FONT_SIZE, OPENING_TITLE_COLOR,
+      OPENING_TITLE_STROKE_WIDTH, OPENING_TITLE_STROKE_COLOR,
+    )
+  if task.kind == "ending":
+    return make_key(
+      common,
+      _optional_digest(task.bg_image_path),
+      [_optional_digest(v) for v in voices],
+      _optional_digest(ENDING_CALL_VOICE_TSUNO_PATH),
+      ENDING_CALL_TEXT, ENDING_TEXT_FONT_SIZE, ENDING_TEXT_COLOR,
+      ENDING_TEXT_STROKE_WIDTH, ENDING_TEXT_STROKE_COLOR,
+      ENDING_FADE_IN, ENDING_FADE_OUT, ENDING_VOICE_GAP, BG_COLOR,
+      _optional_digest(DIALOGUE_LOGO_PATH), _character_digests(),
+    )
+
+  # キャラ画像（縦長のチャットアイコンも同じ画像から作る）・フォント・ロゴの内容
+  assets = (
+    _character_digests(), _optional_digest(FONT_PATH), _optional_digest(DIALOGUE_LOGO_PATH),
+  )
+  bg_digest = _optional_digest(task.bg_image_path)
+  if task.orientation == "landscape":
+    line = dialogue[task.index]
+    return make_key(
+      common, bg_digest, assets,
+      line.speaker, line.text, line.emotion,
+      file_digest(task.audio_path),
+      LIPSYNC_THRESHOLD, LIPSYNC_MIN_OPEN_FRAMES,
+      SUBTITLE_FONT_SIZE, SUBTITLE_COLOR, SUBTITLE_STROKE_WIDTH, SUBTITLE_STROKE_COLOR,
     )
+  # 縦長はそれまでのチャット履歴も画面に残るため、先頭からの全セリフをキーに含める
+  history = [
+    (line.speaker, line.text, line.emotion)
+    for line in dialogue[:task.index + 1]
+  ]
+  return make_key(common, bg_digest, assets, history)
 
-    scene_layers = []
 
-    # 1) 背景レイヤー（bg_image または BG_COLOR）
-    if bg_image:
-      bg_clip = ImageClip(np.array(bg_image)).with_duration(duration)
-    else:
-      bg_clip = ColorClip(
-        size=(width, height), color=BG_COLOR,
-      ).with_duration(duration)
-    scene_layers.append(bg_clip)
+def _analyze_lipsync(audio_paths: list[Path], fps: int) -> None:
+  """全セリフの口パクを一括解析してキャッシュを温める（シーン描画時はキャッシュから読む）"""
+  analyze_mouth_states_batch(
+    audio_paths, fps,
+    threshold=LIPSYNC_THRESHOLD,
+    min_open_frames=LIPSYNC_MIN_OPEN_FRAMES,
+    cache_dir=LIPSYNC_CACHE_DIR,
+    envelopes=[voice_envelope(path, fps) for path in audio_paths],
+  )
 
-    # 2) ロゴレイヤー（プルプル震え、背景とチャットの間）
-    if portrait_logo_arr is not None:
-      logo_clip = (
-        ImageClip(portrait_logo_arr, transparent=True)
-        .with_duration(duration)
-      )
-      logo_bx = (width - portrait_logo_w) // 2
-      logo_by = (height - portrait_logo_h) // 2
-      logo_clip = logo_clip.with_position(
-        lambda t, bx=logo_bx, by=logo_by: (
-          bx + int(3 * np.sin(2 * np.pi * 2.5 * t)),
-          by + int(3 * np.sin(2 * np.pi * 3.0 * t + np.pi / 3)),
-        ),
-      )
-      scene_layers.append(logo_clip)
 
-    # 3) チャットオーバーレイレイヤー（吹き出し + アイコン）
-    chat_clip = (
-      ImageClip(chat_overlay_arr, transparent=True)
-      .with_duration(duration)
+def _scene_frame_count(duration: float, fps: int) -> int:
+  """シーンのフレーム数（フレーム境界に揃えるため切り捨て）"""
+  return int(duration * fps)
+
+
+@dataclass
+class _ScenePlan:
+  """本編を構成する1シーン（描画はシーン先頭を 0 秒とするローカル時刻）"""
+
+  kind: str  # "opening" / "line" / "ending"
+  index: int
+  duration: float
+  n_frames: int
+  audio_path: Path | None = None   # セリフ音声（PCM は音声配置時に都度読む）
+  audio: np.ndarray | None = None  # OP/ED の合成済み音声
+
+  def task(
+    self, orientation: str, path: Path, bg_image_path: Path | None,
+  ) -> _SegmentTask:
+    return _SegmentTask(
+      orientation=orientation, kind=self.kind, index=self.index,
+      duration=self.duration, n_frames=self.n_frames, path=path,
+      bg_image_path=bg_image_path, audio_path=self.audio_path,
     )
-    scene_layers.append(chat_clip)
 
-    scene = (
-      CompositeVideoClip(scene_layers, size=(width, height))
-      .with_duration(duration)
-      .with_audio(audio)
+
+def _plan_scenes(
+  audio_paths: list[Path],
+  title: str,
+  voices: tuple[Path | None, Path | None],
+  fps: int,
+) -> list[_ScenePlan]:
+  """OP・セリフ・ED のシーン一覧を作る（セリフ尺は音声マニフェストから読む）"""
+  scenes = []
+  if title and OPENING_LOGO_PATH.exists():
+    opening_pcm = _timeline_samples(_create_opening_audio())
+    scenes.append(_ScenePlan(
+      "opening", 0, OPENING_DURATION, _scene_frame_count(OPENING_DURATION, fps),
+      audio=opening_pcm,
+    ))
+  for i, audio_path in enumerate(audio_paths):
+    duration = voice_duration(audio_path)
+    scenes.append(_ScenePlan(
+      "line", i, duration, _scene_frame_count(duration, fps), audio_path=audio_path,
+    ))
+  if ENDING_CALL_VOICE_TSUNO_PATH.exists():
+    ending_audio, ending_duration = _create_ending_audio(voices)
+    scenes.append(_ScenePlan(
+      "ending", 0, ending_duration, _scene_frame_count(ending_duration, fps),
+      audio=ending_audio.samples,
+    ))
+  return scenes
+
+
+def _scene_soundtrack(
+  scenes: list[_ScenePlan],
+  fps: int,
+  backing: Path | None = None,
+) -> AudioTimeline:
+  """各シーンの開始フレームに音声を配置し、BGM をミックスした本編音声を作る
+
+  セリフの PCM は配置する直前に読み、配置が済めば手放す。
+  """
+  counts = [scene.n_frames for scene in scenes]
+  starts = np.concatenate([[0], np.cumsum(counts)]) / fps
+  has_op = bool(scenes) and scenes[0].kind == "opening"
+  parts = (
+    (float(start), load_voice_pcm(scene.audio_path) if scene.audio_path else scene.audio)
+    for scene, start in zip(scenes, starts)
+  )
+  return _build_soundtrack(
+    parts, int(sum(counts)) / fps,
+    bgm_start=OPENING_DURATION if has_op else 0.0,
+    backing=backing,
+  )
+
+
+def _bookend_cache() -> SegmentCache:
+  """実行をまたいで共有する OP/ED セグメントのキャッシュ"""
+  return SegmentCache(OPENING_ENDING_CACHE_DIR)
+
+
+def _bookend_segment(
+  cache: SegmentCache,
+  task: _SegmentTask,
+  dialogue: list[DialogueLine],
+  title: str,
+  voices: tuple[Path | None, Path | None],
+  profile: RenderProfile,
+) -> Path:
+  """OP/ED のセグメントをキャッシュから返す（無ければ task.path に描画して格納する）"""
+  key = _segment_cache_key(task, dialogue, title, profile, voices)
+  cached = cache.lookup(key)
+  if cached:
+    logger.info("%s セグメントをキャッシュから使用: %s", task.kind, cached.name)
+    return cached
+  _render_segment(task)
+  return cache.store(key, task.path)
+
+
+def _compose_segmented(
+  orientation: str,
+  dialogue: list[DialogueLine],
+  audio_paths: list[Path],
+  output_path: Path,
+  bg_image_path: Path | None,
+  title: str,
+  workers: int,
+  profile: RenderProfile,
+  cache_dir: Path | None = None,
+) -> float:
+  """シーン単位のセグメントをレンダリングし、再エンコードなしで連結する
+
+  各シーンはフレーム境界に揃えた長さ（int(秒数 × fps) フレーム）で映像のみ
+  書き出し、音声（セリフ＋OP/ED＋BGM）は各シーンの開始フレームに合わせて
+  親プロセスで一本の PCM WAV にまとめ、最終連結時に一度だけ多重化する。
+  シーンの映像は前後のシーンに依存しないため、cache_dir を指定すると
+  内容が変わっていないシーンはキャッシュ済みセグメントを流用する。
+  OP/ED は cache_dir に関係なく実行をまたいで共有するキャッシュを使う。
+
+  Returns:
+    動画全体の秒数
+  """
+  size = profile.size(orientation)
+  voices = _pick_ending_voices()
+  scenes = _plan_scenes(audio_paths, title, voices, profile.fps)
+  total_duration = sum(scene.n_frames for scene in scenes) / profile.fps
+
+  if orientation == "landscape":
+    _analyze_lipsync(audio_paths, profile.fps)
+
+  line_cache = SegmentCache(cache_dir) if cache_dir else None
+  bookends = _bookend_cache()
+  output_path.parent.mkdir(parents=True, exist_ok=True)
+  with tempfile.TemporaryDirectory(
+    prefix=f".{output_path.stem}_", dir=output_path.parent,
+  ) as tmp:
+    tmp_dir = Path(tmp)
+    segment_paths: list[Path] = []
+    pending: list[tuple[SegmentCache | None, str | None, _SegmentTask]] = []
+    for k, scene in enumerate(scenes):
+      if scene.n_frames == 0:
+        continue
+      task = scene.task(orientation, tmp_dir / f"seg_{k:04d}.mp4", bg_image_path)
+      cache = line_cache if scene.kind == "line" else bookends
+      key = None
+      if cache:
+        key = _segment_cache_key(task, dialogue, title, profile, voices)
+        cached = cache.lookup(key)
+        if cached:
+          segment_paths.append(cached)
+          continue
+        # 一時ディレクトリで書き終えてからキャッシュへ移動する
+        task.path = tmp_dir / f"{key}.mp4"
+        segment_paths.append(cache.path_for(key))
+      else:
+        segment_paths.append(task.path)
+      pending.append((cache, key, task))
+
+    # シーンの開始フレームに音声を配置した本編音声（一時ファイル上で組み立てる）
+    audio_wav = tmp_dir / "soundtrack.wav"
+    _scene_soundtrack(
+      scenes, profile.fps, backing=tmp_dir / "soundtrack.f32",
+    ).write_wav(audio_wav)
+
+    if len(segment_paths) > len(pending):
+      logger.info(
+        "セグメントキャッシュ: %d 件ヒット / %d 件再描画",
+        len(segment_paths) - len(pending), len(pending),
+      )
+    logger.info(
+      "セグメントレンダリング開始: %d セグメント, %d フレーム, %d プロセス",
+      len(pending), sum(task.n_frames for _, _, task in pending), workers,
     )
-    clips.append(scene)
+    start_time = time.time()
+    rendered_frames = 0
+
+    initargs = (dialogue, title, voices, profile)
+    if workers > 1 and len(pending) > 1:
+      with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_segment_worker,
+        initargs=initargs,
+      ) as pool:
+        future_map = {
+          pool.submit(_render_segment, task): (cache, key, task)
+          for cache, key, task in pending
+        }
+        for done, future in enumerate(as_completed(future_map), 1):
+          cache, key, task = future_map[future]
+          future.result()
+          if key:
+            cache.store(key, task.path)
+          rendered_frames += task.n_frames
+          logger.info("セグメント完了 [%d/%d]: %s", done, len(pending), task.kind)
+    elif pending:
+      _init_segment_worker(*initargs)
+      try:
+        for done, (cache, key, task) in enumerate(pending, 1):
+          _render_segment(task)
+          if key:
+            cache.store(key, task.path)
+          rendered_frames += task.n_frames
+          logger.info("セグメント完了 [%d/%d]: %s", done, len(pending), task.kind)
+      finally:
+        _segment_state.clear()
+
+    concat_segments(segment_paths, output_path, audio_path=audio_wav)
+
+  if line_cache:
+    line_cache.prune({path.name.removesuffix(line_cache.suffix) for path in segment_paths})
+  bookends.trim(OPENING_ENDING_CACHE_MAX)
+
+  elapsed = time.time() - start_time
+  logger.info(
+    "セグメントレンダリング完了: %.1f秒 (%d フレーム描画, %.1f fps, %dx%d)",
+    elapsed, rendered_frames,
+    rendered_frames / elapsed if elapsed > 0 else 0.0, *size,
+  )
+  record_encode_stats(output_path, profile.encoding, total_duration, elapsed)
+  return total_duration
 
-  # エンディングクリップ
-  ending = _create_ending_clip((width, height), bg_image_path)
-  if ending:
-    clips.append(ending)
 
-  # 全セリフを結合して出力
-  final = concatenate_videoclips(clips, method="compose")
-  has_op = title and OPENING_LOGO_PATH.exists()
-  final = _mix_bgm(final, bgm_start=OPENING_DURATION if has_op else 0.0)
+def _compose_streaming(
+  orientation: str,
+  dialogue: list[DialogueLine],
+  audio_paths: list[Path],
+  output_path: Path,
+  bg_image_path: Path | None,
+  title: str,
+  profile: RenderProfile,
+  renderer: str = "python",
+  frame_workers: int = 1,
+) -> float:
+  """シーンを1つずつ組み立て・描画・解放しながら1本の ffmpeg パイプへ流し込む
+
+  全シーンのクリップを作ってから連結する逐次合成と違い、同時に存在する
+  シーンクリップは常に1つで、エンコーダーへの待ちフレームも
+  STREAM_MAX_QUEUED_FRAMES 枚までに制限する。シーン尺と音声配置は
+  セグメント合成と同じくフレーム境界に揃え、本編音声は一時ファイル上の
+  タイムラインで組み立てて WAV に書き出してから多重化する。
+  長尺（数百セリフ）でもメモリ・ファイルディスクリプタ使用量がセリフ数に比例しない。
+
+  Returns:
+    動画全体の秒数
+  """
+  voices = _pick_ending_voices()
+  scenes = _plan_scenes(audio_paths, title, voices, profile.fps)
 
-  # Shorts用: 3分を超える場合は警告（台本を手動で削る）
-  if final.duration > SHORTS_MAX_DURATION:
-    over = final.duration - SHORTS_MAX_DURATION
+  if orientation == "landscape":
+    _analyze_lipsync(audio_paths, profile.fps)
+
+  output_path.parent.mkdir(parents=True, exist_ok=True)
+  with tempfile.TemporaryDirectory(
+    prefix=f".{output_path.stem}_", dir=output_path.parent,
+  ) as tmp:
+    tmp_dir = Path(tmp)
+    audio_wav = tmp_dir / "soundtrack.wav"
+    _scene_soundtrack(
+      scenes, profile.fps, backing=tmp_dir / "soundtrack.f32",
+    ).write_wav(audio_wav)
+    try:
+      _stream_scenes(
+        orientation, dialogue, title, voices, scenes,
+        audio_wav, output_path, bg_image_path, profile, renderer, frame_workers,
+      )
+    finally:
+      _segment_state.clear()
+  return sum(scene.n_frames for scene in scenes) / profile.fps
+
+
+def _render_filtergraph_body(
+  lines: list[_ScenePlan],
+  body_path: Path,
+  audio_path: Path | None,
+  bg_image_path: Path | None,
+  profile: RenderProfile,
+) -> bool:
+  """横長のセリフシーン列を filter_complex で描画・エンコードする
+
+  各シーンは Python 描画と同じコンポジター（スプライト・位置・口パクの選択）を
+  overlay 指定に変換するため、描画中のフレームごとの Python 処理は無い。
+  シーンは FILTERGRAPH_CHUNK_SCENES 個ずつ別のグラフにして別々にエンコードし、
+  再エンコードなしで連結する（1フレームあたりの overlay 数を台本の長さによらず一定にする）。
+  レイアウトは _segment_state に準備済みのものを使う。
+
+  Returns:
+    描画したか（ffmpeg に必要なフィルタが無い・式にできないレイヤーがある場合は
+    何も書き出さずに False を返す）
+  """
+  missing = missing_filters()
+  if missing:
     logger.warning(
-      "Shorts上限(%.0fs)を%.0fs超過しています。台本を短くしてください。",
-      SHORTS_MAX_DURATION, over,
+      "ffmpeg に必要なフィルタが無いため Python で描画します: %s", ", ".join(missing),
     )
+    return False
+  layout = _segment_layout("landscape", bg_image_path)
+  dialogue = _segment_state["dialogue"]
+  fps = profile.fps
+  chunk_scenes = max(1, FILTERGRAPH_CHUNK_SCENES)
+  with tempfile.TemporaryDirectory(
+    prefix=f".{body_path.stem}_graph_", dir=body_path.parent,
+  ) as tmp:
+    graphs = []
+    try:
+      for start in range(0, len(lines), chunk_scenes):
+        work_dir = Path(tmp) / f"chunk{len(graphs)}"
+        work_dir.mkdir()
+        graph = OverlayGraph(work_dir, layout.bg_array, fps)
+        for plan in lines[start:start + chunk_scenes]:
+          compositor = layout.build_compositor(dialogue[plan.index], plan.audio_path)
+          graph.add_scene(plan.n_frames, compositor.to_overlays(graph, plan.n_frames))
+        graphs.append(graph)
+    except FiltergraphUnsupported as e:
+      logger.warning("フィルタグラフで表現できないため Python で描画します: %s", e)
+      return False
+
+    if len(graphs) == 1:
+      encode_filtergraph(
+        graphs[0].write_script(), OUTPUT_LABEL, body_path, fps, graphs[0].n_frames,
+        audio_path=audio_path, encoding=profile.encoding,
+      )
+      return True
+    chunk_paths = []
+    for graph in graphs:
+      chunk_path = graph.work_dir.with_suffix(".mp4")
+      encode_filtergraph(
+        graph.write_script(), OUTPUT_LABEL, chunk_path, fps, graph.n_frames,
+        encoding=profile.encoding,
+      )
+      chunk_paths.append(chunk_path)
+    concat_segments(chunk_paths, body_path, audio_path=audio_path)
+  return True
 
-  output_path.parent.mkdir(parents=True, exist_ok=True)
-  final.write_videofile(
-    str(output_path),
-    fps=VIDEO_FPS,
-    codec="libx264",
-    audio_codec="aac",
-    logger="bar",
+
+def _produce_ring_frames(
+  ring: FrameRing,
+  worker: int,
+  n_workers: int,
+  tasks: list[_SegmentTask],
+  initargs: tuple,
+) -> None:
+  """フレーム並列ワーカー: 本編の通し番号 ≡ worker (mod n_workers) のフレームを ring に書き込む
+
+  シーンは担当フレームがあるものだけ組み立てる。fork で起動した場合は
+  親プロセスで準備済みのレイアウト（背景・スプライト）をそのまま使う。
+  """
+  _init_segment_worker(*initargs)
+  fps = _segment_state["profile"].fps
+  offset = 0
+  for task in tasks:
+    end = offset + task.n_frames
+    first = offset + (worker - offset) % n_workers
+    if first < end:
+      scene = _build_segment_scene(task)
+      try:
+        for index in range(first, end, n_workers):
+          ring.put(index, scene.get_frame((index - offset) / fps))
+      finally:
+        scene.close()
+    offset = end
+  _log_frame_cache(
+    tasks[0].orientation, tasks[0].bg_image_path, f"{tasks[0].orientation} #{worker}",
   )
-  final.close()
-  logger.info("縦長動画出力完了: %s (%.0fs)", output_path, final.duration)
+
+
+def _render_parallel_body(
+  orientation: str,
+  lines: list[_ScenePlan],
+  body_path: Path,
+  audio_path: Path | None,
+  bg_image_path: Path | None,
+  profile: RenderProfile,
+  workers: int,
+) -> None:
+  """セリフシーン列を workers 個のプロセスでフレーム並列に描画し、1本の ffmpeg パイプへ書き込む
+
+  描画済みフレームは共有メモリのリングバッファから通し番号順に読み出し、
+  コピーせずにパイプへ渡す。レイアウトは _segment_state に準備済みのものを使い、
+  横長のキャラクタースプライトも fork 前に作っておく（ワーカーでは作り直さない）。
+  """
+  state = _segment_state
+  layout = _segment_layout(orientation, bg_image_path)
+  if orientation == "landscape":
+    layout.prepare_sprites(state["dialogue"])
+  size = profile.size(orientation)
+  tasks = [plan.task(orientation, body_path, bg_image_path) for plan in lines]
+  ends = np.cumsum([plan.n_frames for plan in lines])
+  initargs = (state["dialogue"], state["title"], state["voices"], profile)
+  # ワーカーへエンコーダーのパイプを引き継がないよう、先にワーカーを起動する
+  with ParallelFrameSource(
+    _produce_ring_frames, (tasks, initargs), size, int(ends[-1]),
+    workers, FRAME_RING_SLOTS,
+  ) as source, FFmpegPipeWriter(
+    body_path, size, profile.fps, encoding=profile.encoding, audio_path=audio_path,
+  ) as writer:
+    k = 0
+    for frame in source:
+      writer.write_frame(frame)
+      if writer.frames_written == ends[k]:
+        k += 1
+        logger.info(
+          "シーン完了(%s) [%d/%d]: %s (%d フレーム)",
+          orientation, k, len(lines), lines[k - 1].kind, writer.frames_written,
+        )
+
+
+def _stream_scenes(
+  orientation: str,
+  dialogue: list[DialogueLine],
+  title: str,
+  voices: tuple[Path | None, Path | None],
+  scenes: list[_ScenePlan],
+  audio_wav: Path,
+  output_path: Path,
+  bg_image_path: Path | None,
+  profile: RenderProfile,
+  renderer: str = "python",
+  frame_workers: int = 1,
+) -> None:
+  """シーン一覧を1シーンずつ組み立て・描画・解放して ffmpeg パイプへ書き込む
+
+  レイアウトは _segment_state に準備済みのものを使う（無ければ作る）。
+  OP/ED は実行をまたいで共有するキャッシュのセグメントを使い（無ければ描画して格納）、
+  パイプで書き出した本編と再エンコードなしで連結する。
+  横長で renderer が "filtergraph" なら、本編はパイプの代わりに
+  _render_filtergraph_body で描画する（対応できなければパイプで描画する）。
+  frame_workers が 2 以上なら、パイプへ書き込む本編は _render_parallel_body で
+  フレーム並列に描画する。
+  """
+  size = profile.size(orientation)
+  total_frames = sum(scene.n_frames for scene in scenes)
+  logger.info(
+    "ストリーミングレンダリング開始(%s): %d シーン, %d フレーム (待ちフレーム上限 %d)",
+    orientation, len(scenes), total_frames, STREAM_MAX_QUEUED_FRAMES,
+  )
+  start_time = time.time()
+  _init_segment_worker(dialogue, title, voices, profile)
+
+  # 連結する区間（None はパイプで書き出す本編）
+  bookends = _bookend_cache()
+  parts: list[Path | None] = []
+  lines = []
+  for plan in scenes:
+    if plan.n_frames == 0:
+      continue
+    if plan.kind == "line":
+      lines.append(plan)
+      if None not in parts:
+        parts.append(None)
+      continue
+    task = plan.task(
+      orientation, output_path.with_name(f".{output_path.stem}.{plan.kind}.mp4"),
+      bg_image_path,
+    )
+    parts.append(_bookend_segment(bookends, task, dialogue, title, voices, profile))
+
+  body_path = output_path
+  if parts != [None]:
+    body_path = output_path.with_name(f".{output_path.stem}.body.mp4")
+  body_audio = audio_wav if body_path == output_path else None
+  try:
+    rendered = False
+    if lines and renderer == "filtergraph" and orientation == "landscape":
+      rendered = _render_filtergraph_body(
+        lines, body_path, body_audio, bg_image_path, profile,
+      )
+    if lines and not rendered and frame_workers > 1:
+      _render_parallel_body(
+        orientation, lines, body_path, body_audio, bg_image_path, profile, frame_workers,
+      )
+    elif lines and not rendered:
+      with FFmpegPipeWriter(
+        body_path, size, profile.fps, encoding=profile.encoding,
+        audio_path=body_audio,
+        max_queued_frames=STREAM_MAX_QUEUED_FRAMES,
+      ) as writer:
+        for k, plan in enumerate(lines, 1):
+          scene = _build_segment_scene(plan.task(orientation, body_path, bg_image_path))
+          try:
+            for frame_idx in range(plan.n_frames):
+              writer.write_frame(scene.get_frame(frame_idx / profile.fps))
+          finally:
+            scene.close()
+          logger.info(
+            "シーン完了(%s) [%d/%d]: %s (%d フレーム)",
+            orientation, k, len(lines), plan.kind, writer.frames_written,
+          )
+    if body_path != output_path:
+      concat_segments(
+        [body_path if part is None else part for part in parts],
+        output_path, audio_path=audio_wav,
+      )
+  finally:
+    if body_path != output_path:
+      body_path.unlink(missing_ok=True)
+  bookends.trim(OPENING_ENDING_CACHE_MAX)
+  _log_frame_cache(orientation, bg_image_path, orientation)
+
+  elapsed = time.time() - start_time
+  logger.info(
+    "ストリーミングレンダリング完了(%s): %.1f秒 (%d フレーム, %.1f fps, %dx%d)",
+    orientation, elapsed, total_frames,
+    total_frames / elapsed if elapsed > 0 else 0.0, *size,
+  )
+  record_encode_stats(output_path, profile.encoding, total_frames / profile.fps, elapsed)
+
+
+def _shorts_scenes(scenes: list[_ScenePlan], kept: list[int]) -> list[_ScenePlan]:
+  """横長のシーン一覧から Shorts 用に残すセリフだけを選ぶ（インデックスは詰め直す）"""
+  position = {index: i for i, index in enumerate(kept)}
+  return [
+    scene if scene.kind != "line" else replace(scene, index=position[scene.index])
+    for scene in scenes
+    if scene.kind != "line" or scene.index in position
+  ]
+
+
+def compose_all(
+  dialogue: list[DialogueLine],
+  audio_paths: list[Path],
+  landscape_path: Path,
+  portrait_path: Path,
+  landscape_bg: Path | None = None,
+  portrait_bg: Path | None = None,
+  title: str = "",
+  concurrent: bool | None = None,
+  profile: str | None = None,
+  renderer: str | None = None,
+  frame_workers: int | None = None,
+) -> None:
+  """横長・縦長の動画を、音声・口パク・素材の準備を共有してまとめて合成する
+
+  ED ボイスの選択・口パク解析・OP/ED 音声・本編音声（縦長で省略するセリフが
+  無ければ横長と同じ WAV）・両レイアウトの背景／キャラ素材／アイコンは一度だけ
+  用意し、各向きはストリーミング描画（ffmpeg パイプ直結）で書き出す。
+  そのため VIDEO_ENCODER（moviepy）・RENDER_WORKERS（セグメント並列描画）の
+  設定は使わない（main の --compose-all は --encoder moviepy / --workers を拒否する）。
+  縦長は compose_portrait と同じく shorts_skip による省略を適用する。
+
+  Args:
+    dialogue: セリフリスト
+    audio_paths: 各セリフに対応するWAVファイルパスのリスト
+    landscape_path: 横長動画の出力先MP4パス
+    portrait_path: 縦長動画の出力先MP4パス
+    landscape_bg: 横長の背景画像パス
+    portrait_bg: 縦長の背景画像パス
+    title: エピソードタイトル（空文字ならOPスキップ）
+    concurrent: True なら2つのエンコーダープロセスで横長・縦長を同時に描画する
+      （None なら COMPOSE_ALL_CONCURRENT 設定値）
+    profile: レンダリングプロファイル名（"final" / "draft"、None なら設定値）
+    renderer: 横長本編の描画方式（"python" / "filtergraph"、None なら設定値）
+    frame_workers: 各向きの本編をフレーム並列に描画するプロセス数（None なら設定値）
+  """
+  render_profile = get_profile(profile)
+  renderer = renderer or LANDSCAPE_RENDERER
+  frame_workers = frame_workers or FRAME_WORKERS
+  if concurrent is None:
+    concurrent = COMPOSE_ALL_CONCURRENT
+  voices = _pick_ending_voices()
+  kept = _shorts_line_indices(dialogue, audio_paths)
+  portrait_dialogue = [dialogue[i] for i in kept]
+
+  _analyze_lipsync(audio_paths, render_profile.fps)
+  landscape_scenes = _plan_scenes(audio_paths, title, voices, render_profile.fps)
+  portrait_scenes = _shorts_scenes(landscape_scenes, kept)
+
+  # 両レイアウトを先に準備する（並列時は fork したプロセスへそのまま引き継ぐ）
+  _init_segment_worker(dialogue, title, voices, render_profile)
+  _segment_layout("landscape", landscape_bg)
+  _segment_layout("portrait", portrait_bg)
+
+  landscape_path.parent.mkdir(parents=True, exist_ok=True)
+  try:
+    with tempfile.TemporaryDirectory(
+      prefix=".compose_all_", dir=landscape_path.parent,
+    ) as tmp:
+      tmp_dir = Path(tmp)
+      landscape_wav = tmp_dir / "landscape.wav"
+      _scene_soundtrack(
+        landscape_scenes, render_profile.fps, backing=tmp_dir / "landscape.f32",
+      ).write_wav(landscape_wav)
+      portrait_wav = landscape_wav
+      if len(kept) < len(dialogue):
+        portrait_wav = tmp_dir / "portrait.wav"
+        _scene_soundtrack(
+          portrait_scenes, render_profile.fps, backing=tmp_dir / "portrait.f32",
+        ).write_wav(portrait_wav)
+
+      jobs = [
+        ("landscape", dialogue, landscape_scenes, landscape_wav, landscape_path, landscape_bg),
+        ("portrait", portrait_dialogue, portrait_scenes, portrait_wav, portrait_path, portrait_bg),
+      ]
+      if concurrent:
+        # fork できる環境では準備済みの素材をコピーせずに子プロセスへ引き継ぐ
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(
+          max_workers=len(jobs), mp_context=multiprocessing.get_context(method),
+        ) as pool:
+          futures = [
+            pool.submit(
+              _stream_scenes, orientation, lines, title, voices, scenes, wav, path, bg,
+              render_profile, renderer, frame_workers,
+            )
+            for orientation, lines, scenes, wav, path, bg in jobs
+          ]
+          for future in futures:
+            future.result()
+      else:
+        for orientation, lines, scenes, wav, path, bg in jobs:
+          _stream_scenes(
+            orientation, lines, title, voices, scenes, wav, path, bg, render_profile,
+            renderer, frame_workers,
+          )
+  finally:
+    _segment_state.clear()
+
+  portrait_duration = sum(scene.n_frames for scene in portrait_scenes) / render_profile.fps
+  _warn_shorts_duration(portrait_duration)
+  logger.info("横長動画出力完了: %s", landscape_path)
+  logger.info("縦長動画出力完了: %s (%.0fs)", portrait_path, portrait_duration)
+
+
+def render_line_frames(
+  dialogue: list[DialogueLine],
+  orientation: str,
+  bg_image_path: Path | None = None,
+  profile: str | None = None,
+) -> Iterator[np.ndarray]:
+  """各セリフのシーンの代表フレーム（シーン先頭）を順に返す（絵コンテ用）
+
+  本番と同じレイアウト（キャラ・字幕・チャット吹き出し）で組み立てるが、
+  音声は使わないため TTS もエンコードも不要（口パクは口閉じで描く）。
+  返すフレームは呼び出しごとに新しい配列。
+
+  Args:
+    dialogue: セリフリスト
+    orientation: "landscape" / "portrait"
+    bg_image_path: 背景画像パス
+    profile: レンダリングプロファイル名（None なら設定値）
+  """
+  render_profile = get_profile(profile)
+  if orientation == "landscape":
+    layout = _LandscapeLayout(bg_image_path, render_profile)
+  else:
+    layout = _PortraitLayout(bg_image_path, render_profile)
+  for i, line in enumerate(dialogue):
+    if orientation == "landscape":
+      scene = layout.build_scene(line, None, 1.0)
+    else:
+      scene = layout.build_scene(dialogue, i, 1.0)
+    try:
+      yield np.array(scene.get_frame(0.0))
+    finally:
+      scene.close()
+
+
+class SegmentPrerenderer:
+  """音声合成と並行してセリフのセグメントを先行レンダリングする
+
+  AudioGenerator.generate の on_ready に submit_line を渡すと、WAV ができた
+  セリフから順にワーカープロセスで描画し、セグメントキャッシュへ格納する。
+  その後 compose_landscape / compose_portrait に同じ cache_dir を渡せば、
+  描画済みのシーンはキャッシュから連結されるだけになる。
+  OP は台本だけで決まるため開始時に投入する（ED はボイスをランダムに選ぶため対象外）。
+  OP は実行をまたいで共有する OP/ED キャッシュへ格納する。
+  縦長は compose_portrait と同じく Shorts 用に絞った台本（shorts_skip の除外と
+  インデックスの詰め直し）で描画・キー計算する。絞るかどうかはセリフ音声の合計尺で
+  決まるため、決まるまで（見積もりが上限を超えるか全セリフが揃うまで）縦長の投入を保留する。
+  """
+
+  def __init__(
+    self,
+    dialogue: list[DialogueLine],
+    title: str,
+    cache_root: Path,
+    landscape_bg: Path | None = None,
+    portrait_bg: Path | None = None,
+    workers: int | None = None,
+    profile: str | None = None,
+  ):
+    self.dialogue = dialogue
+    self.title = title
+    self.cache_root = cache_root
+    self.profile = get_profile(profile)
+    self._backgrounds = {"landscape": landscape_bg, "portrait": portrait_bg}
+    self._caches = {
+      orientation: SegmentCache(self.cache_dir(orientation))
+      for orientation in self._backgrounds
+    }
+    self._bookends = _bookend_cache()
+    self._tmp = tempfile.TemporaryDirectory(prefix=".prerender_", dir=cache_root)
+    # 音声合成スレッドの稼働中にワーカーが起動することがあるため fork は避ける
+    self._pool = ProcessPoolExecutor(
+      max_workers=workers or RENDER_WORKERS,
+      mp_context=multiprocessing.get_context("spawn"),
+      initializer=_init_segment_worker,
+      initargs=(dialogue, title, (None, None), self.profile),
+    )
+    self._futures = {}
+    self._rendered = 0
+
+    # 縦長の台本（None なら Shorts 用に絞るか未確定）と、元の番号 → 縦長での番号
+    self._portrait_dialogue: list[DialogueLine] | None = None
+    self._portrait_index: dict[int, int] = {}
+    self._portrait_pending: list[tuple[int, Path, float]] = []
+    self._audio_total = 0.0
+    self._received = 0
+    if not any(line.shorts_skip for line in dialogue):
+      self._decide_portrait(filtered=False)
+
+    if title and OPENING_LOGO_PATH.exists():
+      for orientation in self._backgrounds:
+        self._submit(orientation, "opening", 0, OPENING_DURATION)
+
+  def cache_dir(self, orientation: str) -> Path:
+    """compose_* に渡すセグメントキャッシュのディレクトリ
+
+    連結後の掃除で別プロファイルのセグメントを消さないよう、プロファイルごとに分ける。
+    """
+    return self.cache_root / self.profile.name / orientation
+
+  def submit_line(self, index: int, audio_path: Path) -> None:
+    """WAV ができたセリフの横長・縦長セグメントを描画キューへ投入する"""
+    duration = voice_duration(audio_path)
+    self._submit("landscape", "line", index, duration, audio_path)
+    self._audio_total += duration
+    self._received += 1
+    if self._portrait_dialogue is not None:
+      self._submit_portrait_line(index, audio_path, duration)
+    else:
+      self._portrait_pending.append((index, audio_path, duration))
+      if _estimated_shorts_duration(self._audio_total) > SHORTS_MAX_DURATION:
+        self._decide_portrait(filtered=True)
+      elif self._received == len(self.dialogue):
+        self._decide_portrait(filtered=False)
+    self._collect(block=False)
+
+  def _decide_portrait(self, filtered: bool) -> None:
+    """縦長の台本を確定し、保留していた縦長セリフを投入する"""
+    kept = [
+      i for i, line in enumerate(self.dialogue) if not (filtered and line.shorts_skip)
+    ]
+    self._portrait_dialogue = (
+      self.dialogue if len(kept) == len(self.dialogue) else [self.dialogue[i] for i in kept]
+    )
+    self._portrait_index = {i: k for k, i in enumerate(kept)}
+    pending, self._portrait_pending = self._portrait_pending, []
+    for index, audio_path, duration in pending:
+      self._submit_portrait_line(index, audio_path, duration)
+
+  def _submit_portrait_line(self, index: int, audio_path: Path, duration: float) -> None:
+    portrait_index = self._portrait_index.get(index)
+    if portrait_index is None:
+      return  # Shorts では省略するセリフ
+    self._submit(
+      "portrait", "line", portrait_index, duration, audio_path,
+      dialogue=self._portrait_dialogue,
+    )
+
+  def _submit(
+    self,
+    orientation: str,
+    kind: str,
+    index: int,
+    duration: float,
+    audio_path: Path | None = None,
+    dialogue: list[DialogueLine] | None = None,
+  ) -> None:
+    n_frames = _scene_frame_count(duration, self.profile.fps)
+    if n_frames == 0:
+      return
+    task = _SegmentTask(
+      orientation=orientation, kind=kind, index=index, duration=duration,
+      n_frames=n_frames, path=Path(self._tmp.name),
+      bg_image_path=self._backgrounds[orientation], audio_path=audio_path,
+      dialogue=dialogue if dialogue is not self.dialogue else None,
+    )
+    key = _segment_cache_key(task, dialogue or self.dialogue, self.title, self.profile)
+    cache = self._caches[orientation] if kind == "line" else self._bookends
+    if cache.path_for(key).exists():
+      return
+    task.path = Path(self._tmp.name) / f"{orientation}_{key}.mp4"
+    self._futures[self._pool.submit(_render_segment, task)] = (cache, key, task)
+
+  def _collect(self, block: bool) -> None:
+    """完了したセグメントをキャッシュへ移す"""
+    futures = list(self._futures)
+    done = as_completed(futures) if block else [f for f in futures if f.done()]
+    for future in done:
+      cache, key, task = self._futures.pop(future)
+      future.result()
+      cache.store(key, task.path)
+      self._rendered += 1
+
+  def close(self) -> None:
+    """投入済みセグメントの描画完了を待ってワーカーを終了する"""
+    start = time.time()
+    try:
+      self._collect(block=True)
+    finally:
+      self._pool.shutdown(cancel_futures=True)
+      self._tmp.cleanup()
+    logger.info(
+      "先行レンダリング完了: %d セグメント（残り待ち %.1f秒）",
+      self._rendered, time.time() - start,
+    )
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    if exc_type is None:
+      self.close()
+    else:
+      self._pool.shutdown(cancel_futures=True)
+      self._tmp.cleanup()
+    return False
@@ -29,6 +29,7 @@
 """
 
 import argparse
+import contextlib
 import json
 import logging
 import shutil
@@ -38,12 +39,24 @@ from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 
-from src.config import AUDIO_DIR, FONT_PATH, OUTPUT_DIR
+from src.config import (
+  AUDIO_DIR,
+  FONT_PATH,
+  OUTPUT_DIR,
+  RENDER_PROFILES,
+  SEGMENT_CACHE_DIRNAME,
+  VIDEO_ENCODERS,
+)
 from src.generators.audio_generator import AudioGenerator
 from src.generators.background_generator import generate_backgrounds
 from src.generators.script_generator import ScriptGenerator
 from src.generators.thumbnail_generator import generate_thumbnail
-from src.generators.video_composer import compose_landscape, compose_portrait
+from src.generators.video_composer import (
+  SegmentPrerenderer,
+  compose_all,
+  compose_landscape,
+  compose_portrait,
+)
 from src.models import ScriptData
 
 logging.basicConfig(
@@ -65,6 +78,72 @@ def _validate_environment():
     sys.exit(1)
 
 
+def _start_prerenderer(
+  args,
+  script: ScriptData,
+  run_output_dir: Path,
+  landscape_bg: Path | None,
+  portrait_bg: Path | None,
+) -> SegmentPrerenderer | None:
+  """--pipeline 指定時、音声合成と並行してセグメントを描画する先行レンダラーを起動する"""
+  if not args.pipeline:
+    return None
+  logger.info("パイプラインモード: 音声合成と並行して動画セグメントを描画します")
+  return SegmentPrerenderer(
+    script.dialogue, script.meta.title, run_output_dir / SEGMENT_CACHE_DIRNAME,
+    landscape_bg=landscape_bg, portrait_bg=portrait_bg, workers=args.workers,
+    profile=args.profile,
+  )
+
+
+def _compose_videos(
+  args,
+  script: ScriptData,
+  audio_paths: list[Path],
+  run_output_dir: Path,
+  landscape_bg: Path | None,
+  portrait_bg: Path | None,
+  prerenderer: SegmentPrerenderer | None,
+  steps: tuple[str, str],
+) -> tuple[Path, Path]:
+  """横長・縦長動画を合成する（--compose-all なら素材を共有してまとめて合成）
+
+  Args:
+    steps: ログに出す工程番号（横長, 縦長）。例: ("3/4", "4/4")
+
+  Returns:
+    (横長動画パス, 縦長動画パス)
+  """
+  landscape_path = run_output_dir / "landscape.mp4"
+  portrait_path = run_output_dir / "portrait.mp4"
+
+  if args.compose_all:
+    logger.info("[%s] 横長・縦長動画をまとめて合成中...", steps[0])
+    compose_all(
+      script.dialogue, audio_paths, landscape_path, portrait_path,
+      landscape_bg=landscape_bg, portrait_bg=portrait_bg, title=script.meta.title,
+      profile=args.profile,
+    )
+    return landscape_path, portrait_path
+
+  logger.info("[%s] 横長動画 (16:9) を合成中...", steps[0])
+  compose_landscape(
+    script.dialogue, audio_paths, landscape_path, landscape_bg,
+    title=script.meta.title, encoder=args.encoder, workers=args.workers,
+    cache_dir=prerenderer.cache_dir("landscape") if prerenderer else None,
+    stream=args.stream, profile=args.profile,
+  )
+
+  logger.info("[%s] 縦長動画 (9:16) を合成中...", steps[1])
+  compose_portrait(
+    script.dialogue, audio_paths, portrait_path, portrait_bg,
+    title=script.meta.title, encoder=args.encoder, workers=args.workers,
+    cache_dir=prerenderer.cache_dir("portrait") if prerenderer else None,
+    stream=args.stream, profile=args.profile,
+  )
+  return landscape_path, portrait_path
+
+
 def main():
   parser = argparse.ArgumentParser(
     description="Hebodan - テーマから動画を自動生成",
@@ -100,11 +179,57 @@ def main():
     default=None,
     help="既存の背景画像を再利用。出力ディレクトリのパスを指定（例: output/20260210_123456/）",
   )
+  parser.add_argument(
+    "--encoder",
+    choices=VIDEO_ENCODERS,
+    default=None,
+    help="動画エンコーダー（moviepy: write_videofile / ffmpeg: パイプ直結）。省略時は VIDEO_ENCODER 設定値",
+  )
+  parser.add_argument(
+    "--workers",
+    type=int,
+    default=None,
+    help="並列セグメントレンダリングのプロセス数（1 なら逐次）。省略時は RENDER_WORKERS 設定値",
+  )
+  parser.add_argument(
+    "--stream",
+    action="store_true",
+    default=None,
+    help="1シーンずつ組み立て・描画・解放するストリーミング描画（長尺向け）。省略時は STREAMING_RENDER 設定値",
+  )
+  parser.add_argument(
+    "--compose-all",
+    action="store_true",
+    help="横長・縦長動画を音声・口パク・素材の準備を共有してまとめて合成する（ストリーミング描画）",
+  )
+  parser.add_argument(
+    "--profile",
+    choices=RENDER_PROFILES,
+    default=None,
+    help="レンダリングプロファイル（draft: 低解像度・低fps・高速プリセットの確認用）。省略時は RENDER_PROFILE 設定値",
+  )
+  parser.add_argument(
+    "--pipeline",
+    action="store_true",
+    help="音声合成と並行して動画セグメントを描画する（TTS と描画の待ち時間を重ねる）",
+  )
   args = parser.parse_args()
 
   # 引数バリデーション
   if not args.theme and not args.script:
     parser.error("テーマまたは --script のいずれかを指定してください")
+  if args.compose_all and args.pipeline:
+    parser.error("--compose-all と --pipeline は同時に指定できません")
+  # --compose-all は常に ffmpeg パイプへのストリーミング描画で、セグメント並列描画もしない
+  if args.compose_all and args.encoder == "moviepy":
+    parser.error("--compose-all と --encoder moviepy は同時に指定できません")
+  if args.compose_all and args.workers and args.workers > 1:
+    parser.error("--compose-all と --workers は同時に指定できません（ストリーミング描画のみ）")
+  # セグメント描画・ストリーミング描画は ffmpeg パイプでのみ書き出す
+  if args.encoder == "moviepy" and (
+    args.stream or args.pipeline or (args.workers and args.workers > 1)
+  ):
+    parser.error("--encoder moviepy は --stream / --pipeline / --workers と同時に指定できません")
 
   _validate_environment()
 
@@ -161,28 +286,26 @@ def main():
 
     # 音声再生成
     logger.info("[1/4] 音声を生成中...")
-    audio_gen = AudioGenerator()
-    audio_paths = audio_gen.generate(script.dialogue, audio_output_dir)
-
-    # サムネイル生成
-    logger.info("[2/4] サムネイルを生成中...")
-    thumbnail_path = run_output_dir / "thumbnail.png"
-    generate_thumbnail(script.meta.title, thumbnail_path, landscape_bg)
-
-    # 横長動画合成
-    logger.info("[3/4] 横長動画 (16:9) を合成中...")
-    landscape_path = run_output_dir / "landscape.mp4"
-    compose_landscape(
-      script.dialogue, audio_paths, landscape_path, landscape_bg,
-      title=script.meta.title,
+    prerenderer = _start_prerenderer(
+      args, script, run_output_dir, landscape_bg, portrait_bg,
     )
+    # 音声合成が失敗してもワーカープロセスと一時ディレクトリを残さない
+    with prerenderer or contextlib.nullcontext():
+      audio_gen = AudioGenerator()
+      audio_paths = audio_gen.generate(
+        script.dialogue, audio_output_dir,
+        on_ready=prerenderer.submit_line if prerenderer else None,
+      )
+
+      # サムネイル生成
+      logger.info("[2/4] サムネイルを生成中...")
+      thumbnail_path = run_output_dir / "thumbnail.png"
+      generate_thumbnail(script.meta.title, thumbnail_path, landscape_bg)
 
-    # 縦長動画合成
-    logger.info("[4/4] 縦長動画 (9:16) を合成中...")
-    portrait_path = run_output_dir / "portrait.mp4"
-    compose_portrait(
-      script.dialogue, audio_paths, portrait_path, portrait_bg,
-      title=script.meta.title,
+    # 横長・縦長動画合成
+    landscape_path, portrait_path = _compose_videos(
+      args, script, audio_paths, run_output_dir,
+      landscape_bg, portrait_bg, prerenderer, steps=("3/4", "4/4"),
     )
 
     elapsed = time.time() - start_time
@@ -310,28 +433,27 @@ def main():
 
   # ステップ3: 音声生成
   logger.info("[3/%d] 音声を生成中...", total_steps)
-  audio_gen = AudioGenerator()
-  audio_paths = audio_gen.generate(script.dialogue, audio_output_dir)
-
-  # ステップ4: サムネイル生成
-  logger.info("[4/%d] サムネイルを生成中...", total_steps)
-  thumbnail_path = run_output_dir / "thumbnail.png"
-  generate_thumbnail(script.meta.title, thumbnail_path, landscape_bg)
-
-  # ステップ5: 横長動画合成 (16:9)
-  logger.info("[5/%d] 横長動画 (16:9) を合成中...", total_steps)
-  landscape_path = run_output_dir / "landscape.mp4"
-  compose_landscape(
-    script.dialogue, audio_paths, landscape_path, landscape_bg,
-    title=script.meta.title,
+  prerenderer = _start_prerenderer(
+    args, script, run_output_dir, landscape_bg, portrait_bg,
   )
+  # 音声合成が失敗してもワーカープロセスと一時ディレクトリを残さない
+  with prerenderer or contextlib.nullcontext():
+    audio_gen = AudioGenerator()
+    audio_paths = audio_gen.generate(
+      script.dialogue, audio_output_dir,
+      on_ready=prerenderer.submit_line if prerenderer else None,
+    )
 
-  # ステップ6: 縦長動画合成 (9:16)
-  logger.info("[6/%d] 縦長動画 (9:16) を合成中...", total_steps)
-  portrait_path = run_output_dir / "portrait.mp4"
-  compose_portrait(
-    script.dialogue, audio_paths, portrait_path, portrait_bg,
-    title=script.meta.title,
+    # ステップ4: サムネイル生成
+    logger.info("[4/%d] サムネイルを生成中...", total_steps)
+    thumbnail_path = run_output_dir / "thumbnail.png"
+    generate_thumbnail(script.meta.title, thumbnail_path, landscape_bg)
+
+  # ステップ5-6: 横長動画 (16:9)・縦長動画 (9:16) 合成
+  landscape_path, portrait_path = _compose_videos(
+    args, script, audio_paths, run_output_dir,
+    landscape_bg, portrait_bg, prerenderer,
+    steps=(f"5/{total_steps}", f"6/{total_steps}"),
   )
 
   # note記事を保存
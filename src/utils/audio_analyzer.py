@@ -1,30 +1,24 @@
 """WAV音声の振幅解析によるリップシンク判定モジュール"""
 
+import logging
 import math
+import os
+import threading
 import wave
 from pathlib import Path
 
 import numpy as np
 
+from src.utils.segment_cache import file_digest, make_key
 
-def analyze_mouth_states(
-  wav_path: str | Path,
-  fps: int,
-  threshold: float = 0.15,
-  min_open_frames: int = 2,
-) -> np.ndarray:
-  """WAVファイルから各フレームの口の開閉状態を判定する
+logger = logging.getLogger(__name__)
 
-  Args:
-    wav_path: WAVファイルパス
-    fps: 動画のフレームレート
-    threshold: 口を開いたとみなす振幅の閾値（0.0-1.0、正規化済み）
-    min_open_frames: 口を開いたままにする最低フレーム数（チャタリング防止）
+# 解析結果のメモ: キャッシュキー -> 口の開閉状態（横長・縦長・再描画で共有）
+_mouth_state_memo: dict[str, np.ndarray] = {}
 
-  Returns:
-    bool配列。True=口が開いている、False=口が閉じている。
-    配列の長さ = ceil(duration * fps)
-  """
+
+def _read_mono_samples(wav_path: str | Path) -> tuple[np.ndarray, int]:
+  """WAVファイルを読み込み、最大振幅で正規化したモノラル float32 配列を返す"""
   with wave.open(str(wav_path), "rb") as wf:
     n_channels = wf.getnchannels()
     sample_width = wf.getsampwidth()
@@ -47,39 +41,213 @@ def analyze_mouth_states(
     samples = samples.reshape(-1, n_channels).mean(axis=1)
 
   # 最大振幅で正規化
-  max_amp = np.abs(samples).max()
+  max_amp = np.abs(samples).max() if len(samples) else 0.0
   if max_amp > 0:
     samples = samples / max_amp
 
-  # フレーム単位でRMS振幅を計算
-  duration = n_frames / sample_rate
-  total_video_frames = math.ceil(duration * fps)
+  return samples, sample_rate
+
+
+def _frame_rms(samples: np.ndarray, sample_rate: int, fps: int) -> np.ndarray:
+  """動画フレーム単位の RMS 振幅を一括計算する
+
+  フレーム i のサンプル区間は [int(i * sr / fps), int((i + 1) * sr / fps))。
+  二乗値を np.add.reduceat で区間ごとに合計するため Python ループを使わない。
+  """
+  total_video_frames = math.ceil(len(samples) / sample_rate * fps)
+  rms = np.zeros(total_video_frames, dtype=np.float32)
+  if total_video_frames == 0 or len(samples) == 0:
+    return rms
+
   samples_per_frame = sample_rate / fps
+  bounds = (np.arange(total_video_frames + 1) * samples_per_frame).astype(np.int64)
+  bounds = np.minimum(bounds, len(samples))
+  starts = bounds[:-1]
+  counts = np.diff(bounds)
+  valid = counts > 0
 
-  rms_per_frame = np.zeros(total_video_frames, dtype=np.float32)
-  for i in range(total_video_frames):
-    start = int(i * samples_per_frame)
-    end = int((i + 1) * samples_per_frame)
-    end = min(end, len(samples))
-    if start < end:
-      frame_samples = samples[start:end]
-      rms_per_frame[i] = np.sqrt(np.mean(frame_samples ** 2))
+  squared = np.square(samples, dtype=np.float64)
+  sums = np.add.reduceat(squared, starts[valid])
+  rms[valid] = np.sqrt(sums / counts[valid])
+  return rms
 
-  # 閾値で口の開閉を判定
-  mouth_open = rms_per_frame > threshold
-
-  # チャタリング防止: 口を開いたら最低 min_open_frames フレーム維持
-  if min_open_frames > 1:
-    result = mouth_open.copy()
-    i = 0
-    while i < len(result):
-      if result[i]:
-        # 口が開いた → min_open_frames 分は開いたままにする
-        end = min(i + min_open_frames, len(result))
-        result[i:end] = True
-        i = end
-      else:
-        i += 1
-    mouth_open = result
 
+def frame_rms_envelope(wav_path: str | Path, fps: int) -> np.ndarray:
+  """WAVファイルの動画フレーム単位 RMS（最大振幅で正規化済み）を返す
+
+  口パク判定の入力そのもので、音声マニフェストにも保存される。
+  """
+  samples, sample_rate = _read_mono_samples(wav_path)
+  return _frame_rms(samples, sample_rate, fps)
+
+
+def _debounce_open(mouth_open: np.ndarray, min_open_frames: int) -> np.ndarray:
+  """口を開いたら最低 min_open_frames フレーム維持する（チャタリング防止）
+
+  先頭から走査して開いた位置から min_open_frames 分を開いたままにする処理と同じ結果を、
+  フレーム単位ではなく「開いている区間」単位の配列演算で求める。
+  区間長 L の開口は ceil(L / m) * m フレームまで延長され、
+  延長が次の区間に食い込んだ場合はその続きから次の区間を数える。
+  食い込みは前の区間の結果に依存するため、「直前までの延長の終端」を全区間まとめて
+  更新し直す反復を不動点まで繰り返す（反復回数は連鎖して食い込む区間の数で、区間数ではない）。
+  """
+  n = len(mouth_open)
+  if min_open_frames <= 1 or n == 0:
+    return mouth_open
+
+  # 開口区間 [run_starts, run_ends) を抽出
+  padded = np.concatenate(([False], mouth_open, [False]))
+  edges = np.flatnonzero(padded[1:] != padded[:-1])
+  run_starts = edges[0::2]
+  run_ends = edges[1::2]
+  if len(run_starts) == 0:
+    return mouth_open
+
+  # covered[j] = 区間 j より前の延長の終端。k 回目の反復で先頭 k 区間の値が確定する
+  m = min_open_frames
+  covered = np.zeros_like(run_starts)
+  while True:
+    starts = np.maximum(run_starts, covered)
+    active = starts < run_ends
+    ends = np.where(active, starts + -(-(run_ends - starts) // m) * m, 0)
+    updated = np.concatenate(([0], np.maximum.accumulate(ends)[:-1]))
+    if np.array_equal(updated, covered):
+      break
+    covered = updated
+
+  # 区間を差分配列で塗りつぶす
+  delta = np.zeros(n + 1, dtype=np.int32)
+  np.add.at(delta, starts[active], 1)
+  np.add.at(delta, np.minimum(ends[active], n), -1)
+  return np.cumsum(delta[:-1]) > 0
+
+
+def _mouth_state_key(
+  wav_path: str | Path,
+  fps: int,
+  threshold: float,
+  min_open_frames: int,
+) -> str:
+  return make_key("lipsync", file_digest(Path(wav_path)), fps, threshold, min_open_frames)
+
+
+def _load_mouth_states(key: str, cache_dir: Path | None) -> np.ndarray | None:
+  """メモまたは cache_dir の .npy から解析結果を引く（無ければ None）"""
+  cached = _mouth_state_memo.get(key)
+  if cached is not None:
+    return cached
+  cache_path = cache_dir / f"{key}.npy" if cache_dir else None
+  if cache_path is None or not cache_path.exists():
+    return None
+  mouth_open = np.load(cache_path)
+  mouth_open.setflags(write=False)
+  _mouth_state_memo[key] = mouth_open
   return mouth_open
+
+
+def _store_mouth_states(key: str, mouth_open: np.ndarray, cache_dir: Path | None) -> np.ndarray:
+  """解析結果をメモし、cache_dir があれば .npy として保存する"""
+  if cache_dir:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = cache_dir / f"{key}.npy"
+    # 並列ワーカーが同じキーを同時に書いても混ざらないよう一時ファイル名を分ける
+    tmp = cache_path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+    np.save(tmp, mouth_open)
+    tmp.replace(cache_path)
+  mouth_open.setflags(write=False)
+  _mouth_state_memo[key] = mouth_open
+  return mouth_open
+
+
+def analyze_mouth_states(
+  wav_path: str | Path,
+  fps: int,
+  threshold: float = 0.15,
+  min_open_frames: int = 2,
+  cache_dir: Path | None = None,
+  envelope: np.ndarray | None = None,
+) -> np.ndarray:
+  """WAVファイルから各フレームの口の開閉状態を判定する
+
+  結果は (WAVの内容ハッシュ, fps, threshold, min_open_frames) をキーに
+  プロセス内でメモ化し、cache_dir を指定した場合は .npy としても保存する
+  （並列レンダリングのワーカー間・再描画間で共有される）。
+
+  Args:
+    wav_path: WAVファイルパス
+    fps: 動画のフレームレート
+    threshold: 口を開いたとみなす振幅の閾値（0.0-1.0、正規化済み）
+    min_open_frames: 口を開いたままにする最低フレーム数（チャタリング防止）
+    cache_dir: 解析結果の保存先（None ならプロセス内メモのみ）
+    envelope: 計算済みのフレーム RMS（frame_rms_envelope と同じ値。
+      音声マニフェストから渡すと WAV を読み直さない）
+
+  Returns:
+    bool配列。True=口が開いている、False=口が閉じている。
+    配列の長さ = ceil(duration * fps)
+  """
+  key = _mouth_state_key(wav_path, fps, threshold, min_open_frames)
+  mouth_open = _load_mouth_states(key, cache_dir)
+  if mouth_open is not None:
+    return mouth_open
+
+  if envelope is None:
+    envelope = frame_rms_envelope(wav_path, fps)
+  rms_per_frame = np.asarray(envelope, dtype=np.float32)
+  # 閾値で口の開閉を判定
+  mouth_open = _debounce_open(rms_per_frame > threshold, min_open_frames)
+  return _store_mouth_states(key, mouth_open, cache_dir)
+
+
+def analyze_mouth_states_batch(
+  wav_paths: list[str | Path],
+  fps: int,
+  threshold: float = 0.15,
+  min_open_frames: int = 2,
+  cache_dir: Path | None = None,
+  envelopes: list[np.ndarray | None] | None = None,
+) -> list[np.ndarray]:
+  """複数のWAVファイルの口の開閉状態をまとめて判定する（順序は wav_paths と同じ）
+
+  同一内容のWAVは一度だけ解析する。各要素は analyze_mouth_states と同じ結果。
+  envelopes には各WAVの計算済みフレーム RMS（不明な要素は None）を渡せる。
+  キャッシュに無いファイルは RMS を min_open_frames フレームの無音を挟んで連結し、
+  閾値判定と開口の延長を全ファイル分まとめて1回で行ってから切り分ける
+  （延長は最大 min_open_frames - 1 フレームなので隣のファイルには届かない）。
+  """
+  if envelopes is None:
+    envelopes = [None] * len(wav_paths)
+  keys = [_mouth_state_key(path, fps, threshold, min_open_frames) for path in wav_paths]
+
+  found: dict[str, np.ndarray] = {}
+  pending: dict[str, np.ndarray] = {}
+  for key, path, envelope in zip(keys, wav_paths, envelopes):
+    if key in found or key in pending:
+      continue
+    cached = _load_mouth_states(key, cache_dir)
+    if cached is not None:
+      found[key] = cached
+      continue
+    if envelope is None:
+      envelope = frame_rms_envelope(path, fps)
+    pending[key] = np.asarray(envelope, dtype=np.float32)
+
+  if pending:
+    gap = np.zeros(min_open_frames, dtype=np.float32)
+    parts = []
+    for rms in pending.values():
+      parts += [rms, gap]
+    mouth_open = _debounce_open(np.concatenate(parts) > threshold, min_open_frames)
+    offset = 0
+    for key, rms in pending.items():
+      found[key] = _store_mouth_states(
+        key, mouth_open[offset:offset + len(rms)].copy(), cache_dir,
+      )
+      offset += len(rms) + len(gap)
+
+  results = [found[key] for key in keys]
+  logger.info(
+    "リップシンク解析: %d ファイル (新規 %d, %d フレーム)",
+    len(results), len(pending), sum(len(r) for r in results),
+  )
+  return results
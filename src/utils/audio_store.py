@@ -0,0 +1,205 @@
+"""セリフ音声の PCM ストアと長さマニフェスト
+
+AudioGenerator が書き出した WAV ごとに、動画合成と同じサンプルレート・ステレオの
+16bit PCM を .npy（メモリマップで読める）として保存し、サンプル数・秒数・ピーク・
+口パク判定用のフレーム RMS（fps ごとに PCM の隣の .npy）を音声ディレクトリの
+マニフェスト（JSON）にまとめる。マニフェストにはスカラー値と RMS の fps だけを
+書くため、セリフ数が増えても1回の書き出し・読み直しは小さい。
+動画合成・口パク解析はこれを読むため、セリフごとに ffmpeg でデコードし直したり
+WAV を読み直したりしない。WAV の書き換えはサイズと更新時刻で検出し（内容は読まない）、
+マニフェストに無い・書き換えられた WAV はその場でデコードする（従来どおりの結果）。
+マニフェストはセリフを追加するたびに書き出すため、音声合成中に起動した
+別プロセス（先行レンダリングのワーカー）からも合成済みの分を参照できる。
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from src.config import AUDIO_SAMPLE_RATE, RENDER_PROFILES
+from src.utils.audio_analyzer import frame_rms_envelope
+from src.utils.audio_timeline import audio_duration, decode_audio, decode_pcm
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "audio_manifest.json"
+PCM_DIRNAME = ".pcm"
+_MANIFEST_VERSION = 3
+# 口パク判定用のフレーム RMS を保存するフレームレート（各レンダリングプロファイルの fps）
+_ENVELOPE_FPS = sorted({profile["fps"] for profile in RENDER_PROFILES.values()})
+
+
+def _save_npy(path: Path, array: np.ndarray) -> None:
+  """一時ファイル経由で .npy を書き出す（並列の書き込みと混ざらないよう一時名を分ける）"""
+  tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+  np.save(tmp, array)
+  os.replace(tmp, path)
+
+
+@dataclass
+class AudioInfo:
+  """マニフェストの1ファイル分の項目"""
+
+  size: int              # WAV のバイト数（書き換え検出用）
+  mtime_ns: int          # WAV の更新時刻（書き換え検出用）
+  sample_rate: int       # PCM のサンプルレート
+  n_samples: int         # PCM のサンプル数
+  duration: float        # 秒数（n_samples / sample_rate）
+  peak: float            # PCM の最大振幅（0.0-1.0）
+  envelope_fps: list[int]  # フレーム RMS（口パク判定用、envelope_path）を保存した fps
+
+
+class AudioStore:
+  """1回分の音声出力ディレクトリに対応するマニフェストと PCM ストア
+
+  add / save はスレッドセーフ（並列合成の完了順に呼ばれる）。save で JSON を書き出す。
+  """
+
+  def __init__(self, directory: Path):
+    self.directory = Path(directory)
+    self.manifest_path = self.directory / MANIFEST_NAME
+    self.pcm_dir = self.directory / PCM_DIRNAME
+    self._lock = threading.Lock()
+    self._entries: dict[str, AudioInfo] = {}
+    self._manifest_mtime: int | None = None
+    self._reload()
+
+  def _reload(self) -> None:
+    """マニフェストが更新されていれば読み直す（別プロセスが書いた分を拾う）"""
+    try:
+      mtime = self.manifest_path.stat().st_mtime_ns
+    except FileNotFoundError:
+      return
+    if mtime == self._manifest_mtime:
+      return
+    try:
+      data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+      entries = {}
+      if data.get("version") == _MANIFEST_VERSION:
+        entries = {name: AudioInfo(**item) for name, item in data["files"].items()}
+    except (OSError, ValueError, TypeError, KeyError) as e:
+      logger.warning("音声マニフェストの読み込みに失敗しました (%s): %s", self.manifest_path, e)
+      entries = {}
+    with self._lock:
+      # 未保存の追加分を優先する
+      entries.update(self._entries)
+      self._entries = entries
+      self._manifest_mtime = mtime
+
+  def pcm_path(self, wav_path: Path) -> Path:
+    """WAV に対応する PCM（.npy）のパス"""
+    return self.pcm_dir / f"{Path(wav_path).stem}.npy"
+
+  def envelope_path(self, wav_path: Path, fps: int) -> Path:
+    """WAV の fps ごとのフレーム RMS（.npy）のパス"""
+    return self.pcm_dir / f"{Path(wav_path).stem}.rms{fps}.npy"
+
+  def add(self, wav_path: Path) -> AudioInfo:
+    """WAV をデコードして PCM を保存し、マニフェスト項目を作る"""
+    wav_path = Path(wav_path)
+    pcm = decode_pcm(wav_path, AUDIO_SAMPLE_RATE)
+    self.pcm_dir.mkdir(parents=True, exist_ok=True)
+    _save_npy(self.pcm_path(wav_path), pcm)
+    for fps in _ENVELOPE_FPS:
+      _save_npy(self.envelope_path(wav_path, fps), frame_rms_envelope(wav_path, fps))
+
+    stat = wav_path.stat()
+    info = AudioInfo(
+      size=stat.st_size,
+      mtime_ns=stat.st_mtime_ns,
+      sample_rate=AUDIO_SAMPLE_RATE,
+      n_samples=len(pcm),
+      duration=audio_duration(pcm, AUDIO_SAMPLE_RATE),
+      peak=float(np.abs(pcm).max()) / 32768 if len(pcm) else 0.0,
+      envelope_fps=list(_ENVELOPE_FPS),
+    )
+    with self._lock:
+      self._entries[wav_path.name] = info
+    return info
+
+  def get(self, wav_path: Path) -> AudioInfo | None:
+    """WAV のマニフェスト項目（未登録・内容が変わっている場合は None）"""
+    wav_path = Path(wav_path)
+    self._reload()
+    info = self._entries.get(wav_path.name)
+    if info is None or not self.pcm_path(wav_path).exists():
+      return None
+    try:
+      stat = wav_path.stat()
+    except FileNotFoundError:
+      return None
+    if (stat.st_size, stat.st_mtime_ns) != (info.size, info.mtime_ns):
+      return None
+    return info
+
+  def save(self) -> None:
+    """マニフェストを書き出す（一時ファイル経由で置き換え）"""
+    with self._lock:
+      data = {
+        "version": _MANIFEST_VERSION,
+        "files": {name: asdict(info) for name, info in sorted(self._entries.items())},
+      }
+    self.directory.mkdir(parents=True, exist_ok=True)
+    tmp = self.manifest_path.with_name(
+      f"{MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp",
+    )
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, self.manifest_path)
+    self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+    logger.debug("音声マニフェスト保存: %s (%d ファイル)", self.manifest_path, len(data["files"]))
+
+
+# ディレクトリ → ストア（プロセス内で共有し、生成側の未保存分も参照できるようにする）
+_stores: dict[Path, AudioStore] = {}
+
+
+def open_store(directory: Path) -> AudioStore:
+  """音声ディレクトリのストアを返す（同じディレクトリには同じインスタンス）"""
+  directory = Path(directory).resolve()
+  store = _stores.get(directory)
+  if store is None:
+    store = _stores[directory] = AudioStore(directory)
+  return store
+
+
+def audio_info(wav_path: Path) -> AudioInfo | None:
+  """WAV のマニフェスト項目（無ければ None）"""
+  wav_path = Path(wav_path).resolve()
+  return open_store(wav_path.parent).get(wav_path)
+
+
+def load_voice_pcm(wav_path: Path) -> np.ndarray:
+  """セリフ音声の (サンプル数, 2) int16 PCM（ストアがあればメモリマップで読む）"""
+  wav_path = Path(wav_path).resolve()
+  store = open_store(wav_path.parent)
+  if store.get(wav_path) is not None:
+    pcm = np.load(store.pcm_path(wav_path), mmap_mode="r")
+    pcm.setflags(write=False)
+    return pcm
+  return decode_audio(wav_path, cache_dir=None)
+
+
+def voice_duration(wav_path: Path) -> float:
+  """セリフ音声の秒数（マニフェストがあればファイルを開かない）"""
+  info = audio_info(wav_path)
+  if info is not None:
+    return info.duration
+  return audio_duration(load_voice_pcm(wav_path))
+
+
+def voice_envelope(wav_path: Path, fps: int) -> np.ndarray | None:
+  """口パク判定用のフレーム RMS（マニフェストに同じ fps の値が無ければ None）"""
+  wav_path = Path(wav_path).resolve()
+  store = open_store(wav_path.parent)
+  info = store.get(wav_path)
+  if info is None or fps not in info.envelope_fps:
+    return None
+  try:
+    return np.load(store.envelope_path(wav_path, fps))
+  except FileNotFoundError:
+    return None
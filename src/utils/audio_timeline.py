@@ -0,0 +1,208 @@
+"""NumPy ベースの音声タイムライン合成モジュール
+
+BGM・SE・ボイスを一度だけ PCM 配列へデコードし、配置（開始秒）・音量・ループ・
+フェードアウトを配列演算で適用して1本のバッファへ重ね合わせる。
+MoviePy の CompositeAudioClip / AudioLoop / AudioFadeOut をエンコード中に
+チャンク単位で遅延評価する代わりに、出力ごとに一度だけ計算した WAV を
+どのエンコーダーバックエンドからも再利用できる。
+"""
+
+import logging
+import os
+import subprocess
+import threading
+import wave
+from pathlib import Path
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+
+from src.config import AUDIO_CACHE_DIR, AUDIO_SAMPLE_RATE
+from src.utils.segment_cache import file_digest, make_key
+
+logger = logging.getLogger(__name__)
+
+AUDIO_CHANNELS = 2
+_MIX_CHUNK_SAMPLES = 1 << 18  # 配置・書き出しを区切るサンプル数（約6秒）
+
+# デコード結果のメモ: キャッシュキー -> (サンプル数, 2) の int16 PCM
+_decoded_memo: dict[str, np.ndarray] = {}
+
+
+def decode_pcm(path: Path, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray:
+  """ffmpeg で音声ファイルを (サンプル数, 2) の 16bit PCM にデコードする（キャッシュなし）
+
+  モノラル素材は ffmpeg の既定どおり -3dB で左右に振り分けられる
+  （MoviePy の AudioFileClip と同じ値）。
+  """
+  cmd = [
+    FFMPEG_BINARY, "-loglevel", "error", "-i", str(path), "-vn",
+    "-f", "s16le", "-acodec", "pcm_s16le",
+    "-ar", str(sample_rate), "-ac", str(AUDIO_CHANNELS), "-",
+  ]
+  result = subprocess.run(cmd, capture_output=True)
+  if result.returncode != 0:
+    stderr = result.stderr.decode("utf-8", "replace").strip()
+    raise RuntimeError(f"ffmpeg 音声デコードに失敗しました ({path}): {stderr}")
+  return np.frombuffer(result.stdout, dtype="<i2").reshape(-1, AUDIO_CHANNELS)
+
+
+def decode_audio(
+  path: Path,
+  sample_rate: int = AUDIO_SAMPLE_RATE,
+  cache_dir: Path | None = AUDIO_CACHE_DIR,
+) -> np.ndarray:
+  """音声ファイルを (サンプル数, 2) の int16 PCM 配列として返す
+
+  結果は (ファイル内容ハッシュ, サンプルレート) をキーにプロセス内でメモ化し、
+  cache_dir を指定した場合は .npy として保存して次回以降メモリマップで読む
+  （BGM・SE・ED ボイスなど実行をまたいで使う素材向け）。
+  返り値は読み取り専用。
+
+  Args:
+    path: 音声ファイルパス（ffmpeg が読める形式）
+    sample_rate: デコード後のサンプルレート
+    cache_dir: デコード結果の保存先（None ならプロセス内メモのみ）
+  """
+  path = Path(path)
+  key = make_key("pcm", file_digest(path), sample_rate, AUDIO_CHANNELS)
+  cached = _decoded_memo.get(key)
+  if cached is not None:
+    return cached
+
+  cache_path = cache_dir / f"{key}.npy" if cache_dir else None
+  samples = None
+  if cache_path and cache_path.exists():
+    try:
+      samples = np.load(cache_path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+      logger.warning("音声キャッシュの読み込みに失敗しました (%s): %s", path.name, e)
+      samples = None
+
+  if samples is None:
+    samples = decode_pcm(path, sample_rate)
+    logger.info(
+      "音声デコード: %s (%.1f秒)", path.name, len(samples) / sample_rate,
+    )
+    if cache_path:
+      cache_dir.mkdir(parents=True, exist_ok=True)
+      tmp = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+      np.save(tmp, samples)
+      tmp.replace(cache_path)
+
+  samples.setflags(write=False)
+  _decoded_memo[key] = samples
+  return samples
+
+
+def audio_duration(samples: np.ndarray, sample_rate: int = AUDIO_SAMPLE_RATE) -> float:
+  """PCM 配列の長さ（秒）"""
+  return len(samples) / sample_rate
+
+
+class AudioTimeline:
+  """秒単位の配置で PCM を重ね合わせる固定長の音声バッファ
+
+  サンプル値は [-1, 1] の float32 で保持し、write_wav で 16bit PCM に量子化する
+  （量子化は MoviePy の音声書き出しと同じ ±0.99 クリップ）。
+  配置・書き出しは一定サンプル数ごとに区切って計算するため、backing に
+  ファイルを指定すれば長尺でも作業メモリはバッファ長に比例しない。
+  """
+
+  def __init__(
+    self,
+    duration: float,
+    sample_rate: int = AUDIO_SAMPLE_RATE,
+    backing: Path | None = None,
+  ):
+    """
+    Args:
+      duration: タイムラインの秒数
+      sample_rate: サンプルレート
+      backing: バッファを置くファイル（None ならメモリ上。長尺の書き出し用）
+    """
+    self.sample_rate = sample_rate
+    self.duration = duration
+    shape = (int(duration * sample_rate), AUDIO_CHANNELS)
+    if backing is not None and shape[0] > 0:
+      self.samples = np.memmap(backing, dtype=np.float32, mode="w+", shape=shape)
+    else:
+      self.samples = np.zeros(shape, dtype=np.float32)
+
+  def add(
+    self,
+    pcm: np.ndarray,
+    start: float = 0.0,
+    volume: float = 1.0,
+    duration: float | None = None,
+    loop: bool = False,
+    fade_out: float = 0.0,
+  ) -> None:
+    """PCM（int16 または float）を start 秒の位置から重ねる
+
+    Args:
+      pcm: (サンプル数, 2) の音声配列
+      start: 配置する開始秒
+      volume: 音量倍率
+      duration: 配置する長さ（秒）。None なら素材の長さ
+      loop: duration が素材より長い場合に繰り返すか
+      fade_out: 配置区間の末尾に掛けるフェードアウト秒数
+    """
+    offset = int(round(start * self.sample_rate))
+    length = len(pcm) if duration is None else int(round(duration * self.sample_rate))
+    if not loop:
+      length = min(length, len(pcm))
+    # タイムライン外にはみ出す分は切り捨てる
+    end = min(offset + length, len(self.samples))
+    if end <= offset or len(pcm) == 0:
+      return
+
+    for pos in range(0, end - offset, _MIX_CHUNK_SAMPLES):
+      stop = min(pos + _MIX_CHUNK_SAMPLES, end - offset)
+      if stop <= len(pcm):
+        chunk = _to_float(pcm[pos:stop])
+      else:
+        # 素材より長い区間はループさせる
+        chunk = _to_float(pcm[np.arange(pos, stop) % len(pcm)])
+      if volume != 1.0:
+        chunk *= np.float32(volume)
+      if fade_out > 0:
+        chunk *= _fade_out_gain(pos, stop, length, fade_out, self.sample_rate)[:, None]
+      self.samples[offset + pos:offset + stop] += chunk
+
+  def fade_out(self, seconds: float) -> None:
+    """タイムライン全体の末尾 seconds 秒をフェードアウトする"""
+    n = len(self.samples)
+    # 末尾 seconds 秒より前は係数 1 なので、その区間だけ計算する
+    first = max(0, n - int(seconds * self.sample_rate) - 1)
+    self.samples[first:] *= _fade_out_gain(first, n, n, seconds, self.sample_rate)[:, None]
+
+  def write_wav(self, path: Path) -> None:
+    """16bit PCM WAV として書き出す"""
+    with wave.open(str(path), "wb") as wf:
+      wf.setnchannels(AUDIO_CHANNELS)
+      wf.setsampwidth(2)
+      wf.setframerate(self.sample_rate)
+      for pos in range(0, len(self.samples), _MIX_CHUNK_SAMPLES):
+        chunk = self.samples[pos:pos + _MIX_CHUNK_SAMPLES]
+        quantized = (np.clip(chunk, -0.99, 0.99) * (2 ** 15)).astype("<i2")
+        wf.writeframes(quantized.tobytes())
+
+
+def _to_float(pcm: np.ndarray) -> np.ndarray:
+  """PCM を float32 の新しい配列に変換する（int16 は 1/32768 倍）"""
+  if pcm.dtype == np.int16:
+    return pcm.astype(np.float32) * np.float32(1 / 32768)
+  return np.array(pcm, dtype=np.float32)
+
+
+def _fade_out_gain(
+  start: int, stop: int, length: int, fade_out: float, sample_rate: int,
+) -> np.ndarray:
+  """長さ length のクリップのサンプル区間 [start, stop) のフェードアウト係数
+
+  AudioFadeOut と同じく min((クリップ長 - t) / fade_out, 1)。
+  """
+  t = np.arange(start, stop, dtype=np.float64) / sample_rate
+  remaining = length / sample_rate - t
+  return np.clip(remaining / fade_out, 0.0, 1.0).astype(np.float32)
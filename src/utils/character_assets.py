@@ -21,9 +21,58 @@ VALID_EMOTIONS = ("normal", "happy", "angry", "sad", "surprised")
 
 @dataclass
 class CharacterFrames:
-  """特定の高さにリサイズ済みのキャラクター画像セット"""
+  """特定の高さにリサイズ済みのキャラクター画像セット
+
+  variant() で (表情, 口開閉, 明るさ, 拡大率) ごとの加工済み画像を取得できる。
+  加工結果はインスタンス内に保持し、同じ組み合わせは二度計算しない。
+  """
   mouth_closed: dict[str, np.ndarray] = field(default_factory=dict)
   mouth_open: dict[str, np.ndarray] = field(default_factory=dict)
+  _variants: dict[tuple[str, bool, float, float], np.ndarray] = field(
+    default_factory=dict, repr=False,
+  )
+
+  def variant(
+    self,
+    emotion: str,
+    mouth_open: bool = False,
+    brightness: float = 1.0,
+    scale: float = 1.0,
+  ) -> np.ndarray:
+    """明るさ調整・拡大済みの RGBA 画像を返す（表情がなければ normal にフォールバック）"""
+    key = (emotion, mouth_open, brightness, scale)
+    image = self._variants.get(key)
+    if image is None:
+      images = self.mouth_open if mouth_open else self.mouth_closed
+      image = images.get(emotion, images["normal"])
+      if brightness != 1.0:
+        image = _apply_brightness(image, brightness)
+      image = _resize_rgba(image, scale)
+      image.setflags(write=False)
+      self._variants[key] = image
+    return image
+
+
+def _apply_brightness(image_array: np.ndarray, factor: float) -> np.ndarray:
+  """画像の明るさを調整する（RGBA対応）"""
+  result = image_array.copy().astype(np.float32)
+  # RGB チャンネルのみ明るさ調整（アルファは維持）
+  result[:, :, :3] = np.clip(result[:, :, :3] * factor, 0, 255)
+  return result.astype(np.uint8)
+
+
+def _resize_rgba(image_array: np.ndarray, scale: float) -> np.ndarray:
+  """RGBA画像を拡大縮小する（MoviePy の resized と同じく RGB とアルファを個別にリサンプル）"""
+  if scale == 1.0:
+    return image_array
+  h, w = image_array.shape[:2]
+  new_size = (int(w * scale), int(h * scale))
+  rgb = Image.fromarray(np.ascontiguousarray(image_array[:, :, :3]))
+  alpha = Image.fromarray(np.ascontiguousarray(image_array[:, :, 3]))
+  return np.dstack([
+    np.array(rgb.resize(new_size, Image.LANCZOS)),
+    np.array(alpha.resize(new_size, Image.LANCZOS)),
+  ])
 
 
 def _load_and_resize(img_path: Path, target_height: int) -> np.ndarray:
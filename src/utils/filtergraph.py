@@ -0,0 +1,191 @@
+"""ffmpeg filter_complex による静止画レイヤー合成のグラフ組み立て
+
+背景1枚をループした1本の映像に、静止画スプライト（PNG）を overlay フィルタで
+順に重ねる filter_complex を組み立てる。シーンの区切りは各 overlay の enable 式
+（表示するフレーム区間）、動きは位置式で指定するため、描画中に Python 側の処理は
+発生しない。スプライトは乗算済みアルファの RGBA PNG として書き出し
+（overlay の alpha=premultiplied）、同じ内容の画像は1回だけ読み込んで split で配る。
+
+シーンごとに枝分かれさせて concat で連結する構成は、後続シーンの枝が先行して
+フレームを溜め込む（シーン数に比例してメモリを使う）ため使わない。
+overlay は表示区間外のフレームでも毎フレーム処理されるため、1つのグラフに
+入れるシーンは少数に留め、長い台本は呼び出し側でグラフを分けて別々にエンコードし、
+出来上がった映像を連結する。
+"""
+
+import hashlib
+import logging
+import subprocess
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# グラフで使うフィルタ（ffmpeg のビルドに含まれていなければ使えない）
+REQUIRED_FILTERS = ("movie", "settb", "split", "loop", "setpts", "overlay")
+OUTPUT_LABEL = "out"
+_BACKGROUND_NAME = "bg"
+_PNG_COMPRESS_LEVEL = 1  # 読み込みは ffmpeg 起動時の1回だけなので書き出し速度を優先
+
+
+class FiltergraphUnsupported(Exception):
+  """フィルタグラフで表現できない要素がある（Python の描画に切り替える）"""
+
+
+@lru_cache(maxsize=None)
+def _available_filters() -> frozenset[str]:
+  """ffmpeg のビルドに含まれるフィルタ名"""
+  result = subprocess.run(
+    [FFMPEG_BINARY, "-hide_banner", "-filters"], capture_output=True, text=True,
+  )
+  names = set()
+  for line in result.stdout.splitlines():
+    parts = line.split()
+    # " TSC overlay  VV->V  説明" の形式（見出し行は読み飛ばす）
+    if len(parts) >= 3 and "->" in parts[2]:
+      names.add(parts[1])
+  return frozenset(names)
+
+
+def missing_filters() -> list[str]:
+  """REQUIRED_FILTERS のうち ffmpeg で使えないフィルタ名"""
+  available = _available_filters()
+  return [name for name in REQUIRED_FILTERS if name not in available]
+
+
+@dataclass
+class Overlay:
+  """シーンに重ねる1枚の画像
+
+  x / y は OverlayGraph.scene_index_expr()（シーン内のフレーム番号）を含んでよい式。
+  """
+
+  image: str                        # OverlayGraph.add_image が返す名前
+  x: str
+  y: str
+  frames: np.ndarray | None = None  # シーン内の表示フレーム（bool 配列、None なら全フレーム）
+  per_frame: bool = False           # x / y をフレームごとに評価するか
+
+
+class OverlayGraph:
+  """背景＋静止画レイヤーのシーン列を1つの filter_complex にまとめる
+
+  work_dir に背景・スプライトの PNG とグラフのスクリプトを書き出す。
+  ffmpeg は work_dir をカレントディレクトリとして実行する
+  （グラフ中のファイル名をエスケープせずに済むよう相対パスで参照する）。
+  """
+
+  def __init__(self, work_dir: Path, background: np.ndarray, fps: int):
+    self.work_dir = Path(work_dir)
+    self.fps = fps
+    self.n_frames = 0
+    self.n_scenes = 0
+    self._images: dict[str, str] = {}  # 内容ハッシュ → 画像名
+    self._uses: dict[str, int] = {}     # 画像名 → 参照する overlay の数
+    self._overlays: list[str] = []
+    Image.fromarray(np.ascontiguousarray(background[:, :, :3])).save(
+      self.work_dir / f"{_BACKGROUND_NAME}.png", compress_level=_PNG_COMPRESS_LEVEL,
+    )
+
+  def _frame_index_expr(self) -> str:
+    """動画先頭からのフレーム番号（0 始まり）の式
+
+    overlay の変数 n は位置式と enable 式で数え始めが異なる（位置式では1始まり）ため、
+    フレーム番号どおりに振り直した時刻 t から求める。
+    """
+    return f"round(t*{self.fps})"
+
+  def scene_index_expr(self) -> str:
+    """次に add_scene するシーンの、シーン内フレーム番号（0 始まり）の式"""
+    if self.n_frames == 0:
+      return self._frame_index_expr()
+    return f"({self._frame_index_expr()}-{self.n_frames})"
+
+  def add_image(self, rgba: np.ndarray) -> str:
+    """乗算済みアルファの RGBA 画像を登録して名前を返す（同じ内容なら同じ名前）"""
+    rgba = np.ascontiguousarray(rgba, dtype=np.uint8)
+    digest = hashlib.sha256(rgba.tobytes())
+    digest.update(str(rgba.shape).encode())
+    key = digest.hexdigest()
+    name = self._images.get(key)
+    if name is None:
+      name = self._images[key] = f"i{len(self._images)}"
+      self._uses[name] = 0
+      Image.fromarray(rgba).save(
+        self.work_dir / f"{name}.png", compress_level=_PNG_COMPRESS_LEVEL,
+      )
+    return name
+
+  def add_scene(self, n_frames: int, overlays: list[Overlay]) -> None:
+    """背景の上に overlays を下から順に重ねた n_frames フレームのシーンを追加する"""
+    start = self.n_frames
+    for overlay in overlays:
+      frames = overlay.frames
+      if frames is None:
+        frames = np.ones(n_frames, dtype=bool)
+      enable = self._ranges_expr(start, frames[:n_frames])
+      if enable is None:
+        continue
+      use = self._uses[overlay.image]
+      self._uses[overlay.image] += 1
+      options = [
+        f"x='{overlay.x}'",
+        f"y='{overlay.y}'",
+        f"eval={'frame' if overlay.per_frame else 'init'}",
+        "format=rgb",
+        "alpha=premultiplied",
+        f"enable='{enable}'",
+      ]
+      self._overlays.append(f"[{overlay.image}_{use}]overlay={':'.join(options)}")
+    self.n_frames += n_frames
+    self.n_scenes += 1
+
+  def _ranges_expr(self, start: int, frames: np.ndarray) -> str | None:
+    """シーン内の表示フレームを enable 式（between(フレーム番号,開始,終了) の和）にする
+
+    表示するフレームが無ければ None を返す。
+    """
+    frames = np.asarray(frames, dtype=bool)
+    # 表示区間の開始・終了フレーム（終了は区間に含む）
+    edges = np.diff(np.concatenate([[0], frames.view(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1) + start
+    ends = np.flatnonzero(edges == -1) - 1 + start
+    if len(starts) == 0:
+      return None
+    index = self._frame_index_expr()
+    return "+".join(f"between({index},{a},{b})" for a, b in zip(starts, ends))
+
+  def script(self) -> str:
+    """filter_complex のスクリプト（出力ラベルは OUTPUT_LABEL）"""
+    if self.n_frames == 0:
+      raise ValueError("シーンがありません")
+    n = len(self._overlays)
+    background = (
+      f"movie={_BACKGROUND_NAME}.png,settb=1/{self.fps},"
+      f"loop=loop={self.n_frames - 1}:size=1,setpts=N"
+    )
+    chains = [f"{background}[{'c0' if n else OUTPUT_LABEL}]"]
+    for name, uses in self._uses.items():
+      if uses == 0:
+        continue
+      labels = "".join(f"[{name}_{u}]" for u in range(uses))
+      chains.append(f"movie={name}.png,split={uses}{labels}")
+    for j, overlay in enumerate(self._overlays):
+      output = OUTPUT_LABEL if j == n - 1 else f"c{j + 1}"
+      chains.append(f"[c{j}]{overlay}[{output}]")
+    return ";\n".join(chains) + "\n"
+
+  def write_script(self) -> Path:
+    """スクリプトを work_dir に書き出してパスを返す"""
+    path = self.work_dir / "graph.txt"
+    path.write_text(self.script(), encoding="utf-8")
+    logger.info(
+      "フィルタグラフ作成: %d シーン, %d フレーム, overlay %d 個, 画像 %d 枚",
+      self.n_scenes, self.n_frames, len(self._overlays), len(self._images),
+    )
+    return path
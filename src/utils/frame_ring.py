@@ -0,0 +1,160 @@
+"""共有メモリのリングバッファを使ったフレーム並列描画モジュール
+
+複数のワーカープロセスが通し番号を交互に割り当てたフレーム
+（ワーカー w は 通し番号 ≡ w (mod ワーカー数) のフレーム）を描画し、
+multiprocessing.shared_memory 上のフレーム枠へ書き込む。親プロセスは
+通し番号順に枠を読み出し、コピーせずにエンコーダーへ渡してから枠を返す。
+
+フレーム i は枠 i % 枠数 に入る。枠数はワーカー数の倍数にするため、
+各枠に書き込むワーカーは常に同じ1つで、書き込み順と読み出し順が一致する。
+ワーカーへは描画指示だけを渡し、背景・スプライトなどの素材は fork で
+親プロセスの準備済みのものを（コピーオンライトの読み取り専用で）引き継ぐ。
+"""
+
+import logging
+import multiprocessing
+from collections.abc import Callable, Iterator
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_POLL_INTERVAL = 1.0  # ワーカーの異常終了を確認する間隔（秒）
+
+
+class FrameRing:
+  """共有メモリ上の RGB フレーム枠のリングバッファ
+
+  枠ごとに「空き」「書き込み済み」のセマフォを持ち、ワーカーは put で
+  空くのを待って書き込み、親プロセスは get で書き込みを待って読み出し、
+  使い終わったら release で枠を返す。
+  """
+
+  def __init__(self, size: tuple[int, int], n_slots: int, ctx=None):
+    ctx = ctx or multiprocessing.get_context()
+    width, height = size
+    self.shape = (height, width, 3)
+    self.n_slots = n_slots
+    self._frame_bytes = width * height * 3
+    self._shm = shared_memory.SharedMemory(create=True, size=self._frame_bytes * n_slots)
+    self._free = [ctx.Semaphore(1) for _ in range(n_slots)]
+    self._filled = [ctx.Semaphore(0) for _ in range(n_slots)]
+
+  def __getstate__(self):
+    # spawn で起動するワーカーへは共有メモリの名前だけを渡す
+    state = self.__dict__.copy()
+    state["_shm"] = self._shm.name
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self._shm = shared_memory.SharedMemory(name=state["_shm"])
+    # 解放は作成した親プロセスが行うため、ワーカー側のリソース追跡からは外す
+    resource_tracker.unregister(self._shm._name, "shared_memory")
+
+  def _slot(self, index: int) -> np.ndarray:
+    """フレーム index が入る枠を指す配列（共有メモリのビュー）"""
+    offset = (index % self.n_slots) * self._frame_bytes
+    return np.ndarray(self.shape, dtype=np.uint8, buffer=self._shm.buf, offset=offset)
+
+  def put(self, index: int, frame: np.ndarray) -> None:
+    """フレーム index を枠に書き込む（枠が空くまで待つ）"""
+    slot = index % self.n_slots
+    self._free[slot].acquire()
+    np.copyto(self._slot(index), frame[:, :, :3], casting="unsafe")
+    self._filled[slot].release()
+
+  def get(self, index: int, check: Callable[[], None] | None = None) -> np.ndarray:
+    """フレーム index が書き込まれるまで待ち、枠のビューを返す
+
+    待っている間 _POLL_INTERVAL ごとに check を呼ぶ（ワーカーの異常終了時に例外を出す用）。
+    返したビューは release するまで有効。
+    """
+    filled = self._filled[index % self.n_slots]
+    while not filled.acquire(timeout=_POLL_INTERVAL):
+      if check:
+        check()
+    return self._slot(index)
+
+  def release(self, index: int) -> None:
+    """読み終えたフレーム index の枠を空きに戻す"""
+    self._free[index % self.n_slots].release()
+
+  def close(self) -> None:
+    """共有メモリを閉じて削除する（作成した親プロセスで呼ぶ）"""
+    try:
+      self._shm.close()
+    except BufferError:
+      # 呼び出し側にフレームのビューが残っていれば、その解放後の GC でマップが閉じられる
+      pass
+    self._shm.unlink()
+
+
+class ParallelFrameSource:
+  """ワーカープロセスが FrameRing へ描画したフレームを通し番号順に取り出す
+
+  with 文で使用し、反復すると (height, width, 3) の uint8 配列（共有メモリの
+  ビュー）を順に返す。各フレームは次のフレームを取り出すまで有効。
+
+  ワーカーは target(ring, worker, n_workers, *args) として実行され、担当フレームを
+  通し番号の昇順に ring.put する。fork できる環境では fork で起動するため、
+  親プロセスで準備済みの素材（モジュール変数に保持したもの）をそのまま使える。
+  エンコーダーなど子プロセスに持たせたくないパイプを開く前に with に入ること。
+  """
+
+  def __init__(
+    self,
+    target: Callable[..., None],
+    args: tuple,
+    size: tuple[int, int],
+    n_frames: int,
+    workers: int,
+    slots: int,
+  ):
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    ctx = multiprocessing.get_context(method)
+    n_slots = -(-max(slots, workers) // workers) * workers
+    self.n_frames = n_frames
+    self.ring = FrameRing(size, n_slots, ctx)
+    self._procs = [
+      ctx.Process(
+        target=target, args=(self.ring, worker, workers, *args),
+        name=f"frame-worker-{worker}", daemon=True,
+      )
+      for worker in range(workers)
+    ]
+
+  def _check_workers(self) -> None:
+    """異常終了したワーカーがあれば例外を出す"""
+    for proc in self._procs:
+      if proc.exitcode not in (None, 0):
+        raise RuntimeError(
+          f"フレーム描画ワーカーが異常終了しました: {proc.name} (exit code {proc.exitcode})"
+        )
+    if all(proc.exitcode is not None for proc in self._procs):
+      raise RuntimeError("フレーム描画ワーカーがすべてのフレームを書き込まずに終了しました")
+
+  def __iter__(self) -> Iterator[np.ndarray]:
+    for index in range(self.n_frames):
+      frame = self.ring.get(index, self._check_workers)
+      yield frame
+      del frame  # 共有メモリを閉じられるようビューを残さない
+      self.ring.release(index)
+
+  def __enter__(self):
+    for proc in self._procs:
+      proc.start()
+    logger.info(
+      "フレーム並列描画開始: %d プロセス, フレーム枠 %d, %d フレーム",
+      len(self._procs), self.ring.n_slots, self.n_frames,
+    )
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    for proc in self._procs:
+      if exc_type is not None:
+        proc.terminate()
+      proc.join()
+    self.ring.close()
+    return False
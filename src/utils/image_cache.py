@@ -0,0 +1,73 @@
+"""デコード・リサイズ済み背景画像のキャッシュモジュール
+
+同じ背景PNGをシーン・エンディング・サムネイルで何度もデコード＆LANCZOS
+リサイズしないよう、(パス, 更新時刻, サイズ) をキーにプロセス内で共有する。
+persist=True なら PNG の隣に .npy を書き出し、次回以降（別プロセスを含む）は
+メモリマップで読み込む。
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src.config import BG_ARRAY_PERSIST
+
+logger = logging.getLogger(__name__)
+
+# (絶対パス, mtime_ns, (width, height)) -> 読み取り専用 RGB 配列
+_background_memo: dict[tuple[Path, int, tuple[int, int]], np.ndarray] = {}
+
+
+def _npy_path(image_path: Path, size: tuple[int, int]) -> Path:
+  width, height = size
+  return image_path.with_name(f".{image_path.stem}.{width}x{height}.npy")
+
+
+def load_background(
+  image_path: Path,
+  size: tuple[int, int],
+  persist: bool = BG_ARRAY_PERSIST,
+) -> np.ndarray:
+  """背景画像を RGB に変換し size (width, height) へ LANCZOS リサイズした配列を返す
+
+  返り値は読み取り専用（キャッシュを共有するため）。書き換える場合はコピーすること。
+
+  Args:
+    image_path: 背景画像パス
+    size: リサイズ先 (width, height)
+    persist: True なら PNG の隣に .npy を保存・再利用する
+  """
+  image_path = Path(image_path).resolve()
+  mtime_ns = image_path.stat().st_mtime_ns
+  key = (image_path, mtime_ns, tuple(size))
+  cached = _background_memo.get(key)
+  if cached is not None:
+    return cached
+
+  npy_path = _npy_path(image_path, size)
+  array = None
+  if persist and npy_path.exists() and npy_path.stat().st_mtime_ns >= mtime_ns:
+    try:
+      array = np.load(npy_path, mmap_mode="r")
+    except (OSError, ValueError) as e:
+      logger.warning("背景キャッシュの読み込みに失敗しました (%s): %s", npy_path.name, e)
+      array = None
+    if array is not None and array.shape != (size[1], size[0], 3):
+      array = None
+
+  if array is None:
+    img = Image.open(image_path).convert("RGB").resize(tuple(size), Image.LANCZOS)
+    array = np.array(img)
+    if persist:
+      tmp = npy_path.with_name(f"{npy_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+      np.save(tmp, array)
+      tmp.replace(npy_path)
+    logger.info("背景画像デコード: %s → %dx%d", image_path.name, *size)
+
+  array.setflags(write=False)
+  _background_memo[key] = array
+  return array
@@ -0,0 +1,136 @@
+"""レイヤーの動き（ふわふわ浮遊・プルプル震え・跳ね回り）の位置テーブル
+
+動きは描画 fps でのフレームごとの整数座標の配列として事前に計算し、
+描画時はフレーム番号で引くだけにする（フレームごとに np.sin を呼ばない）。
+正弦波の揺れの表はパラメータごとにプロセス内で共有し、同じ条件なら
+どのシーン・どのワーカーでも同じ座標になる。
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+# (振幅, 周波数, 位相, fps) -> フレームごとの変位（読み取り専用、必要に応じて延長）
+_sine_tables: dict[tuple[int, float, float, int], np.ndarray] = {}
+
+
+def sine_offsets(amp: int, freq: float, phase: float, fps: int, n_frames: int) -> np.ndarray:
+  """フレーム i の変位 int(amp × sin(2π × freq × i / fps + phase)) の配列（長さ n_frames）
+
+  返り値は共有の表のビュー（読み取り専用）。短い表しか無ければ倍々に延ばして作り直す。
+  """
+  if not amp:
+    return np.zeros(n_frames, dtype=np.int32)
+  key = (amp, freq, phase, fps)
+  table = _sine_tables.get(key)
+  if table is None or len(table) < n_frames:
+    n = max(n_frames, 2 * len(table) if table is not None else 0)
+    t = np.arange(n) / fps
+    # astype は 0 方向への切り捨て（int() と同じ）
+    table = (amp * np.sin(2 * np.pi * freq * t + phase)).astype(np.int32)
+    table.flags.writeable = False
+    _sine_tables[key] = table
+  return table[:n_frames]
+
+
+@dataclass(frozen=True)
+class MotionTable:
+  """フレームごとの (x, y) 整数座標の表
+
+  MoviePy の with_position には時刻 t を受け取る位置関数としてそのまま渡せる。
+  表の範囲外の時刻は最後のフレームの座標を返す。
+  """
+
+  x: np.ndarray  # (n_frames,) int32
+  y: np.ndarray  # (n_frames,) int32
+  fps: int
+
+  def __len__(self) -> int:
+    return len(self.x)
+
+  def at(self, frame_idx: int) -> tuple[int, int]:
+    """フレーム番号の座標"""
+    i = min(max(frame_idx, 0), len(self.x) - 1)
+    return int(self.x[i]), int(self.y[i])
+
+  def __call__(self, t: float) -> tuple[int, int]:
+    return self.at(round(t * self.fps))
+
+
+def table_frames(duration: float, fps: int) -> int:
+  """duration 秒のクリップの全時刻（終端を含む）を引ける表の長さ"""
+  return int(np.ceil(duration * fps)) + 1
+
+
+@dataclass(frozen=True)
+class SineMotion:
+  """基準位置＋正弦波の揺れで表す動き（ふわふわ浮遊・プルプル震え）
+
+  各軸の変位は int(振幅 × sin(2π × 周波数 × t + 位相))。振幅 0 の軸は固定。
+  ffmpeg のフィルタグラフ描画では同じ計算を overlay の位置式に変換する。
+  """
+  x: int
+  y: int
+  x_amp: int = 0
+  x_freq: float = 0.0
+  x_phase: float = 0.0
+  y_amp: int = 0
+  y_freq: float = 0.0
+  y_phase: float = 0.0
+
+  @property
+  def is_static(self) -> bool:
+    return not (self.x_amp or self.y_amp)
+
+  def table(self, fps: int, n_frames: int) -> MotionTable:
+    """先頭 n_frames フレームの座標表"""
+    x = sine_offsets(self.x_amp, self.x_freq, self.x_phase, fps, n_frames) + self.x
+    y = sine_offsets(self.y_amp, self.y_freq, self.y_phase, fps, n_frames) + self.y
+    return MotionTable(x, y, fps)
+
+  def ffmpeg_expr(self, index: str, fps: int) -> tuple[str, str]:
+    """ffmpeg overlay の位置式 (x, y)（table と同じ演算順で評価される）
+
+    Args:
+      index: シーン内のフレーム番号の式
+    """
+
+    def axis(base: int, amp: int, freq: float, phase: float) -> str:
+      if not amp:
+        return str(base)
+      angle = f"2*PI*{freq!r}*({index}/{fps})"
+      if phase:
+        angle += f"+{phase!r}"
+      return f"{base}+trunc({amp}*sin({angle}))"
+
+    return (
+      axis(self.x, self.x_amp, self.x_freq, self.x_phase),
+      axis(self.y, self.y_amp, self.y_freq, self.y_phase),
+    )
+
+
+def _bounce(values: np.ndarray, max_val: float) -> np.ndarray:
+  """値を 0〜max_val 間で跳ね返らせる"""
+  if max_val <= 0:
+    return np.zeros_like(values)
+  period = 2.0 * max_val
+  phase = np.mod(values, period)  # 除数が正なので常に 0 以上
+  return np.where(phase <= max_val, phase, period - phase)
+
+
+@dataclass(frozen=True)
+class BounceMotion:
+  """等速で進み、0〜最大値の範囲の端で跳ね返る動き（ブロック崩しのボール風）"""
+  x: float
+  y: float
+  vx: float     # 速度（px/秒）
+  vy: float
+  max_x: float  # 移動範囲の右端・下端
+  max_y: float
+
+  def table(self, fps: int, n_frames: int) -> MotionTable:
+    """先頭 n_frames フレームの座標表"""
+    t = np.arange(n_frames) / fps
+    x = _bounce(self.x + self.vx * t, self.max_x).astype(np.int32)
+    y = _bounce(self.y + self.vy * t, self.max_y).astype(np.int32)
+    return MotionTable(x, y, fps)
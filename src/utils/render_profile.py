@@ -0,0 +1,49 @@
+"""レンダリングプロファイル（解像度・fps・エンコード速度の組み合わせ）
+
+final は本番設定（LANDSCAPE_SIZE / PORTRAIT_SIZE・VIDEO_FPS・ENCODER_PRESET のエンコード設定）、
+draft はタイミングと字幕の確認用に解像度と fps を落とし、高速プリセットで書き出す。
+レイアウトの寸法（フォントサイズ・余白・移動量など）は final の解像度を基準に
+定義されており、px() でプロファイルの解像度に換算して使う。
+"""
+
+from dataclasses import dataclass
+
+from src.config import (
+  LANDSCAPE_SIZE,
+  PORTRAIT_SIZE,
+  RENDER_PROFILE,
+  RENDER_PROFILES,
+)
+from src.utils.video_encoder import EncoderSettings, get_encoder_settings
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+  """動画合成に使う解像度倍率・fps・エンコード設定"""
+
+  name: str
+  scale: float              # LANDSCAPE_SIZE / PORTRAIT_SIZE に対する倍率
+  fps: int
+  encoding: EncoderSettings
+
+  def size(self, orientation: str) -> tuple[int, int]:
+    """向き（"landscape" / "portrait"）ごとの動画サイズ (width, height)"""
+    base = LANDSCAPE_SIZE if orientation == "landscape" else PORTRAIT_SIZE
+    # yuv420p は縦横とも偶数である必要がある
+    return tuple(max(2, round(v * self.scale / 2) * 2) for v in base)
+
+  def px(self, value: int | float) -> int:
+    """final 解像度でのピクセル値をこのプロファイルの解像度に換算する"""
+    if self.scale == 1.0:
+      return int(value)
+    return int(round(value * self.scale))
+
+
+def get_profile(name: str | None = None) -> RenderProfile:
+  """名前からプロファイルを返す（None なら RENDER_PROFILE 設定値）"""
+  name = name or RENDER_PROFILE
+  if name not in RENDER_PROFILES:
+    raise ValueError(f"不明なレンダリングプロファイル: {name}")
+  config = dict(RENDER_PROFILES[name])
+  encoding = get_encoder_settings(config.pop("encoder", None))
+  return RenderProfile(name=name, encoding=encoding, **config)
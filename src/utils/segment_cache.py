@@ -0,0 +1,118 @@
+"""レンダリング済みセグメントのコンテンツアドレス型キャッシュ
+
+セリフ・表情・音声・背景・レイアウト・描画設定から算出したハッシュをキーに、
+シーン単位でエンコード済みの映像セグメントを保存する。
+台本を一部修正して再生成する際、内容が変わっていないシーンは再描画せずに流用する。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_DIGEST_CHUNK_SIZE = 1 << 20
+
+# ファイルダイジェストのメモ: path -> ((mtime_ns, size), digest)
+_digest_memo: dict[Path, tuple[tuple[int, int], str]] = {}
+
+
+def file_digest(path: Path) -> str:
+  """ファイル内容の SHA-256 を返す（mtime とサイズが同じなら再計算しない）"""
+  path = Path(path)
+  stat = path.stat()
+  stamp = (stat.st_mtime_ns, stat.st_size)
+  memo = _digest_memo.get(path)
+  if memo and memo[0] == stamp:
+    return memo[1]
+
+  h = hashlib.sha256()
+  with open(path, "rb") as f:
+    while chunk := f.read(_DIGEST_CHUNK_SIZE):
+      h.update(chunk)
+  digest = h.hexdigest()
+  _digest_memo[path] = (stamp, digest)
+  return digest
+
+
+def make_key(*parts) -> str:
+  """JSON 化できる要素列からキャッシュキー（SHA-256 の16進文字列）を作る"""
+  payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+  return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SegmentCache:
+  """キー → セグメントファイルの対応をディレクトリ上に保持するキャッシュ"""
+
+  def __init__(self, cache_dir: Path, suffix: str = ".mp4"):
+    self.cache_dir = Path(cache_dir)
+    self.suffix = suffix
+    self.cache_dir.mkdir(parents=True, exist_ok=True)
+    self.hits = 0
+    self.misses = 0
+
+  def path_for(self, key: str) -> Path:
+    """キーに対応するキャッシュファイルのパス"""
+    return self.cache_dir / f"{key}{self.suffix}"
+
+  def lookup(self, key: str) -> Path | None:
+    """キャッシュ済みならそのパス、なければ None を返す
+
+    ヒットしたファイルは更新日時を現在時刻にする（trim で古い順に消すため）。
+    確認の途中で別プロセスの trim に消された場合はミスとして扱う。
+    """
+    path = self.path_for(key)
+    try:
+      if path.stat().st_size > 0:
+        # touch と違い、消された直後でも空ファイルを作り直さない
+        os.utime(path)
+        self.hits += 1
+        return path
+    except FileNotFoundError:
+      pass
+    self.misses += 1
+    return None
+
+  def store(self, key: str, src: Path) -> Path:
+    """書き出し済みファイルをキャッシュへ移動する（一時名を経由して置き換える）
+
+    同じキーを複数のプロセス・スレッドが同時に保存しても一時ファイルが
+    衝突しないよう、一時名に pid とスレッド ID を含める。
+    """
+    dst = self.path_for(key)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.move(src, tmp)
+    os.replace(tmp, dst)
+    return dst
+
+  def prune(self, keep: set[str]) -> int:
+    """keep に含まれないキャッシュファイルを削除し、削除数を返す"""
+    removed = 0
+    for path in self.cache_dir.glob(f"*{self.suffix}"):
+      if path.name.removesuffix(self.suffix) not in keep:
+        path.unlink(missing_ok=True)
+        removed += 1
+    if removed:
+      logger.info("セグメントキャッシュ整理: %d 件削除 (%s)", removed, self.cache_dir)
+    return removed
+
+  def trim(self, max_entries: int) -> int:
+    """最近使った max_entries 件だけを残して古いファイルを削除し、削除数を返す"""
+    paths = []
+    for path in self.cache_dir.glob(f"*{self.suffix}"):
+      try:
+        paths.append((path.stat().st_mtime, path))
+      except FileNotFoundError:
+        continue
+    paths.sort(reverse=True)
+    for _, path in paths[max_entries:]:
+      path.unlink(missing_ok=True)
+    removed = max(0, len(paths) - max_entries)
+    if removed:
+      logger.info("セグメントキャッシュ整理: %d 件削除 (%s)", removed, self.cache_dir)
+    return removed
+
@@ -1,11 +1,246 @@
 """PIL を使った日本語テキスト描画ユーティリティ"""
 
 import textwrap
+from functools import lru_cache
+from pathlib import Path
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 
+@lru_cache(maxsize=None)
+def _load_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+  return ImageFont.truetype(font_path, size)
+
+
+def get_font(font_path: str | Path, size: int) -> ImageFont.FreeTypeFont:
+  """(フォントパス, サイズ) ごとに共有される FreeTypeFont を返す
+
+  字幕・タイトル・吹き出しで同じフォントを毎回読み込まないためのレジストリ。
+  """
+  return _load_font(str(font_path), size)
+
+
+# 文字ごと・文字対ごとのキャッシュの上限（長時間の描画でも無制限に増えないように）
+_GLYPH_ATLAS_SIZE = 8192
+_KERNING_CACHE_SIZE = 4 * _GLYPH_ATLAS_SIZE
+
+
+@lru_cache(maxsize=_GLYPH_ATLAS_SIZE)
+def _glyph_advance(font: ImageFont.FreeTypeFont, char: str) -> float:
+  """1文字分の送り幅（フォントはレジストリ由来なので同一性で区別できる）"""
+  return font.getlength(char)
+
+
+@lru_cache(maxsize=_KERNING_CACHE_SIZE)
+def _kerning(font: ImageFont.FreeTypeFont, left: str, right: str) -> float:
+  """2文字間のカーニング補正量（並べた幅と単独の送り幅の合計との差）"""
+  return font.getlength(left + right) - _glyph_advance(font, left) - _glyph_advance(font, right)
+
+
+# --- グリフアトラス ---
+# draw.text / getbbox は呼び出しのたびに全グリフを FreeType で読み込み・ラスタライズ
+# （縁取りはさらにアウトライン処理）し直す。ここでは (フォント, 文字, 縁取り幅) ごとの
+# 外接矩形とマスクを一度だけ作って保持し、行の寸法・マスクはそれを並べて求める。
+# 色はマスクを塗る段階で付けるため、同じアトラスを字幕・タイトル・吹き出しの各色で
+# 共有できる。配置・重なりの合成・塗りの計算は Pillow と同じで、結果は一致する。
+
+
+@lru_cache(maxsize=_GLYPH_ATLAS_SIZE)
+def _glyph_bbox(
+  font: ImageFont.FreeTypeFont, char: str, stroke_width: int = 0,
+) -> tuple[int, int, int, int]:
+  """1文字分の外接矩形（ペン位置からの相対）"""
+  return font.getbbox(char, stroke_width=stroke_width)
+
+
+@lru_cache(maxsize=_GLYPH_ATLAS_SIZE)
+def _glyph_mask(
+  font: ImageFont.FreeTypeFont, char: str, stroke_width: int,
+) -> np.ndarray:
+  """1文字分のマスク（_glyph_bbox の矩形に対応。縁取りは内側の塗りも含む）"""
+  left, top, right, bottom = _glyph_bbox(font, char, stroke_width)
+  if right <= left or bottom <= top:
+    return np.zeros((0, 0), dtype=np.uint8)
+  img = Image.new("L", (right - left, bottom - top), 0)
+  ImageDraw.Draw(img).text(
+    (-left, -top), char, font=font, fill=255,
+    stroke_width=stroke_width, stroke_fill=255,
+  )
+  mask = np.array(img)
+  mask.setflags(write=False)
+  return mask
+
+
+def _pen_positions(font: ImageFont.FreeTypeFont, line: str) -> list[int]:
+  """各文字の描画位置（送り幅とカーニングを小数で累積し、四捨五入した値）"""
+  positions = []
+  pen = 0.0
+  prev = None
+  for char in line:
+    if prev is not None:
+      pen += _kerning(font, prev, char)
+    positions.append(int(pen + 0.5))
+    pen += _glyph_advance(font, char)
+    prev = char
+  return positions
+
+
+def text_bbox(font: ImageFont.FreeTypeFont, line: str) -> tuple[int, int, int, int]:
+  """1行の外接矩形を返す（font.getbbox(line) と同じ値）"""
+  if not line:
+    return (0, 0, 0, 0)
+  x0 = y0 = x1 = y1 = None
+  for char, x in zip(line, _pen_positions(font, line)):
+    left, top, right, bottom = _glyph_bbox(font, char)
+    if x0 is None:
+      x0, y0, x1, y1 = x + left, top, x + right, bottom
+    else:
+      x0, y0 = min(x0, x + left), min(y0, top)
+      x1, y1 = max(x1, x + right), max(y1, bottom)
+  return (x0, y0, x1, y1)
+
+
+def _div255(values: np.ndarray) -> np.ndarray:
+  """Pillow と同じ丸めの 255 除算"""
+  tmp = values + 128
+  return ((tmp >> 8) + tmp) >> 8
+
+
+def _line_mask(
+  font: ImageFont.FreeTypeFont, line: str, stroke_width: int,
+) -> tuple[np.ndarray, int, int]:
+  """アトラスのグリフを並べた1行分のマスク (mask, left, top) を返す"""
+  placed = []
+  for char, x in zip(line, _pen_positions(font, line)):
+    mask = _glyph_mask(font, char, stroke_width)
+    if mask.size:
+      left, top, _, _ = _glyph_bbox(font, char, stroke_width)
+      placed.append((mask, x + left, top))
+
+  if not placed:
+    return np.zeros((0, 0), dtype=np.uint8), 0, 0
+
+  x0 = min(x for _, x, _ in placed)
+  y0 = min(y for _, _, y in placed)
+  x1 = max(x + m.shape[1] for m, x, _ in placed)
+  y1 = max(y + m.shape[0] for m, _, y in placed)
+  out = np.zeros((y1 - y0, x1 - x0), dtype=np.uint16)
+  for mask, x, y in placed:
+    region = out[y - y0:y - y0 + mask.shape[0], x - x0:x - x0 + mask.shape[1]]
+    # 隣接グリフの重なりは「上に重ねる」合成（単純な最大値ではない）
+    src = mask.astype(np.uint16)
+    region[...] = src + _div255(region * (255 - src))
+  return out.astype(np.uint8), x0, y0
+
+
+def _paint_mask(
+  canvas: np.ndarray, mask: np.ndarray, x: int, y: int,
+  ink: tuple[int, int, int, int],
+) -> None:
+  """RGBA 配列の (x, y) にマスクで ink を塗る（ImageDraw の塗りと同じ計算）
+
+  マスク値 0 の画素は塗っても変化しないため、値のある画素だけを計算する。
+  """
+  height, width = canvas.shape[:2]
+  mh, mw = mask.shape
+  left, top = max(x, 0), max(y, 0)
+  right, bottom = min(x + mw, width), min(y + mh, height)
+  if left >= right or top >= bottom:
+    return
+
+  m = mask[top - y:bottom - y, left - x:right - x]
+  ys, xs = np.nonzero(m)
+  if len(ys) == 0:
+    return
+  region = canvas[top:bottom, left:right]
+  m = m[ys, xs].astype(np.uint16)
+  dst = region[ys, xs].astype(np.uint16)
+  ink_arr = np.asarray(ink, dtype=np.uint16)
+  # 完全透明な画素の色チャンネルは ink で置き換える（Pillow の RGBA 塗りと同じ）
+  color_m = np.where(dst[:, 3] == 0, 255, m)[:, None]
+  out = np.empty_like(dst)
+  out[:, :3] = _div255(dst[:, :3] * (255 - color_m) + ink_arr[:3] * color_m)
+  out[:, 3] = _div255(dst[:, 3] * (255 - m) + ink_arr[3] * m)
+  region[ys, xs] = out
+
+
+def draw_text(
+  canvas: np.ndarray,
+  xy: tuple[int, int],
+  text: str,
+  font: ImageFont.FreeTypeFont,
+  fill: tuple[int, int, int, int],
+  stroke_width: int = 0,
+  stroke_fill: tuple[int, int, int, int] | None = None,
+) -> None:
+  """RGBA の numpy 配列に1行のテキストを描画する（グリフアトラス経由）
+
+  ImageDraw.text(xy, text, font=font, fill=fill, stroke_width=..., stroke_fill=...)
+  と同じ結果になる。font は get_font で取得したものを使うこと。
+  """
+  x, y = xy
+  if stroke_width:
+    ink = stroke_fill if stroke_fill is not None else fill
+    mask, left, top = _line_mask(font, text, stroke_width)
+    _paint_mask(canvas, mask, x + left, y + top, ink)
+    if tuple(ink) == tuple(fill):
+      return
+  mask, left, top = _line_mask(font, text, 0)
+  _paint_mask(canvas, mask, x + left, y + top, fill)
+
+
+def _text_width(font: ImageFont.FreeTypeFont, text: str) -> int:
+  bbox = text_bbox(font, text)
+  return bbox[2] - bbox[0]
+
+
+def _wrap_segment(
+  segment: str, font: ImageFont.FreeTypeFont, max_width: int
+) -> list[str]:
+  """改行を含まない文字列をピクセル幅で折り返す
+
+  各行の終端は文字送り幅の累積で見積もり、カーニングやグリフのはみ出しを
+  含む実際の幅（text_bbox）は見積もった折り返し候補の前後でのみ確認する。
+  結果は1文字ずつ getbbox で幅を測る貪欲法と同じ。
+  """
+  if not segment:
+    return [""]
+
+  offsets = [0.0]
+  for char in segment:
+    offsets.append(offsets[-1] + _glyph_advance(font, char))
+
+  lines = []
+  n = len(segment)
+  start = 0
+  while start < n:
+    # 送り幅の累積で収まる最長位置を見積もる（1行には最低1文字入れる）
+    end = start + 1
+    limit = offsets[start] + max_width
+    while end < n and offsets[end + 1] <= limit:
+      end += 1
+    # 見積もり位置の前後を実際の幅で補正する
+    while end < n and _text_width(font, segment[start:end + 1]) <= max_width:
+      end += 1
+    while end > start + 1 and _text_width(font, segment[start:end]) > max_width:
+      end -= 1
+    lines.append(segment[start:end])
+    start = end
+  return lines
+
+
+def wrap_text_by_width(
+  text: str, font: ImageFont.FreeTypeFont, max_width: int
+) -> list[str]:
+  """ピクセル幅ベースでテキストを折り返す（\\n による明示的改行に対応）"""
+  lines = []
+  # まず明示的な改行で分割し、各セグメントをピクセル幅で折り返す
+  for segment in text.split("\n"):
+    lines.extend(_wrap_segment(segment, font, max_width))
+  return lines
+
+
 def render_text(
   text: str,
   font_path: str,
@@ -33,12 +268,12 @@ def render_text(
   Returns:
     RGBA形式のnumpy配列
   """
-  font = ImageFont.truetype(str(font_path), font_size)
+  font = get_font(font_path, font_size)
 
   # テキスト折り返し
   if max_width > 0:
     # ピクセル幅ベースの折り返し
-    lines = _wrap_text_by_width(text, font, max_width - stroke_width * 2)
+    lines = wrap_text_by_width(text, font, max_width - stroke_width * 2)
   else:
     lines = textwrap.wrap(text, width=chars_per_line)
 
@@ -46,7 +281,7 @@ def render_text(
     lines = [text]
 
   # テキスト全体のサイズを計算
-  line_bboxes = [font.getbbox(line) for line in lines]
+  line_bboxes = [text_bbox(font, line) for line in lines]
   line_heights = [bbox[3] - bbox[1] for bbox in line_bboxes]
   line_widths = [bbox[2] - bbox[0] for bbox in line_bboxes]
 
@@ -64,46 +299,22 @@ def render_text(
   img_height = total_height + padding * 2 + bottom_extra
 
   # 透明背景で描画
-  img = Image.new("RGBA", (img_width, img_height), (0, 0, 0, 0))
-  draw = ImageDraw.Draw(img)
+  canvas = np.zeros((img_height, img_width, 4), dtype=np.uint8)
 
   y_offset = padding
   for i, line in enumerate(lines):
     # 中央揃え
     x_offset = (img_width - line_widths[i]) // 2
-    draw.text(
+    draw_text(
+      canvas,
       (x_offset, y_offset),
       line,
-      font=font,
+      font,
       fill=(*color, 255),
       stroke_width=stroke_width,
       stroke_fill=(*stroke_color, 255),
     )
     y_offset += line_heights[i] + line_spacing
 
-  return np.array(img)
+  return canvas
 
-
-def _wrap_text_by_width(
-  text: str, font: ImageFont.FreeTypeFont, max_width: int
-) -> list[str]:
-  """ピクセル幅ベースでテキストを折り返す（\\n による明示的改行に対応）"""
-  lines = []
-
-  # まず明示的な改行で分割し、各セグメントをピクセル幅で折り返す
-  for segment in text.split("\n"):
-    current_line = ""
-    for char in segment:
-      test_line = current_line + char
-      bbox = font.getbbox(test_line)
-      width = bbox[2] - bbox[0]
-
-      if width > max_width and current_line:
-        lines.append(current_line)
-        current_line = char
-      else:
-        current_line = test_line
-
-    lines.append(current_line)
-
-  return lines
@@ -0,0 +1,425 @@
+"""ffmpeg パイプ直結の動画エンコーダーモジュール
+
+MoviePy の write_videofile を経由せず、長寿命の ffmpeg プロセスの標準入力へ
+rawvideo フレームを直接流し込む。音声は事前に書き出した PCM WAV を
+同じ ffmpeg 呼び出しで多重化する（一時AAC ファイルの往復なし）。
+"""
+
+import json
+import logging
+import queue
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+
+from src.config import (
+  ENCODE_STATS_FILENAME,
+  ENCODER_PRESET,
+  ENCODER_PRESETS,
+  ENCODER_THREADS,
+)
+
+logger = logging.getLogger(__name__)
+
+_PROGRESS_INTERVAL = 10.0  # 進捗ログの出力間隔（秒）
+
+
+@dataclass(frozen=True)
+class EncoderSettings:
+  """x264 のエンコード設定（ENCODER_PRESETS の1項目＋スレッド数）"""
+
+  name: str
+  preset: str | None = None       # 速度プリセット（None なら medium）
+  crf: int | None = None          # 画質（None なら 23）
+  tune: str | None = None         # 素材向け調整（animation など）
+  gop_seconds: float | None = None  # キーフレーム間隔（秒、None なら x264 既定）
+  pix_fmt: str = "yuv420p"
+  threads: int | None = None      # スレッド数（None なら ffmpeg の自動設定）
+
+  def codec_args(self, fps: int) -> list[str]:
+    """プリセット・スレッド・ピクセル形式以外の x264 引数（CRF・tune・GOP）"""
+    args = []
+    if self.crf is not None:
+      args += ["-crf", str(self.crf)]
+    if self.tune:
+      args += ["-tune", self.tune]
+    if self.gop_seconds:
+      args += ["-g", str(max(1, round(self.gop_seconds * fps)))]
+    return args
+
+
+def get_encoder_settings(name: str | None = None) -> EncoderSettings:
+  """名前からエンコード設定を返す（None なら ENCODER_PRESET 設定値）"""
+  name = name or ENCODER_PRESET
+  if name not in ENCODER_PRESETS:
+    raise ValueError(f"不明なエンコード設定: {name}")
+  return EncoderSettings(
+    name=name, threads=ENCODER_THREADS or None, **ENCODER_PRESETS[name],
+  )
+
+
+def record_encode_stats(
+  output_path: Path,
+  encoding: EncoderSettings,
+  duration: float,
+  elapsed: float,
+) -> dict:
+  """出力動画のエンコード速度・ビットレートをログに出し、出力先の統計ファイルへ追記する
+
+  速度は描画を含む書き出し全体の所要時間に対する実時間比、ビットレートは
+  ファイルサイズ（音声込み）÷ 動画の秒数。プリセットごとの描画時間と
+  アップロードサイズの比較に使う。
+  """
+  size = output_path.stat().st_size
+  stats = {
+    "time": datetime.now().isoformat(timespec="seconds"),
+    "file": output_path.name,
+    "encoder": asdict(encoding),
+    "duration": round(duration, 3),
+    "elapsed": round(elapsed, 3),
+    "speed": round(duration / elapsed, 3) if elapsed > 0 else None,
+    "bytes": size,
+    "kbps": round(size * 8 / duration / 1000, 1) if duration > 0 else None,
+  }
+  logger.info(
+    "エンコード統計: %s [%s] %.1f秒 → %.1f秒 (%.2fx), %.1f MB, %.0f kbps",
+    output_path.name, encoding.name, duration, elapsed, stats["speed"] or 0.0,
+    size / 1e6, stats["kbps"] or 0.0,
+  )
+  with open(output_path.parent / ENCODE_STATS_FILENAME, "a", encoding="utf-8") as f:
+    f.write(json.dumps(stats, ensure_ascii=False) + "\n")
+  return stats
+
+
+def _video_args(codec: str, encoding: EncoderSettings | None, fps: int) -> list[str]:
+  """映像エンコーダーの ffmpeg 引数（コーデック・ピクセル形式・x264 設定）"""
+  encoding = encoding or EncoderSettings(name="standard")
+  args = ["-c:v", codec, "-pix_fmt", encoding.pix_fmt]
+  if encoding.preset:
+    args += ["-preset", encoding.preset]
+  args += encoding.codec_args(fps)
+  if encoding.threads:
+    args += ["-threads", str(encoding.threads)]
+  return args
+
+
+class FFmpegPipeWriter:
+  """ffmpeg の stdin に RGB フレームを書き込むライター
+
+  with 文で使用し、write_frame で (height, width, 3) の uint8 配列を順に渡す。
+  max_queued_frames を指定すると、書き込みを別スレッドで行い、描画側は
+  最大その枚数だけ先行できる（待ちフレームはコピーして保持するため、
+  常駐するフレームは max_queued_frames 枚が上限）。
+  """
+
+  def __init__(
+    self,
+    output_path: Path,
+    size: tuple[int, int],
+    fps: int,
+    audio_path: Path | None = None,
+    codec: str = "libx264",
+    audio_codec: str = "aac",
+    max_queued_frames: int = 0,
+    encoding: EncoderSettings | None = None,
+  ):
+    self.output_path = output_path
+    self.size = size
+    self.fps = fps
+    self.frames_written = 0
+
+    width, height = size
+    cmd = [
+      FFMPEG_BINARY, "-y", "-loglevel", "error",
+      "-f", "rawvideo", "-vcodec", "rawvideo",
+      "-s", f"{width}x{height}", "-pix_fmt", "rgb24",
+      "-r", str(fps), "-i", "-",
+    ]
+    if audio_path:
+      cmd += ["-i", str(audio_path), "-map", "0:v", "-map", "1:a"]
+    cmd += _video_args(codec, encoding, fps)
+    if audio_path:
+      cmd += ["-c:a", audio_codec]
+    else:
+      cmd += ["-an"]
+    cmd.append(str(output_path))
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    self._proc = subprocess.Popen(
+      cmd,
+      stdin=subprocess.PIPE,
+      stdout=subprocess.DEVNULL,
+      stderr=subprocess.PIPE,
+    )
+
+    self._queue: queue.Queue | None = None
+    self._thread: threading.Thread | None = None
+    self._broken = False
+    if max_queued_frames > 0:
+      self._queue = queue.Queue(maxsize=max_queued_frames)
+      self._thread = threading.Thread(target=self._drain, daemon=True)
+      self._thread.start()
+
+  def _drain(self) -> None:
+    """書き込みスレッド: キューのフレームを順に ffmpeg へ渡す"""
+    while True:
+      frame = self._queue.get()
+      if frame is None:
+        return
+      if self._broken:
+        # ffmpeg が落ちた後も描画側を止めないよう読み捨てる
+        continue
+      try:
+        self._proc.stdin.write(frame.data)
+      except (BrokenPipeError, ValueError):
+        self._broken = True
+
+  def write_frame(self, frame: np.ndarray) -> None:
+    """1フレームを書き込む
+
+    同期書き込みではコピーせずバッファをそのまま渡す。キュー使用時は
+    呼び出し側がバッファを使い回せるようコピーし、キューが満杯なら待つ。
+    """
+    if self._queue is not None:
+      if self._broken:
+        self._raise_error()
+      self._queue.put(np.array(frame, dtype=np.uint8, order="C"))
+    else:
+      try:
+        self._proc.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+      except BrokenPipeError:
+        self._raise_error()
+    self.frames_written += 1
+
+  def _stop_thread(self) -> None:
+    """書き込みスレッドに残りのフレームを渡し終えさせて止める"""
+    if self._thread is not None:
+      self._queue.put(None)
+      self._thread.join()
+      self._thread = None
+
+  def close(self) -> None:
+    """stdin を閉じて ffmpeg の終了を待つ"""
+    self._stop_thread()
+    if self._proc.stdin and not self._proc.stdin.closed:
+      try:
+        self._proc.stdin.close()
+      except BrokenPipeError:
+        pass
+    self._proc.wait()
+    if self._proc.returncode != 0:
+      self._raise_error()
+
+  def abort(self) -> None:
+    """エンコードを中断する（例外発生時用）"""
+    self._proc.kill()
+    self._stop_thread()
+    self._proc.wait()
+
+  def _raise_error(self):
+    stderr = self._proc.stderr.read().decode("utf-8", "replace").strip()
+    raise RuntimeError(
+      f"ffmpeg エンコードに失敗しました ({self.output_path}): {stderr}"
+    )
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc, tb):
+    if exc_type is None:
+      self.close()
+    else:
+      self.abort()
+    return False
+
+
+def encode_clip(
+  clip,
+  output_path: Path,
+  fps: int,
+  *,
+  audio_path: Path | None,
+  codec: str = "libx264",
+  audio_codec: str = "aac",
+  encoding: EncoderSettings | None = None,
+) -> None:
+  """MoviePy クリップの映像を ffmpeg パイプでエンコードする
+
+  音声は clip.audio ではなく、書き出し済みの PCM WAV（audio_path）を
+  映像と同じ ffmpeg 呼び出しで多重化する。None なら映像のみ。
+  """
+  output_path.parent.mkdir(parents=True, exist_ok=True)
+  start = time.time()
+  last_log = start
+  total_frames = int(clip.duration * fps)
+  with FFmpegPipeWriter(
+    output_path, clip.size, fps,
+    audio_path=audio_path, codec=codec, audio_codec=audio_codec, encoding=encoding,
+  ) as writer:
+    for frame in clip.iter_frames(fps=fps, dtype="uint8"):
+      writer.write_frame(frame)
+      now = time.time()
+      if now - last_log >= _PROGRESS_INTERVAL:
+        logger.info(
+          "エンコード中: %d/%d フレーム (%.1f fps)",
+          writer.frames_written, total_frames,
+          writer.frames_written / (now - start),
+        )
+        last_log = now
+
+  elapsed = time.time() - start
+  logger.info(
+    "ffmpeg エンコード完了: %s (%d フレーム, %.1f秒, %.1f fps)",
+    output_path.name, writer.frames_written, elapsed,
+    writer.frames_written / elapsed if elapsed > 0 else 0.0,
+  )
+
+
+def concat_segments(
+  segment_paths: list[Path],
+  output_path: Path,
+  audio_path: Path | None = None,
+  audio_codec: str = "aac",
+) -> None:
+  """映像セグメントを ffmpeg concat demuxer で再エンコードなしに連結する
+
+  各セグメントは同一コーデック・解像度・fps で書き出されている前提。
+  音声トラックは audio_path（PCM WAV）から一度だけエンコードして多重化する。
+  """
+  output_path.parent.mkdir(parents=True, exist_ok=True)
+  list_path = output_path.with_name(output_path.stem + ".concat.txt")
+  with open(list_path, "w", encoding="utf-8") as f:
+    for path in segment_paths:
+      escaped = str(path.resolve()).replace("'", "'\\''")
+      f.write(f"file '{escaped}'\n")
+
+  cmd = [
+    FFMPEG_BINARY, "-y", "-loglevel", "error",
+    "-f", "concat", "-safe", "0", "-i", str(list_path),
+  ]
+  if audio_path:
+    cmd += ["-i", str(audio_path), "-map", "0:v", "-map", "1:a"]
+  cmd += ["-c:v", "copy"]
+  if audio_path:
+    cmd += ["-c:a", audio_codec]
+  else:
+    cmd += ["-an"]
+  cmd.append(str(output_path))
+
+  try:
+    result = subprocess.run(cmd, capture_output=True)
+  finally:
+    list_path.unlink(missing_ok=True)
+  if result.returncode != 0:
+    stderr = result.stderr.decode("utf-8", "replace").strip()
+    raise RuntimeError(
+      f"ffmpeg セグメント連結に失敗しました ({output_path}): {stderr}"
+    )
+  logger.info(
+    "セグメント連結完了: %s (%d セグメント)", output_path.name, len(segment_paths),
+  )
+
+
+@lru_cache(maxsize=None)
+def _ffmpeg_major_version() -> int | None:
+  """ffmpeg のメジャーバージョン（開発版ビルドは大きな値、判別できなければ None）"""
+  result = subprocess.run([FFMPEG_BINARY, "-version"], capture_output=True, text=True)
+  match = re.match(r"ffmpeg version (?:n?(\d+)\.|(N)-)", result.stdout)
+  if not match:
+    return None
+  return int(match.group(1)) if match.group(1) else 999
+
+
+def _filter_script_args(script_name: str) -> list[str]:
+  """filter_complex をスクリプトファイルから読ませる引数
+
+  ffmpeg 7 以降は -/filter_complex（-filter_complex_script は非推奨）、
+  それより前のバージョンでは -filter_complex_script を使う。
+  """
+  version = _ffmpeg_major_version()
+  if version is not None and version >= 7:
+    return ["-/filter_complex", script_name]
+  return ["-filter_complex_script", script_name]
+
+
+def encode_filtergraph(
+  script_path: Path,
+  output_label: str,
+  output_path: Path,
+  fps: int,
+  total_frames: int,
+  audio_path: Path | None = None,
+  codec: str = "libx264",
+  audio_codec: str = "aac",
+  encoding: EncoderSettings | None = None,
+) -> None:
+  """filter_complex のスクリプトが出力する映像を1回の ffmpeg 呼び出しでエンコードする
+
+  グラフ中の相対パスはスクリプトのあるディレクトリを基準に解決する。
+  進捗は ffmpeg の -progress 出力から _PROGRESS_INTERVAL ごとにログに出す。
+
+  Args:
+    script_path: filter_complex のスクリプトファイル
+    output_label: エンコードする映像の出力ラベル
+    total_frames: 出力されるフレーム数（進捗表示用）
+    audio_path: 多重化する PCM WAV（None なら映像のみ）
+  """
+  output_path = output_path.resolve()
+  output_path.parent.mkdir(parents=True, exist_ok=True)
+  cmd = [
+    FFMPEG_BINARY, "-y", "-loglevel", "error", "-nostdin", "-progress", "pipe:1",
+    *_filter_script_args(script_path.name),
+  ]
+  if audio_path:
+    cmd += ["-i", str(Path(audio_path).resolve())]
+  cmd += ["-map", f"[{output_label}]"]
+  if audio_path:
+    cmd += ["-map", "0:a"]
+  cmd += ["-r", str(fps)] + _video_args(codec, encoding, fps)
+  if audio_path:
+    cmd += ["-c:a", audio_codec]
+  else:
+    cmd += ["-an"]
+  cmd.append(str(output_path))
+
+  start = time.time()
+  last_log = start
+  frames = 0
+  with tempfile.TemporaryFile() as stderr:
+    proc = subprocess.Popen(
+      cmd, cwd=script_path.parent, stdout=subprocess.PIPE, stderr=stderr, text=True,
+    )
+    for line in proc.stdout:
+      key, _, value = line.strip().partition("=")
+      if key != "frame" or not value.isdigit():
+        continue
+      frames = int(value)
+      now = time.time()
+      if now - last_log >= _PROGRESS_INTERVAL:
+        logger.info(
+          "エンコード中: %d/%d フレーム (%.1f fps)",
+          frames, total_frames, frames / (now - start),
+        )
+        last_log = now
+    proc.wait()
+    if proc.returncode != 0:
+      stderr.seek(0)
+      message = stderr.read().decode("utf-8", "replace").strip()
+      raise RuntimeError(
+        f"ffmpeg フィルタグラフのエンコードに失敗しました ({output_path}): {message}"
+      )
+
+  elapsed = time.time() - start
+  logger.info(
+    "ffmpeg エンコード完了: %s (%d フレーム, %.1f秒, %.1f fps)",
+    output_path.name, frames, elapsed, frames / elapsed if elapsed > 0 else 0.0,
+  )
@@ -0,0 +1,54 @@
+"""セリフセグメントのキャッシュキーが素材の変更で変わることのテスト"""
+
+from pathlib import Path
+
+import pytest
+
+from src.generators import video_composer
+from src.models import DialogueLine
+from src.utils.render_profile import get_profile
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+  """キャラ画像・フォント・ロゴを一時ディレクトリに用意して参照先を差し替える"""
+  images = tmp_path / "images"
+  for speaker in ("tsuno", "megane"):
+    (images / speaker).mkdir(parents=True)
+    (images / speaker / "normal_closed.png").write_bytes(f"{speaker} closed".encode())
+  font = tmp_path / "font.ttf"
+  font.write_bytes(b"font")
+  logo = tmp_path / "logo.png"
+  logo.write_bytes(b"logo")
+  monkeypatch.setattr(video_composer, "IMAGES_DIR", images)
+  monkeypatch.setattr(video_composer, "FONT_PATH", font)
+  monkeypatch.setattr(video_composer, "DIALOGUE_LOGO_PATH", logo)
+  return {"character": images / "tsuno" / "normal_closed.png", "font": font, "logo": logo}
+
+
+def _line_keys(tmp_path: Path) -> tuple[str, str]:
+  """横長・縦長のセリフセグメントのキー"""
+  audio = tmp_path / "001_tsuno.wav"
+  if not audio.exists():
+    audio.write_bytes(b"wav")
+  dialogue = [DialogueLine(speaker="tsuno", text="こんにちは")]
+  profile = get_profile("final")
+  keys = []
+  for orientation in ("landscape", "portrait"):
+    task = video_composer._SegmentTask(
+      orientation=orientation, kind="line", index=0, duration=1.0, n_frames=24,
+      path=tmp_path / "seg.mp4", audio_path=audio,
+    )
+    keys.append(video_composer._segment_cache_key(task, dialogue, "", profile))
+  return keys[0], keys[1]
+
+
+@pytest.mark.parametrize("asset", ["character", "font", "logo"])
+def test_line_key_changes_when_asset_changes(tmp_path, assets, asset):
+  before = _line_keys(tmp_path)
+  assert _line_keys(tmp_path) == before
+
+  assets[asset].write_bytes(b"edited " + assets[asset].read_bytes())
+  after = _line_keys(tmp_path)
+  assert after[0] != before[0]
+  assert after[1] != before[1]